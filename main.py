@@ -9,153 +9,200 @@ arguments, and calling core functions.
 import os
 import sys
 import json
-import curses
+import time
 import argparse
-from dotenv import load_dotenv
+import functools
+import contextlib
 
 # local imports
-# more db imports: get_row, add_row, update_row, delete_row, update_db_schema
-from src.notion.database import get_rows, get_db_schema
-from src.utils.redirector import StdoutRedirector
+from src.notion.errors import NotionAPIError
+from src.notion.metrics import get_default_metrics
+from src.utils.lazy import lazy_import
+
+# Subsystems are imported when a command first uses them, so `--version`, `--help`
+# and each subcommand only load what they need (see src/utils/lazy.py).
+# more db functions: get_row, add_row, update_row, delete_row, update_db_schema
+database = lazy_import("src.notion.database")
+mirror = lazy_import("src.notion.mirror")
+gmail = lazy_import("src.email.gmail")
+application = lazy_import("src.web.application")
+# The curses UI (src/utils/menu.py) is imported only for interactive runs
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Notion API Configuration
-NOTION_API_URL = os.getenv("NOTION_API_URL")
-NOTION_API_KEY = os.getenv("NOTION_API_KEY")
 DATABASE_ID = "1674d51105a8805f8312e91518420596"
 
-# Notion API Headers
-HEADERS = {
-    "Authorization": f"Bearer {NOTION_API_KEY}",
-    "Content-Type": "application/json",
-    "Notion-Version": "2022-06-28"  # Ensure compatibility with the API version
-}
+
+@functools.lru_cache(maxsize=None)
+def notion_headers() -> dict:
+    """
+    Notion API headers. The environment (and the .env file) is read on first use.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return {
+        "Authorization": f"Bearer {os.getenv('NOTION_API_KEY')}",
+        "Content-Type": "application/json",
+        "Notion-Version": "2022-06-28"  # Ensure compatibility with the API version
+    }
+
+
+# Exit codes of the headless subcommands
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2  # argparse's own code for bad arguments
+EXIT_NOT_IMPLEMENTED = 3
+EXIT_INTERRUPTED = 130
 
 
-# TODO: parse the correct args
 def parse_args():
     """
     Parse command-line arguments and return them as an object.
+    Without a subcommand the interactive curses menu is started.
     """
-    parser = argparse.ArgumentParser(description="A simple image viewer application.")
+    parser = argparse.ArgumentParser(
+        description="Job application tracker. Run without a subcommand for the interactive menu, "
+                    "or with one for a headless run that writes JSON lines to stdout.")
     parser.add_argument("--version", action="version", version="%(prog)s 1.0")
 
-    # additional arguments
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    sync_parser = subparsers.add_parser("sync", help="Sync the local mirror of the Notion database.")
+    sync_parser.add_argument("--reconcile", action="store_true",
+                             help="Scan the whole database now to detect archived rows. A sync does this on its "
+                                  "own when the last full scan is more than a day old; in between, rows archived "
+                                  "in Notion stay in the mirror.")
+    sync_parser.set_defaults(func=run_sync)
+
+    email_parser = subparsers.add_parser("check-email", help="Sync the local copy of the inbox and list new emails.")
+    email_parser.add_argument("--full", action="store_true", help="Relist the whole inbox instead of reading its history.")
+    email_parser.set_defaults(func=run_check_email)
+
+    jobs_parser = subparsers.add_parser("get-new-jobs", help="Collect job postings not seen in earlier runs.")
+    jobs_parser.add_argument("--dry-run", action="store_true", help="Report new postings without recording them as seen.")
+    jobs_parser.set_defaults(func=run_get_new_jobs)
+
+    fill_parser = subparsers.add_parser("fill-job-info", help="Fill in job information for new postings.")
+    fill_parser.set_defaults(func=run_fill_job_info)
+
+    bench_parser = subparsers.add_parser("bench", help="Benchmark the Notion client against a local stand-in server.")
+    bench_parser.add_argument("benchmarks", nargs="*", help="Benchmarks to run (default: all).")
+    bench_parser.set_defaults(func=run_bench)
 
     return parser.parse_args()
 
 
-def test(stdscr):
+def test(job):
     """
-    Test the Notion API and display results in the curses window.
+    Test the Notion API. Runs as a background job; its prints go to the job's log.
     """
-    redirector = StdoutRedirector(stdscr)
-    original_stdout = sys.stdout
+    # ---- START TEST LOGIC ----
+    try:
+        print("Syncing the local mirror of the database...")
+        with mirror.NotionMirror(database.get_client(notion_headers()), DATABASE_ID) as notion_mirror:
+            result = notion_mirror.sync(progress=job.report)
+            print(f"{result['updated']} rows updated, {result['archived']} archived.")
+
+            print(f"{len(notion_mirror.rows())} rows in the local mirror; browse them with 'View Applications'.")
+
+        print("\nGetting the database schema...")
+        schema = database.get_db_schema(DATABASE_ID, notion_headers())
+        for name, prop in schema["properties"].items():
+            print(f"  {name}: {prop['type']}")
+    except NotionAPIError as e:
+        print(f"Notion API call failed: {e}")
+        raise
+    # ---- END TEST LOGIC ----
 
-    # Redirect all prints to the curses window
-    sys.stdout = redirector
 
-    # ---- START TEST LOGIC ----
-    print("Getting all rows from the database...")
-    rows = get_rows(DATABASE_ID, HEADERS)
-    print(json.dumps(rows, indent=2))
+# ---- HEADLESS COMMANDS ----
+# Each command writes one JSON object per line to stdout ("progress", "result"
+# or "error" events) and returns an exit code. Anything the libraries print
+# goes to stderr so the stdout stream stays machine-readable.
 
-    print("\nGetting the database schema...")
-    schema = get_db_schema(DATABASE_ID, HEADERS)
-    print(json.dumps(schema, indent=2))
-    # ---- END TEST LOGIC ----
+_json_out = sys.stdout
 
-    # Make sure everything is flushed out
-    redirector.flush()
 
-    # Restore original stdout
-    sys.stdout = original_stdout
+def emit(event, **fields):
+    """
+    Writes one JSON-lines event to stdout, e.g. {"event": "progress", "pages": 3, ...}.
+    """
+    _json_out.write(json.dumps({"event": event, "time": time.time(), **fields}, default=str) + "\n")
+    _json_out.flush()
+
+
+def run_sync(args) -> int:
+    with mirror.NotionMirror(database.get_client(notion_headers()), DATABASE_ID) as notion_mirror:
+        result = notion_mirror.sync(reconcile=args.reconcile, progress=lambda **progress: emit("progress", **progress))
+        emit("result", **result, rows=len(notion_mirror.rows()), high_water_mark=notion_mirror.high_water_mark)
+    return EXIT_OK
+
+
+def run_check_email(args) -> int:
+    emails = gmail.check_gmail_inbox(full=args.full)
+    for message in emails:
+        emit("email", **message.as_dict(body=False))
+    emit("result", emails=len(emails))
+    return EXIT_OK
+
+
+def run_get_new_jobs(args) -> int:
+    jobs = application.get_new_jobs(mark=not args.dry_run)
+    for posting in jobs:
+        emit("posting", **posting.as_dict())
+    emit("result", jobs=len(jobs))
+    return EXIT_OK
 
 
-def main(stdscr):
+def run_fill_job_info(args) -> int:
+    emit("error", type="NotImplementedError", message="fill-job-info is not implemented yet")
+    return EXIT_NOT_IMPLEMENTED
+
+
+def run_bench(args) -> int:
+    from src.notion.bench import BENCHMARKS
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        emit("error", type="ValueError", message=f"unknown benchmarks: {', '.join(unknown)}",
+             choices=list(BENCHMARKS))
+        return EXIT_USAGE
+    names = args.benchmarks or list(BENCHMARKS)
+    for i, name in enumerate(names, 1):
+        emit("progress", benchmark=name, index=i, total=len(names))
+        emit("result", benchmark=name, **BENCHMARKS[name]())
+    return EXIT_OK
+
+
+def run_headless(args) -> int:
     """
-    Main entry function for the application.
+    Runs one subcommand without curses and maps its outcome to an exit code.
     """
-    # Clear screen
-    stdscr.clear()
-
-    # Menu options
-    menu = [
-        'Run Test Function',
-        'Check Email',
-        'Get New Jobs',
-        'Fill Job Info',
-        'Exit'
-    ]
-    current_row = 0
-
-    def print_menu(selected_row_idx):
-        stdscr.clear()
-        h, w = stdscr.getmaxyx()
-        for idx, row in enumerate(menu):
-            x = w // 2 - len(row) // 2
-            # place the menu roughly in the vertical center
-            y = h // 2 - len(menu) // 2 + idx
-            if idx == selected_row_idx:
-                stdscr.attron(curses.color_pair(1))
-                stdscr.addstr(y, x, row)
-                stdscr.attroff(curses.color_pair(1))
-            else:
-                stdscr.addstr(y, x, row)
-        stdscr.refresh()
-
-    # Initialize curses settings
-    curses.curs_set(0)
-    curses.init_pair(1, curses.COLOR_BLACK, curses.COLOR_WHITE)
-
-    print_menu(current_row)
-
-    while True:
-        key = stdscr.getch()
-
-        # Navigate up/down
-        if key == curses.KEY_UP and current_row > 0:
-            current_row -= 1
-        elif key == curses.KEY_DOWN and current_row < len(menu) - 1:
-            current_row += 1
-        # Enter key pressed
-        elif key in [curses.KEY_ENTER, 10, 13]:
-            # Option 0 -> Run Test Function
-            if current_row == 0:
-                stdscr.clear()
-                stdscr.addstr(0, 0, "Running test function...\n\n")
-                stdscr.refresh()
-
-                # Run the test and display everything
-                test(stdscr)
-
-                # Once test is done, ask user to press a key
-                stdscr.addstr("\nPress any key to return to the menu.")
-                stdscr.refresh()
-                stdscr.getch()
-
-                # Clear screen & reprint menu
-                print_menu(current_row)
-
-            # Option 1 -> Check Email
-            # Option 2 -> Get New Jobs
-            # Option 3 -> Fill Job Info
-            elif current_row in [1, 2, 3]:
-                stdscr.clear()
-                stdscr.addstr(0, 0, "This option is not implemented yet.\n")
-                stdscr.addstr("\nPress any key to return to the menu.")
-                stdscr.refresh()
-                stdscr.getch()
-                print_menu(current_row)
-
-            # Option 4 -> Exit
-            elif current_row == 4:
-                break
-
-        print_menu(current_row)
+    emit("start", command=args.command)
+    started = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            code = args.func(args)
+    except NotionAPIError as e:
+        emit("error", type=type(e).__name__, message=str(e), status=e.status, code=e.code)
+        code = EXIT_FAILED
+    except KeyboardInterrupt:
+        emit("error", type="KeyboardInterrupt", message="interrupted")
+        code = EXIT_INTERRUPTED
+    except Exception as e:
+        emit("error", type=type(e).__name__, message=str(e))
+        code = EXIT_FAILED
+    snapshot = get_default_metrics().snapshot()
+    if snapshot:
+        emit("metrics", endpoints=snapshot)
+    emit("end", command=args.command, exit_code=code, elapsed=time.monotonic() - started)
+    return code
+
 
 if __name__ == "__main__":
     args = parse_args()
-    curses.wrapper(main)
\ No newline at end of file
+    if args.command:
+        sys.exit(run_headless(args))
+
+    import curses
+    from src.utils.menu import main
+    curses.wrapper(main, DATABASE_ID, notion_headers(), test)
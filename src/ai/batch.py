@@ -0,0 +1,344 @@
+"""
+FILE: src/ai/batch.py
+
+DESCRIPTION: Generates many completions at once. Prompts are sent through the
+async OpenAI client with a cap on requests in flight and a tokens-per-minute
+budget, transient failures (rate limits, timeouts, 5xx) are retried with
+backoff, and results are returned as they finish rather than in order. Cached
+and duplicate prompts never reach the API.
+"""
+
+# global imports
+import time
+import queue
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+
+# local imports
+from src.ai.cache import ResponseCache, cache_key, get_default_cache
+from src.ai.completions import DEFAULT_MODEL, LOCAL_PREFIX
+
+# Status codes worth retrying: request timeout, conflict, rate limit and server errors
+TRANSIENT_STATUS = {408, 409, 429}
+TRANSIENT_ERRORS = ("APIConnectionError", "APITimeoutError", "TimeoutError", "ConnectionError")
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class BatchResult:
+    """
+    The outcome of one prompt of a batch; `index` is its position in the input.
+    """
+    __slots__ = ("index", "text", "error", "prompt_tokens", "completion_tokens", "cached", "attempts", "latency")
+
+    def __init__(self, index, text=None, error=None, prompt_tokens=0, completion_tokens=0, cached=False, attempts=0,
+                 latency=0.0):
+        self.index = index
+        self.text = text
+        self.error = error
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached = cached
+        self.attempts = attempts
+        self.latency = latency
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def as_dict(self) -> dict:
+        result = {name: getattr(self, name) for name in self.__slots__}
+        result["error"] = repr(self.error) if self.error is not None else None
+        return result
+
+    def __repr__(self):
+        state = "cached" if self.cached else ("ok" if self.ok else f"error={self.error!r}")
+        return f"BatchResult(index={self.index}, {state}, attempts={self.attempts})"
+
+
+def estimate_tokens(messages, max_tokens) -> int:
+    """
+    The tokens a request counts against the rate limit: its prompt (estimated from
+    its length) plus the completion tokens it may produce.
+    """
+    prompt = sum(len(message.get("content") or "") // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+                 for message in messages)
+    return prompt + max_tokens
+
+
+def is_transient(error) -> bool:
+    """
+    Whether a failed request may succeed if sent again.
+    """
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in TRANSIENT_STATUS or status >= 500
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError)) or type(error).__name__ in TRANSIENT_ERRORS
+
+
+def retry_after(error):
+    """
+    Seconds the server asked to wait before retrying (Retry-After header), or None.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Tokens-per-minute budget: up to a minute's worth of tokens can be spent at once,
+    and the budget refills continuously. Used from a single event loop.
+    """
+
+    def __init__(self, tokens_per_minute):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens):
+        """
+        Waits until `tokens` are available and spends them.
+        """
+        # A request larger than the whole budget still has to go through eventually
+        tokens = min(tokens, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def adjust(self, tokens):
+        """
+        Adds tokens to (negative) or takes them from the budget, e.g. to refund a rejected request.
+        """
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - tokens)
+
+
+class BatchGenerator:
+    """
+    Runs many chat completions concurrently within rate limits.
+
+    sample usage:
+        generator = BatchGenerator(concurrency=8, tokens_per_minute=200_000, temperature=0.2)
+        for result in generator.stream(messages_per_email):
+            print(result.index, result.text if result.ok else result.error)
+    """
+
+    def __init__(self, model=DEFAULT_MODEL, concurrency=8, tokens_per_minute=200_000, max_retries=5, backoff=0.5,
+                 max_backoff=30.0, cache=None, use_cache=True, client=None, base_url=None, api_key=None, timeout=60.0,
+                 default_max_tokens=512, **params):
+        """
+        :param model: (Optional) The model name.
+        :param concurrency: (Optional) Requests in flight at once.
+        :param tokens_per_minute: (Optional) Token budget (prompt + max_tokens per request).
+        :param max_retries: (Optional) Retries of a prompt after a transient failure.
+        :param backoff: (Optional) First retry delay in seconds; doubled for each further retry.
+        :param max_backoff: (Optional) Longest retry delay in seconds.
+        :param cache: (Optional) The ResponseCache to use; the process-wide cache by default.
+        :param use_cache: (Optional) Set to False to always call the model (replies are still stored).
+        :param client: (Optional) An AsyncOpenAI client; one is created for each run by default.
+        :param base_url: (Optional) API base URL for the created client, e.g. a local fake_openai server.
+        :param api_key: (Optional) API key for the created client; OPENAI_API_KEY by default.
+        :param timeout: (Optional) Seconds before a request is abandoned (and retried).
+        :param default_max_tokens: (Optional) Completion tokens budgeted when max_tokens is not given.
+        :param params: Generation parameters passed to the API (temperature, max_tokens, ...).
+        """
+        self.model = model
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cache = cache
+        self.use_cache = use_cache
+        self.client = client
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_tokens = params.get("max_tokens") or params.get("max_completion_tokens") or default_max_tokens
+        self.params = params
+
+    def _create_client(self):
+        try:
+            from openai import AsyncOpenAI
+        except ImportError as e:
+            raise ImportError("Batch generation needs the openai package: pip install openai") from e
+        # Retries are done here, where they also respect the token budget
+        return AsyncOpenAI(base_url=self.base_url, api_key=self.api_key, timeout=self.timeout, max_retries=0)
+
+    async def _generate(self, client, semaphore, key, messages):
+        cache = self.cache or get_default_cache()
+        estimate = estimate_tokens(messages, self.max_tokens)
+        started = time.monotonic()
+        attempts = 0
+        async with semaphore:
+            while True:
+                attempts += 1
+                await self.bucket.acquire(estimate)
+                try:
+                    response = await client.chat.completions.create(model=self.model, messages=messages, **self.params)
+                except Exception as e:
+                    # A rejected or failed request did not use its tokens
+                    self.bucket.adjust(-estimate)
+                    if not is_transient(e) or attempts > self.max_retries:
+                        return BatchResult(None, error=e, attempts=attempts, latency=time.monotonic() - started)
+                    delay = retry_after(e)
+                    if delay is None:
+                        delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+                    await asyncio.sleep(delay)
+                    continue
+                # The rate limit counts max_tokens, not the completion's length, so nothing is refunded
+                text = response.choices[0].message.content or ""
+                usage = response.usage
+                prompt_tokens = usage.prompt_tokens if usage else 0
+                completion_tokens = usage.completion_tokens if usage else 0
+                cache.put(key, self.model, text, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+                return BatchResult(None, text, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                   attempts=attempts, latency=time.monotonic() - started)
+
+    async def astream(self, requests):
+        """
+        Async generator of BatchResults, in the order they finish.
+
+        :param requests: Iterable of chat message lists, one per prompt.
+        """
+        cache = self.cache or get_default_cache()
+        pending = {}  # key -> (messages, [indexes]); identical prompts are sent once
+        for index, messages in enumerate(requests):
+            key = cache_key(self.model, messages, **self.params)
+            if key in pending:
+                pending[key][1].append(index)
+                continue
+            text = cache.get(key) if self.use_cache else None
+            if text is not None:
+                yield BatchResult(index, text, cached=True)
+                continue
+            pending[key] = (messages, [index])
+        if not pending:
+            return
+
+        client = self.client or self._create_client()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def generate(key, messages, indexes):
+            return indexes, await self._generate(client, semaphore, key, messages)
+
+        tasks = [asyncio.ensure_future(generate(key, messages, indexes))
+                 for key, (messages, indexes) in pending.items()]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                indexes, result = await finished
+                for i, index in enumerate(indexes):
+                    yield BatchResult(index, result.text, result.error, result.prompt_tokens,
+                                      result.completion_tokens, cached=i > 0, attempts=result.attempts,
+                                      latency=result.latency)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.client is None:
+                await client.close()
+
+    def stream(self, requests):
+        """
+        Generator of BatchResults, in the order they finish, for synchronous callers.
+        The requests run on an event loop in a background thread.
+
+        :param requests: Iterable of chat message lists, one per prompt.
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        done = object()
+
+        async def pump():
+            async for result in self.astream(requests):
+                results.put(result)
+                if stop.is_set():
+                    break
+
+        def run():
+            try:
+                asyncio.run(pump())
+            except BaseException as e:
+                results.put(e)
+            finally:
+                results.put(done)
+
+        thread = threading.Thread(target=run, name="batch-generator", daemon=True)
+        thread.start()
+        try:
+            while (item := results.get()) is not done:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+    def run(self, requests) -> list:
+        """
+        :return: The BatchResults, in the order of `requests`.
+        """
+        return sorted(self.stream(requests), key=lambda result: result.index)
+
+
+def get_batch_generator(model=DEFAULT_MODEL, concurrency=8, tokens_per_minute=200_000, **kwargs):
+    """
+    A BatchGenerator for a hosted model, or a LocalGenerator for "local:<name>"; both
+    have stream() and run(). The concurrency and token budget only apply to hosted models.
+    """
+    if model.startswith(LOCAL_PREFIX):
+        from src.ai.local import LocalGenerator
+
+        return LocalGenerator(model[len(LOCAL_PREFIX):], **kwargs)
+    return BatchGenerator(model=model, concurrency=concurrency, tokens_per_minute=tokens_per_minute, **kwargs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure batch generation against the local fake endpoint.")
+    parser.add_argument('--prompts', type=int, default=100, help="Number of prompts.")
+    parser.add_argument('--latency', type=float, default=0.5, help="Seconds each fake completion takes.")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32], help="Concurrency levels to compare.")
+    parser.add_argument('--tpm', type=int, default=1_000_000, help="Tokens-per-minute budget.")
+    parser.add_argument('--rate_limit_every', type=int, default=0, help="Have the fake reject every Nth request.")
+
+    args = parser.parse_args()
+
+    from src.ai.fake_openai import start_server
+
+    prompts = [[{"role": "user", "content": f"Email {i}: we would like to schedule an interview next week."}]
+               for i in range(args.prompts)]
+    for concurrency in args.concurrency:
+        server, base_url = start_server(latency=args.latency, rate_limit_every=args.rate_limit_every)
+        with tempfile.TemporaryDirectory() as tmp, ResponseCache(f"{tmp}/cache.sqlite3") as cache:
+            generator = BatchGenerator(concurrency=concurrency, tokens_per_minute=args.tpm, cache=cache,
+                                       base_url=base_url, api_key="test", backoff=0.05, max_tokens=128)
+            started = time.perf_counter()
+            first = None
+            results = []
+            for result in generator.stream(prompts):
+                first = first or time.perf_counter() - started
+                results.append(result)
+            elapsed = time.perf_counter() - started
+        server.shutdown()
+        failed = sum(not result.ok for result in results)
+        print(f"concurrency {concurrency:>3}: {elapsed:7.2f}s total, first result after {first:.2f}s, "
+              f"{len(results) / elapsed:6.1f} prompts/s, {failed} failed, server {server.state.counters()}")
+
+# sample use:
+# python -m src.ai.batch --prompts 200 --latency 0.5 --concurrency 1 8 32
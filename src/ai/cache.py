@@ -0,0 +1,288 @@
+"""
+FILE: src/ai/cache.py
+
+DESCRIPTION: A persistent cache of model responses. Responses are keyed by a
+hash of the model, the generation parameters and the normalized prompt, so a
+repeated recruiter template or application question is answered from disk
+(or memory) instead of spending tokens. The store is SQLite with TTL expiry
+and LRU eviction by entry count and total size, and keeps hit/token stats.
+"""
+
+# global imports
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+import unicodedata
+from collections import OrderedDict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key BLOB PRIMARY KEY,
+    model TEXT,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    response TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+BLANK_LINES = re.compile(r"\n{3,}")
+TRAILING_SPACE = re.compile(r"[ \t]+\n")
+
+
+def normalize_prompt(text) -> str:
+    """
+    Normalizes text that should not change the answer: Unicode form, line endings,
+    trailing spaces and runs of blank lines, and surrounding whitespace.
+    """
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = TRAILING_SPACE.sub("\n", text)
+    return BLANK_LINES.sub("\n\n", text).strip()
+
+
+def cache_key(model, messages, **params) -> bytes:
+    """
+    A 16-byte key for a chat completion request.
+
+    :param model: The model name.
+    :param messages: Chat messages ({"role", "content"}); contents are normalized.
+    :param params: Generation parameters that change the answer (temperature, max_tokens, ...).
+    """
+    canonical = {
+        "model": model,
+        "messages": [{"role": message["role"], "content": normalize_prompt(message["content"])} for message in messages],
+        "params": {name: value for name, value in params.items() if value is not None},
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+class ResponseCache:
+    """
+    Persistent, size-bounded LRU cache of model responses.
+
+    Recent entries are also kept in memory, so a repeated request is answered
+    without touching SQLite; last-used times of hits are written back in batches.
+
+    sample usage:
+        cache = get_default_cache()
+        key = cache_key("gpt-4o-mini", messages, temperature=0.2)
+        text = cache.get(key)
+        if text is None:
+            text = ...  # call the model
+            cache.put(key, "gpt-4o-mini", text, prompt_tokens=812, completion_tokens=164)
+        print(cache.stats())
+    """
+
+    def __init__(self, path="data/llm_cache.sqlite3", max_entries=10000, max_bytes=50 << 20, ttl=30 * 86400,
+                 memory_entries=512, flush_every=64):
+        """
+        :param path: Location of the SQLite file.
+        :param max_entries: Entries kept before the least recently used are evicted.
+        :param max_bytes: Total response size kept before the least recently used are evicted.
+        :param ttl: Seconds after which an entry expires; None to keep entries until evicted.
+        :param memory_entries: Entries also kept in memory for the fastest hits.
+        :param flush_every: Hits buffered before their last-used times and counters are written.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.flush_every = flush_every
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # A lost write only costs a cache miss, so do not fsync on every commit
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.RLock()
+        self.memory = OrderedDict()  # key -> (response, created, tokens)
+        self.touched = {}  # key -> last_used, not yet written
+        self.counters = {"lookups": 0, "hits": 0, "misses": 0, "tokens_saved": 0, "evicted": 0, "expired": 0}
+        self.pending = dict.fromkeys(self.counters, 0)  # counters not yet added to the stats table
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _expired(self, created, now):
+        return self.ttl is not None and now - created > self.ttl
+
+    def _count(self, name, amount=1):
+        self.counters[name] += amount
+        self.pending[name] += amount
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        :param key: From cache_key.
+        :return: The cached response text, or None on a miss (or an expired entry).
+        """
+        now = time.time()
+        with self.lock:
+            self._count("lookups")
+            entry = self.memory.get(key)
+            if entry is None:
+                row = self.conn.execute("SELECT response, created, prompt_tokens + completion_tokens FROM responses "
+                                        "WHERE key = ?", (key,)).fetchone()
+                entry = tuple(row) if row else None
+            if entry is not None and self._expired(entry[1], now):
+                self.memory.pop(key, None)
+                self.touched.pop(key, None)
+                with self.conn:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count("expired")
+                entry = None
+            if entry is None:
+                self._count("misses")
+                return None
+            self._remember(key, entry)
+            self.touched[key] = now
+            self._count("hits")
+            self._count("tokens_saved", entry[2])
+            if len(self.touched) >= self.flush_every:
+                self.flush()
+            return entry[0]
+
+    def put(self, key, model, response, prompt_tokens=0, completion_tokens=0):
+        """
+        Stores a response, then evicts the least recently used entries beyond the limits.
+        A response larger than max_bytes is not cached (an older one for the key is dropped).
+        """
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self.lock:
+            self.flush()
+            if size > self.max_bytes:
+                # It would be evicted at once, and only linger in memory
+                self.memory.pop(key, None)
+                with self.conn:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, created, last_used, hits, size, prompt_tokens, "
+                    "completion_tokens, response) VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                    (key, model, now, now, size, prompt_tokens, completion_tokens, response))
+                self._evict()
+            self._remember(key, (response, now, prompt_tokens + completion_tokens))
+
+    def _evict(self):
+        if self.ttl is not None:
+            cursor = self.conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            self._count("expired", cursor.rowcount)
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            count -= 1
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        for (key,) in evicted:
+            self.memory.pop(key, None)
+        self._count("evicted", len(evicted))
+
+    def flush(self):
+        """
+        Writes buffered last-used times, hit counts and stats.
+        """
+        with self.lock:
+            if not self.touched and not any(self.pending.values()):
+                return
+            with self.conn:
+                self.conn.executemany("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                                      [(last_used, key) for key, last_used in self.touched.items()])
+                self.conn.executemany(
+                    "INSERT INTO stats (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+                    [(name, amount, amount) for name, amount in self.pending.items() if amount])
+            self.touched.clear()
+            self.pending = dict.fromkeys(self.counters, 0)
+
+    def stats(self, lifetime=False) -> dict:
+        """
+        :param lifetime: (Optional) Totals over every run, instead of since this cache was opened.
+        :return: Counters (lookups, hits, misses, tokens_saved, evicted, expired), the hit rate,
+                 and the current number of entries and bytes.
+        """
+        with self.lock:
+            if lifetime:
+                self.flush()
+                counters = dict.fromkeys(self.counters, 0)
+                counters.update(self.conn.execute("SELECT name, value FROM stats"))
+            else:
+                counters = dict(self.counters)
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        counters["hit_rate"] = counters["hits"] / counters["lookups"] if counters["lookups"] else 0.0
+        counters["entries"] = entries
+        counters["bytes"] = size
+        return counters
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            self.touched.clear()
+            with self.conn:
+                self.conn.execute("DELETE FROM responses")
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ResponseCache:
+    """
+    Returns the process-wide response cache used by the generation functions.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Show or clear the model response cache.")
+    parser.add_argument('--path', type=str, default="data/llm_cache.sqlite3", help="Location of the cache.")
+    parser.add_argument('--clear', action='store_true', help="Delete every cached response.")
+
+    args = parser.parse_args()
+
+    with ResponseCache(args.path) as cache:
+        if args.clear:
+            cache.clear()
+        for name, value in cache.stats(lifetime=True).items():
+            print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
+
+# sample use:
+# python -m src.ai.cache
@@ -0,0 +1,64 @@
+"""
+FILE: src/ai/completions.py
+
+DESCRIPTION: The hosted chat-completion call shared by the generation helpers.
+The OpenAI client is only imported and created on first use, and every
+request goes through the response cache (src/ai/cache.py) first.
+"""
+
+# global imports
+import functools
+
+# local imports
+from src.ai.cache import cache_key, get_default_cache
+
+DEFAULT_MODEL = "gpt-4o-mini"
+# Models named "local:<name>" run on the local transformers backend (src/ai/local.py)
+LOCAL_PREFIX = "local:"
+
+
+@functools.lru_cache(maxsize=None)
+def get_openai_client():
+    """
+    Returns a process-wide OpenAI client; the API key is read from OPENAI_API_KEY.
+
+    :raises ImportError: If the openai package is not installed.
+    """
+    try:
+        from openai import OpenAI
+    except ImportError as e:
+        raise ImportError("Text generation needs the openai package: pip install openai") from e
+    return OpenAI()
+
+
+def complete(messages, model=DEFAULT_MODEL, cache=None, client=None, use_cache=True, **params) -> str:
+    """
+    Returns the model's reply to a chat, from the cache when the same model, parameters
+    and (normalized) prompt were answered before.
+
+    :param messages: Chat messages, e.g. [{"role": "user", "content": "..."}].
+    :param model: (Optional) The model name; "local:<name>" runs a local model instead (client is then unused).
+    :param cache: (Optional) The ResponseCache to use; the process-wide cache by default.
+    :param client: (Optional) An OpenAI client; the process-wide client by default.
+    :param use_cache: (Optional) Set to False to always call the model (the reply is still stored).
+    :param params: Generation parameters passed to the API (temperature, max_tokens, ...).
+    :return: The reply text.
+    """
+    if model.startswith(LOCAL_PREFIX):
+        from src.ai.local import LocalGenerator
+
+        generator = LocalGenerator(model[len(LOCAL_PREFIX):], cache=cache)
+        return generator.complete(messages, use_cache=use_cache, **params)
+    cache = cache or get_default_cache()
+    key = cache_key(model, messages, **params)
+    if use_cache:
+        text = cache.get(key)
+        if text is not None:
+            return text
+    client = client or get_openai_client()
+    response = client.chat.completions.create(model=model, messages=messages, **params)
+    text = response.choices[0].message.content or ""
+    usage = response.usage
+    cache.put(key, model, text, prompt_tokens=usage.prompt_tokens if usage else 0,
+              completion_tokens=usage.completion_tokens if usage else 0)
+    return text
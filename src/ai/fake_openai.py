@@ -0,0 +1,232 @@
+"""
+FILE: src/ai/fake_openai.py
+
+DESCRIPTION: A local stand-in for the OpenAI chat completions endpoint. It
+answers POST /v1/chat/completions with deterministic replies after a
+configurable latency, counts tokens the way the hosted API reports them, and
+can inject rate limits (429 with Retry-After) and server errors, so the batch
+generator can be run and measured offline.
+"""
+
+# global imports
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class FakeOpenAI:
+    """
+    Behaviour and counters of the fake endpoint.
+    """
+
+    def __init__(self, latency=0.2, jitter=0.0, error_every=0, rate_limit_every=0, tokens_per_minute=None,
+                 retry_after=0.1, seed=0):
+        """
+        :param latency: Seconds each completion takes.
+        :param jitter: (Optional) Up to this many seconds are added at random to each completion.
+        :param error_every: (Optional) Every Nth request fails with a 500 (0 for never).
+        :param rate_limit_every: (Optional) Every Nth request is rejected with a 429 (0 for never).
+        :param tokens_per_minute: (Optional) Reject requests with a 429 when their tokens (prompt + max_tokens)
+                                  exceed the budget, a bucket of this size refilled continuously.
+        :param retry_after: (Optional) Seconds sent in the Retry-After header of 429 responses.
+        :param seed: (Optional) Seed for the jitter.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_every = error_every
+        self.rate_limit_every = rate_limit_every
+        self.tokens_per_minute = tokens_per_minute
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.budget = float(tokens_per_minute or 0)
+        self.budget_updated = time.monotonic()
+        self.requests = 0
+        self.completed = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def admit(self, tokens):
+        """
+        Counts a request and decides its fate.
+
+        :return: None to serve it, or (status, message) to reject it.
+        """
+        with self.lock:
+            self.requests += 1
+            n = self.requests
+            if self.rate_limit_every and n % self.rate_limit_every == 0:
+                self.rate_limited += 1
+                return 429, "Rate limit reached for requests"
+            if self.error_every and n % self.error_every == 0:
+                self.errors += 1
+                return 500, "The server had an error while processing your request"
+            if self.tokens_per_minute:
+                now = time.monotonic()
+                self.budget = min(self.tokens_per_minute,
+                                  self.budget + (now - self.budget_updated) * self.tokens_per_minute / 60)
+                self.budget_updated = now
+                if tokens > self.budget:
+                    self.rate_limited += 1
+                    return 429, "Rate limit reached for tokens per min (TPM)"
+                self.budget -= tokens
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return None
+
+    def delay(self):
+        with self.lock:
+            return self.latency + (self.rng.random() * self.jitter if self.jitter else 0.0)
+
+    def finish(self, prompt_tokens, completion_tokens):
+        with self.lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def counters(self) -> dict:
+        with self.lock:
+            return {"requests": self.requests, "completed": self.completed, "errors": self.errors,
+                    "rate_limited": self.rate_limited, "max_in_flight": self.max_in_flight,
+                    "prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens}
+
+
+def make_reply(messages) -> str:
+    """
+    A deterministic reply that identifies the prompt it answers.
+    """
+    last = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    first_line = " ".join(last.split())[:60]
+    return f"Thank you for your message about \"{first_line}\". I will follow up shortly."
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """
+    Serves /v1/chat/completions over HTTP/1.1 keep-alive.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        # Keep benchmarks quiet
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, headers=None):
+        kind = "rate_limit_exceeded" if status == 429 else "server_error"
+        self._send_json(status, {"error": {"message": message, "type": kind, "param": None, "code": kind}}, headers)
+
+    def do_POST(self):
+        state = self.server.state
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if urlsplit(self.path).path.rstrip("/") != "/v1/chat/completions":
+            self._error(404, f"Unknown endpoint {self.path}")
+            return
+        try:
+            request = json.loads(raw)
+            messages = request["messages"]
+            model = request["model"]
+        except (ValueError, KeyError, TypeError):
+            self._error(400, "Expected a JSON body with model and messages")
+            return
+        prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+        max_tokens = request.get("max_tokens") or request.get("max_completion_tokens") or 256
+        rejected = state.admit(prompt_tokens + max_tokens)
+        if rejected is not None:
+            status, message = rejected
+            headers = {"Retry-After": f"{state.retry_after:g}"} if status == 429 else None
+            self._error(status, message, headers)
+            return
+        time.sleep(state.delay())
+        reply = make_reply(messages)
+        completion_tokens = min(count_tokens(reply), max_tokens)
+        state.finish(prompt_tokens, completion_tokens)
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The batch generator opens many connections at once
+    request_queue_size = 128
+
+
+def start_server(host="127.0.0.1", port=0, state=None, **state_kwargs):
+    """
+    Starts the fake endpoint on a background thread.
+
+    :param host: Interface to bind to.
+    :param port: Port to bind to, 0 picks a free one.
+    :param state: (Optional) A FakeOpenAI to serve, built from `state_kwargs` when not given.
+    :param state_kwargs: Arguments for FakeOpenAI, e.g. latency=0.5, rate_limit_every=10.
+    :return: A tuple (server, base_url); base_url (ending in /v1) is passed to the OpenAI client,
+             and the FakeOpenAI is available as server.state.
+
+    sample usage:
+        server, base_url = start_server(latency=0.3)
+        results = BatchGenerator(base_url=base_url, api_key="test").run(prompts)
+        server.shutdown()
+    """
+    server = FakeOpenAIServer((host, port), FakeOpenAIHandler)
+    server.state = state or FakeOpenAI(**state_kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the OpenAI chat completions endpoint.")
+    parser.add_argument('--port', type=int, default=8767, help="Port to listen on.")
+    parser.add_argument('--latency', type=float, default=0.5, help="Seconds each completion takes.")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many seconds added at random.")
+    parser.add_argument('--error_every', type=int, default=0, help="Fail every Nth request with a 500.")
+    parser.add_argument('--rate_limit_every', type=int, default=0, help="Reject every Nth request with a 429.")
+    parser.add_argument('--tpm', type=int, default=None, help="Tokens per minute accepted before 429s.")
+
+    args = parser.parse_args()
+
+    server, base_url = start_server(port=args.port, latency=args.latency, jitter=args.jitter,
+                                    error_every=args.error_every, rate_limit_every=args.rate_limit_every,
+                                    tokens_per_minute=args.tpm)
+    print(f"Fake OpenAI endpoint at {base_url} (set OPENAI_BASE_URL={base_url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(server.state.counters())
+
+# sample use:
+# python -m src.ai.fake_openai --latency 0.5 --rate_limit_every 10
@@ -1,14 +1,64 @@
 """
-FILE: src/ai/gen_email.py
+FILE: src/ai/gen_app.py
 
-DESCRIPTION: Utility functions for generating job-application-related
-emails or replies using GPT-based APIs.
+DESCRIPTION: Utility functions for generating answers to job application
+questions using GPT-based APIs.
 """
 
-def generate_email_response(email_text):
+# local imports
+from src.ai.completions import DEFAULT_MODEL, complete
+from src.utils.lazy import lazy_import
+
+# asyncio and the batch machinery are only imported for batch runs
+batch = lazy_import("src.ai.batch")
+
+APPLICATION_SYSTEM_PROMPT = (
+    "You help a candidate fill in job applications. Answer the application question "
+    "concisely, in the first person, using only the candidate profile and job description given."
+)
+
+
+def application_messages(question, job_description="", profile="") -> list:
+    prompt = f"Candidate profile:\n{profile}\n\nJob description:\n{job_description}\n\nQuestion:\n{question}"
+    return [
+        {"role": "system", "content": APPLICATION_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def generate_application_answer(question, job_description="", profile="", model=DEFAULT_MODEL, cache=None,
+                                client=None, **params):
     """
-    Stub function for GPT-3 or GPT-4 based email response generation.
+    Generates an answer to an application question. The same question for the same job
+    and profile is answered from the response cache without calling the model.
+
+    :param question: The application question, e.g. "Why do you want to work here?".
+    :param job_description: (Optional) The posting's description.
+    :param profile: (Optional) The candidate's background (resume text, notes).
+    :param model: (Optional) The model name.
+    :param cache: (Optional) The ResponseCache to use.
+    :param client: (Optional) An OpenAI client.
+    :param params: Generation parameters passed to the API (temperature, max_tokens, ...).
+    :return: The answer text.
+    """
+    messages = application_messages(question, job_description, profile)
+    return complete(messages, model=model, cache=cache, client=client, **params)
+
+
+def generate_application_answers(questions, job_description="", profile="", model=DEFAULT_MODEL, concurrency=8,
+                                 tokens_per_minute=200_000, **kwargs):
+    """
+    Answers all the questions of an application concurrently (see BatchGenerator, or
+    LocalGenerator for "local:<name>" models), yielding the answers as they finish.
+
+    :param questions: Iterable of application questions.
+    :param job_description: (Optional) The posting's description.
+    :param profile: (Optional) The candidate's background (resume text, notes).
+    :param model: (Optional) The model name.
+    :param concurrency: (Optional) Requests in flight at once.
+    :param tokens_per_minute: (Optional) Token budget of the account.
+    :param kwargs: Further generator options and generation parameters.
+    :return: Generator of BatchResults; result.index is the question's position in `questions`.
     """
-    print("Stub: Generating email response using GPT-based model.")
-    # Add your actual logic for generating the text
-    return "Sample Email Reply"
+    generator = batch.get_batch_generator(model, concurrency, tokens_per_minute, **kwargs)
+    return generator.stream(application_messages(question, job_description, profile) for question in questions)
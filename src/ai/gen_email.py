@@ -4,10 +4,53 @@ DESCRIPTION: Utility functions for generating job-application-related
 emails or replies using GPT-based APIs.
 """
 
-def generate_email_response(email_text):
+# local imports
+from src.ai.completions import DEFAULT_MODEL, complete
+from src.utils.lazy import lazy_import
+
+# asyncio and the batch machinery are only imported for batch runs
+batch = lazy_import("src.ai.batch")
+
+EMAIL_SYSTEM_PROMPT = (
+    "You write short, polite and professional replies to emails about job applications "
+    "(recruiter outreach, interview scheduling, rejections and offers). Reply with the email body only."
+)
+
+
+def email_messages(email_text) -> list:
+    return [
+        {"role": "system", "content": EMAIL_SYSTEM_PROMPT},
+        {"role": "user", "content": email_text},
+    ]
+
+
+def generate_email_response(email_text, model=DEFAULT_MODEL, cache=None, client=None, **params):
     """
-    Stub function for GPT-3 or GPT-4 based email response generation.
+    Generates a reply to an email. Identical emails (up to whitespace) are answered
+    from the response cache without calling the model.
+
+    :param email_text: The email to reply to.
+    :param model: (Optional) The model name.
+    :param cache: (Optional) The ResponseCache to use.
+    :param client: (Optional) An OpenAI client.
+    :param params: Generation parameters passed to the API (temperature, max_tokens, ...).
+    :return: The reply text.
+    """
+    return complete(email_messages(email_text), model=model, cache=cache, client=client, **params)
+
+
+def generate_email_responses(emails, model=DEFAULT_MODEL, concurrency=8, tokens_per_minute=200_000, **kwargs):
+    """
+    Generates replies to many emails concurrently (see BatchGenerator, or LocalGenerator
+    for "local:<name>" models) and yields them as they finish, so a backlog takes about
+    as long as its slowest few replies.
+
+    :param emails: Iterable of email texts.
+    :param model: (Optional) The model name.
+    :param concurrency: (Optional) Requests in flight at once.
+    :param tokens_per_minute: (Optional) Token budget of the account.
+    :param kwargs: Further generator options and generation parameters.
+    :return: Generator of BatchResults; result.index is the email's position in `emails`.
     """
-    print("Stub: Generating email response using GPT-based model.")
-    # Add your actual logic for generating the text
-    return "Sample Email Reply"
+    generator = batch.get_batch_generator(model, concurrency, tokens_per_minute, **kwargs)
+    return generator.stream(email_messages(email_text) for email_text in emails)
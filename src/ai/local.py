@@ -0,0 +1,243 @@
+"""
+FILE: src/ai/local.py
+
+DESCRIPTION: A local, CPU-only alternative to the hosted model for cheap tasks
+(classifying emails, tagging designation or location). A small transformers
+model is loaded on first use and kept for the rest of the process, and prompts
+are run in padded micro-batches of similar length. The API matches the hosted
+path: complete() returns a reply and stream()/run() return BatchResults, so a
+caller picks the backend with the model name ("local:<model>").
+"""
+
+# global imports
+import time
+import argparse
+import tempfile
+import threading
+
+# local imports
+from src.ai.batch import BatchResult
+from src.ai.cache import ResponseCache, cache_key, get_default_cache
+
+DEFAULT_LOCAL_MODEL = "google/flan-t5-small"
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def load_model(name):
+    """
+    Imports torch/transformers and loads a model and its tokenizer, once per process;
+    later calls return the same warm copy.
+
+    :param name: A Hugging Face model name or directory.
+    :return: A tuple (torch, tokenizer, model, lock); the lock serializes use of the model.
+    :raises ImportError: If torch or transformers is not installed.
+    """
+    with _models_lock:
+        if name in _models:
+            return _models[name]
+        try:
+            import torch
+            from transformers import AutoConfig, AutoModelForCausalLM, AutoModelForSeq2SeqLM, AutoTokenizer
+        except ImportError as e:
+            raise ImportError("The local backend needs torch and transformers: "
+                              "pip install torch --index-url https://download.pytorch.org/whl/cpu transformers") from e
+        config = AutoConfig.from_pretrained(name)
+        tokenizer = AutoTokenizer.from_pretrained(name)
+        if config.is_encoder_decoder:
+            model = AutoModelForSeq2SeqLM.from_pretrained(name)
+        else:
+            model = AutoModelForCausalLM.from_pretrained(name)
+            # Generation continues after the prompt, so prompts are aligned to the right
+            tokenizer.padding_side = "left"
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+        model.eval()
+        _models[name] = (torch, tokenizer, model, threading.Lock())
+        return _models[name]
+
+
+class LocalGenerator:
+    """
+    Chat completions from a local transformers model, batched for throughput.
+    Generators are cheap: the model itself is loaded once per process and shared.
+
+    sample usage:
+        generator = LocalGenerator("google/flan-t5-small", batch_size=16)
+        label = generator.complete([{"role": "user", "content": "Is this a rejection? ..."}], max_tokens=4)
+        for result in generator.stream(messages_per_email):
+            print(result.index, result.text)
+    """
+
+    def __init__(self, model=DEFAULT_LOCAL_MODEL, batch_size=16, threads=None, cache=None, use_cache=True,
+                 default_max_tokens=64, **params):
+        """
+        :param model: A Hugging Face model name or directory (seq2seq, or causal with a chat template).
+        :param batch_size: (Optional) Prompts per forward pass.
+        :param threads: (Optional) CPU threads used by torch; its default when not given.
+        :param cache: (Optional) The ResponseCache to use; the process-wide cache by default.
+        :param use_cache: (Optional) Set to False to always run the model (replies are still stored).
+        :param default_max_tokens: (Optional) Tokens generated per reply when max_tokens is not given.
+        :param params: Generation parameters, named as in the hosted API (max_tokens, temperature, top_p).
+        """
+        self.model_name = model
+        self.model = f"local:{model}"  # as passed to the hosted path; keeps cache keys apart
+        self.batch_size = batch_size
+        self.threads = threads
+        self.cache = cache
+        self.use_cache = use_cache
+        self.default_max_tokens = default_max_tokens
+        self.params = params
+
+    def load(self):
+        """
+        Loads the model on first use (see load_model).
+        """
+        torch, tokenizer, model, lock = load_model(self.model_name)
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        return torch, tokenizer, model, lock
+
+    def prompt(self, messages) -> str:
+        """
+        Turns chat messages into the model's input text.
+        """
+        _, tokenizer, model, _ = self.load()
+        if not model.config.is_encoder_decoder and getattr(tokenizer, "chat_template", None):
+            return tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        return "\n\n".join(message["content"] for message in messages)
+
+    def _generation_kwargs(self, params):
+        max_tokens = params.get("max_tokens") or params.get("max_completion_tokens") or self.default_max_tokens
+        kwargs = {"max_new_tokens": max_tokens}
+        temperature = params.get("temperature")
+        if temperature:
+            kwargs.update(do_sample=True, temperature=temperature, top_p=params.get("top_p") or 1.0)
+        else:
+            kwargs["do_sample"] = False
+        return kwargs
+
+    def generate(self, prompts, **params) -> list:
+        """
+        Runs one padded batch of prompt texts.
+
+        :return: A list of (text, prompt_tokens, completion_tokens), in the order of `prompts`.
+        """
+        torch, tokenizer, model, lock = self.load()
+        # Fast tokenizers cannot be used from two threads at once, and torch already uses every core
+        with lock, torch.inference_mode():
+            inputs = tokenizer(prompts, return_tensors="pt", padding=True, truncation=True)
+            output = model.generate(**inputs, **self._generation_kwargs({**self.params, **params}),
+                                    pad_token_id=tokenizer.pad_token_id)
+            if not model.config.is_encoder_decoder:
+                # Causal models return the prompt followed by the reply
+                output = output[:, inputs["input_ids"].shape[1]:]
+            texts = tokenizer.batch_decode(output, skip_special_tokens=True)
+        prompt_tokens = inputs["attention_mask"].sum(dim=1).tolist()
+        completion_tokens = (output != tokenizer.pad_token_id).sum(dim=1).tolist()
+        return [(text.strip(), prompt, completion)
+                for text, prompt, completion in zip(texts, prompt_tokens, completion_tokens)]
+
+    def complete(self, messages, cache=None, use_cache=None, **params) -> str:
+        """
+        The reply to one chat, like completions.complete.
+        """
+        cache = cache or self.cache or get_default_cache()
+        use_cache = self.use_cache if use_cache is None else use_cache
+        params = {**self.params, **params}
+        key = cache_key(self.model, messages, **params)
+        if use_cache:
+            text = cache.get(key)
+            if text is not None:
+                return text
+        text, prompt_tokens, completion_tokens = self.generate([self.prompt(messages)], **params)[0]
+        cache.put(key, self.model, text, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        return text
+
+    def stream(self, requests):
+        """
+        Generator of BatchResults, like BatchGenerator.stream. Prompts are sorted by
+        length before batching, so results come out one micro-batch at a time and
+        not in input order.
+
+        :param requests: Iterable of chat message lists, one per prompt.
+        """
+        cache = self.cache or get_default_cache()
+        pending = {}  # key -> (messages, [indexes]); identical prompts are run once
+        for index, messages in enumerate(requests):
+            key = cache_key(self.model, messages, **self.params)
+            if key in pending:
+                pending[key][1].append(index)
+                continue
+            text = cache.get(key) if self.use_cache else None
+            if text is not None:
+                yield BatchResult(index, text, cached=True)
+                continue
+            pending[key] = (messages, [index])
+        if not pending:
+            return
+
+        _, tokenizer, _, lock = self.load()
+        items = [(key, self.prompt(messages), indexes) for key, (messages, indexes) in pending.items()]
+        # Similar lengths in a batch means little padding
+        with lock:
+            lengths = [len(ids) for ids in tokenizer([prompt for _, prompt, _ in items])["input_ids"]]
+        items = [item for _, item in sorted(zip(lengths, items), key=lambda pair: pair[0])]
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            started = time.monotonic()
+            try:
+                outputs = self.generate([prompt for _, prompt, _ in batch])
+            except Exception as e:
+                latency = time.monotonic() - started
+                for _, _, indexes in batch:
+                    for index in indexes:
+                        yield BatchResult(index, error=e, attempts=1, latency=latency)
+                continue
+            latency = time.monotonic() - started
+            for (key, _, indexes), (text, prompt_tokens, completion_tokens) in zip(batch, outputs):
+                cache.put(key, self.model, text, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+                for i, index in enumerate(indexes):
+                    yield BatchResult(index, text, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                      cached=i > 0, attempts=1, latency=latency)
+
+    def run(self, requests) -> list:
+        """
+        :return: The BatchResults, in the order of `requests`.
+        """
+        return sorted(self.stream(requests), key=lambda result: result.index)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure local generation throughput against the batch size.")
+    parser.add_argument('--model', type=str, default=DEFAULT_LOCAL_MODEL, help="Model name or directory.")
+    parser.add_argument('--items', type=int, default=64, help="Prompts per measurement.")
+    parser.add_argument('--batch_sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32], help="Batch sizes to compare.")
+    parser.add_argument('--max_tokens', type=int, default=8, help="Tokens generated per prompt.")
+    parser.add_argument('--threads', type=int, default=None, help="CPU threads for torch.")
+
+    args = parser.parse_args()
+
+    subjects = ["Interview invitation", "Your application status", "Coding challenge", "Offer letter",
+                "Thank you for applying", "Next steps"]
+    prompts = [[{"role": "user", "content": f"Classify this email as interview, rejection, offer or other.\n\n"
+                                            f"Subject: {subjects[i % len(subjects)]} #{i}\n"
+                                            f"Hello, regarding your application {'for the role ' * (i % 5)}number {i}."}]
+               for i in range(args.items)]
+    with tempfile.TemporaryDirectory() as tmp, ResponseCache(f"{tmp}/cache.sqlite3") as cache:
+        generator = LocalGenerator(args.model, threads=args.threads, cache=cache, use_cache=False,
+                                   max_tokens=args.max_tokens)
+        started = time.perf_counter()
+        generator.load()
+        generator.generate([generator.prompt(prompts[0])])
+        print(f"loaded {args.model} in {time.perf_counter() - started:.2f}s")
+        for batch_size in args.batch_sizes:
+            generator.batch_size = batch_size
+            started = time.perf_counter()
+            results = generator.run(prompts)
+            elapsed = time.perf_counter() - started
+            print(f"batch size {batch_size:>3}: {len(results) / elapsed:7.1f} items/s ({elapsed:.2f}s)")
+
+# sample use:
+# python -m src.ai.local --items 128 --batch_sizes 1 8 32
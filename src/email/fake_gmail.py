@@ -0,0 +1,438 @@
+"""
+FILE: src/email/fake_gmail.py
+
+DESCRIPTION: A local stand-in for the parts of the Gmail API the sync uses:
+the profile, message list, message get, history list and the multipart batch
+endpoint. Mailboxes are generated (recruiter emails in threads) or loaded
+from a JSON fixture file, and can be changed while the server runs (deliver,
+delete, relabel, expire history), so incremental syncs can be run and
+measured offline.
+"""
+
+# global imports
+import re
+import json
+import time
+import base64
+import itertools
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Pied Piper"]
+TEMPLATES = [
+    ("Your application to {company}", "Hi,\n\nThank you for applying to the {role} position at {company}. "
+                                      "We have received your application and will be in touch.\n\n{company} Recruiting"),
+    ("Interview invitation: {role}", "Hello,\n\nWe would like to invite you to interview for the {role} role at "
+                                     "{company}. Please pick a time that works for you.\n\nBest,\n{company} Talent"),
+    ("Update on your {company} application", "Hi,\n\nUnfortunately we have decided to move forward with other "
+                                             "candidates for the {role} position.\n\n{company} Recruiting"),
+    ("{company} coding challenge", "Hi,\n\nAs the next step for the {role} role, please complete the attached "
+                                   "coding challenge within 7 days.\n\n{company} Engineering"),
+    ("Offer from {company}", "Congratulations!\n\nWe are pleased to offer you the {role} position at {company}."
+                             "\n\nWarm regards,\n{company} People Team"),
+]
+ROLES = ["Software Engineer", "Data Scientist", "Machine Learning Engineer", "Backend Engineer", "Quant Researcher"]
+# historyTypes query values -> keys of the history records
+HISTORY_KEYS = {"messageAdded": "messagesAdded", "messageDeleted": "messagesDeleted",
+                "labelAdded": "labelsAdded", "labelRemoved": "labelsRemoved"}
+
+
+def _encode(text) -> str:
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def make_mailbox(count=200, seed=0, start=None, thread_every=4):
+    """
+    Generates fixture messages from recruiters, a few hours apart, oldest first.
+
+    :param count: Number of messages.
+    :param seed: Seed for the company, role and template picks.
+    :param start: (Optional) Date of the first message in milliseconds; `count` hours before now by default.
+    :param thread_every: (Optional) Every Nth message replies in the thread of an earlier one (0 for none).
+    :return: A list of dicts for FakeMailbox.deliver.
+    """
+    rng = random.Random(seed)
+    start = start if start is not None else int(time.time() * 1000) - count * 3600 * 1000
+    messages = []
+    for i in range(count):
+        company = rng.choice(COMPANIES)
+        role = rng.choice(ROLES)
+        subject, body = rng.choice(TEMPLATES)
+        message = {
+            "sender": f"{company} Recruiting <recruiting@{company.lower().replace(' ', '')}.example.com>",
+            "subject": subject.format(company=company, role=role),
+            "body": body.format(company=company, role=role),
+            "date": start + i * 3600 * 1000,
+        }
+        if thread_every and i % thread_every == thread_every - 1:
+            earlier = rng.randrange(len(messages))
+            message["thread"] = earlier
+            message["sender"] = messages[earlier]["sender"]
+            message["subject"] = "Re: " + messages[earlier]["subject"].removeprefix("Re: ")
+        messages.append(message)
+    return messages
+
+
+class FakeMailbox:
+    """
+    One mailbox with its history, plus counters of the requests it served.
+    """
+
+    def __init__(self, messages=(), latency=0.0, token="test", email="applicant@example.com", rate_limit_every=0):
+        """
+        :param messages: (Optional) Dicts for `deliver` (see make_mailbox); "thread" may be the index of an
+                         earlier message to reply to.
+        :param latency: (Optional) Seconds added to every HTTP request (a batch counts once).
+        :param token: (Optional) Bearer token the requests must carry; None to accept any.
+        :param email: (Optional) Address of the mailbox.
+        :param rate_limit_every: (Optional) Every Nth call inside a batch is answered with 429 (0 for never).
+        """
+        self.latency = latency
+        self.token = token
+        self.email = email
+        self.rate_limit_every = rate_limit_every
+        self.lock = threading.RLock()
+        self.messages = {}
+        self.history = []
+        self.history_id = 1000
+        self.oldest_history_id = self.history_id
+        self.next_id = 0x18c2a0b000000000
+        self.requests = 0
+        self.batch_requests = 0
+        self.batch_calls = 0
+        self.calls = {}  # endpoint -> count, batched calls included
+        ids = []
+        for message in messages:
+            message = dict(message)
+            thread = message.pop("thread", None)
+            thread_id = self.messages[ids[thread]]["threadId"] if isinstance(thread, int) else thread
+            ids.append(self.deliver(thread_id=thread_id, record=False, **message))
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """
+        Loads a fixture mailbox: a JSON list of {"sender", "subject", "body", "date" (ms), "to",
+        "thread" (index of an earlier message), "labels", "html"}.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    def _change(self, record):
+        self.history_id += 1
+        record["id"] = str(self.history_id)
+        self.history.append(record)
+        return self.history_id
+
+    def deliver(self, sender, subject, body, to=None, date=None, thread_id=None, labels=("INBOX", "UNREAD"),
+                html=False, record=True) -> str:
+        """
+        Adds a message to the mailbox.
+
+        :param html: (Optional) Send the body as text/html only, instead of text/plain and text/html.
+        :param record: (Optional) Record the delivery in the history (fixtures loaded at start are not).
+        :return: The new message ID.
+        """
+        with self.lock:
+            self.next_id += 1
+            message_id = f"{self.next_id:x}"
+            date = date if date is not None else int(time.time() * 1000)
+            html_part = {"mimeType": "text/html", "body": {"data": _encode(
+                "<html><body>" + "".join(f"<p>{line}</p>" for line in body.split("\n")) + "</body></html>")}}
+            parts = [html_part] if html else [{"mimeType": "text/plain", "body": {"data": _encode(body)}}, html_part]
+            message = {
+                "id": message_id,
+                "threadId": thread_id or message_id,
+                "labelIds": list(labels),
+                "snippet": " ".join(body.split())[:100],
+                "internalDate": str(date),
+                "sizeEstimate": len(body) * 2 + 500,
+                "payload": {
+                    "mimeType": "multipart/alternative",
+                    "headers": [
+                        {"name": "From", "value": sender},
+                        {"name": "To", "value": to or self.email},
+                        {"name": "Subject", "value": subject},
+                        {"name": "Date", "value": time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime(date / 1000))},
+                    ],
+                    "parts": parts,
+                },
+            }
+            self.messages[message_id] = message
+            if record:
+                summary = {"id": message_id, "threadId": message["threadId"], "labelIds": list(labels)}
+                message["historyId"] = str(self._change({"messages": [summary], "messagesAdded": [{"message": summary}]}))
+            else:
+                self.history_id += 1
+                self.oldest_history_id = self.history_id
+                message["historyId"] = str(self.history_id)
+            return message_id
+
+    def delete(self, message_id):
+        with self.lock:
+            message = self.messages.pop(message_id)
+            summary = {"id": message_id, "threadId": message["threadId"]}
+            self._change({"messages": [summary], "messagesDeleted": [{"message": summary}]})
+
+    def modify(self, message_id, add=(), remove=()):
+        """
+        Adds and removes labels, e.g. modify(id, remove=["INBOX"]) to archive a message.
+        """
+        with self.lock:
+            message = self.messages[message_id]
+            added = [label for label in add if label not in message["labelIds"]]
+            removed = [label for label in remove if label in message["labelIds"]]
+            message["labelIds"] = [label for label in message["labelIds"] if label not in removed] + added
+            summary = {"id": message_id, "threadId": message["threadId"], "labelIds": list(message["labelIds"])}
+            record = {"messages": [summary]}
+            if added:
+                record["labelsAdded"] = [{"message": summary, "labelIds": added}]
+            if removed:
+                record["labelsRemoved"] = [{"message": summary, "labelIds": removed}]
+            message["historyId"] = str(self._change(record))
+
+    def expire_history(self):
+        """
+        Forgets the history, as Gmail does after about a week: older checkpoints get a 404.
+        """
+        with self.lock:
+            self.history.clear()
+            self.oldest_history_id = self.history_id
+
+    def count(self, endpoint):
+        with self.lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    def counters(self) -> dict:
+        with self.lock:
+            return {"requests": self.requests, "batch_requests": self.batch_requests, "batch_calls": self.batch_calls,
+                    "calls": dict(self.calls), "messages": len(self.messages), "history_id": self.history_id}
+
+    def call(self, method, target):
+        """
+        Answers one API call (directly or from inside a batch).
+
+        :return: A tuple (status, JSON-serializable body).
+        """
+        parts = urlsplit(target)
+        query = parse_qs(parts.query)
+        path = parts.path
+        match = re.fullmatch(r"/gmail/v1/users/([^/]+)(/.*)", path)
+        if method != "GET" or match is None:
+            return 404, error_body(404, f"Unknown endpoint {method} {path}", "notFound")
+        route = match.group(2)
+        with self.lock:
+            if route == "/profile":
+                self.count("profile")
+                return 200, {"emailAddress": self.email, "messagesTotal": len(self.messages),
+                             "threadsTotal": len({m["threadId"] for m in self.messages.values()}),
+                             "historyId": str(self.history_id)}
+            if route == "/messages":
+                self.count("messages.list")
+                return 200, self._list(query)
+            if route.startswith("/messages/"):
+                self.count("messages.get")
+                message = self.messages.get(route[len("/messages/"):])
+                if message is None:
+                    return 404, error_body(404, "Requested entity was not found.", "notFound")
+                return 200, message_resource(message, query.get("format", ["full"])[0])
+            if route == "/history":
+                self.count("history.list")
+                return self._history(query)
+        return 404, error_body(404, f"Unknown endpoint {method} {path}", "notFound")
+
+    def _list(self, query):
+        labels = set(query.get("labelIds", []))
+        matching = [m for m in self.messages.values() if labels <= set(m["labelIds"])]
+        matching.sort(key=lambda m: int(m["internalDate"]), reverse=True)
+        size = min(int(query.get("maxResults", ["100"])[0]), 500)
+        start = int(query.get("pageToken", ["0"])[0])
+        page = matching[start:start + size]
+        body = {"messages": [{"id": m["id"], "threadId": m["threadId"]} for m in page],
+                "resultSizeEstimate": len(matching)}
+        if not page:
+            body.pop("messages")
+        if start + size < len(matching):
+            body["nextPageToken"] = str(start + size)
+        return body
+
+    def _history(self, query):
+        start_history_id = int(query["startHistoryId"][0])
+        if start_history_id < self.oldest_history_id:
+            return 404, error_body(404, "Requested entity was not found.", "notFound")
+        keys = {HISTORY_KEYS[name] for name in query.get("historyTypes", []) if name in HISTORY_KEYS}
+        records = []
+        for record in self.history:
+            if int(record["id"]) <= start_history_id:
+                continue
+            if keys:
+                record = {key: value for key, value in record.items() if key in ("id", "messages") or key in keys}
+                if len(record) == 2:
+                    continue
+            records.append(record)
+        size = min(int(query.get("maxResults", ["100"])[0]), 500)
+        start = int(query.get("pageToken", ["0"])[0])
+        body = {"history": records[start:start + size], "historyId": str(self.history_id)}
+        if not body["history"]:
+            body.pop("history")
+        if start + size < len(records):
+            body["nextPageToken"] = str(start + size)
+        return 200, body
+
+
+def error_body(code, message, reason):
+    return {"error": {"code": code, "message": message, "errors": [{"message": message, "reason": reason}]}}
+
+
+def message_resource(message, message_format):
+    if message_format == "minimal":
+        return {key: value for key, value in message.items() if key != "payload"}
+    if message_format == "metadata":
+        payload = {"mimeType": message["payload"]["mimeType"], "headers": message["payload"]["headers"]}
+        return dict(message, payload=payload)
+    return message
+
+
+class FakeGmailHandler(BaseHTTPRequestHandler):
+    """
+    Serves the fake Gmail API over HTTP/1.1 keep-alive.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        # Keep benchmarks quiet
+        pass
+
+    def _send(self, status, body, content_type="application/json; charset=UTF-8"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _begin(self):
+        """
+        Counts the request, applies the latency and checks the token; False if the request was rejected.
+        """
+        mailbox = self.server.state
+        with mailbox.lock:
+            mailbox.requests += 1
+        if mailbox.latency:
+            time.sleep(mailbox.latency)
+        if mailbox.token is not None and self.headers.get("Authorization") != f"Bearer {mailbox.token}":
+            self._send(401, error_body(401, "Invalid Credentials", "authError"))
+            return False
+        return True
+
+    def do_GET(self):
+        if not self._begin():
+            return
+        status, body = self.server.state.call("GET", self.path)
+        self._send(status, body)
+
+    def do_POST(self):
+        mailbox = self.server.state
+        length = int(self.headers.get("Content-Length") or 0)
+        content = self.rfile.read(length) if length else b""
+        if not self._begin():
+            return
+        if urlsplit(self.path).path != "/batch/gmail/v1":
+            self._send(404, error_body(404, f"Unknown endpoint POST {self.path}", "notFound"))
+            return
+        match = re.search(r'boundary="?([^";]+)"?', self.headers.get("Content-Type", ""))
+        if match is None:
+            self._send(400, error_body(400, "Expected a multipart/mixed body", "badRequest"))
+            return
+        calls = []
+        for part in content.split(b"--" + match.group(1).encode("ascii"))[1:]:
+            if part.startswith(b"--"):
+                break
+            outer, _, inner = part.replace(b"\r\n", b"\n").strip(b"\n").partition(b"\n\n")
+            content_id = re.search(rb"Content-ID:\s*<([^>]+)>", outer, re.IGNORECASE)
+            request_line = inner.split(b"\n", 1)[0].decode("utf-8").split()
+            calls.append((content_id.group(1).decode("ascii") if content_id else str(len(calls)), request_line))
+        if len(calls) > 100:
+            self._send(400, error_body(400, "Too many requests in batch; the limit is 100", "badRequest"))
+            return
+        with mailbox.lock:
+            mailbox.batch_requests += 1
+        boundary = "batch_fake_response"
+        out = []
+        for content_id, request_line in calls:
+            with mailbox.lock:
+                mailbox.batch_calls += 1
+                throttled = mailbox.rate_limit_every and mailbox.batch_calls % mailbox.rate_limit_every == 0
+            if throttled:
+                status, body = 429, error_body(429, "Too many concurrent requests for user", "rateLimitExceeded")
+            elif len(request_line) < 2:
+                status, body = 400, error_body(400, "Malformed request in batch", "badRequest")
+            else:
+                status, body = mailbox.call(request_line[0], request_line[1])
+            reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests"}.get(status, "Error")
+            out.append(f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                       f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n"
+                       f"{json.dumps(body)}\r\n")
+        out.append(f"--{boundary}--\r\n")
+        self._send(200, "".join(out).encode("utf-8"), f"multipart/mixed; boundary={boundary}")
+
+
+def start_server(host="127.0.0.1", port=0, state=None, **state_kwargs):
+    """
+    Starts the fake Gmail API on a background thread.
+
+    :param host: Interface to bind to.
+    :param port: Port to bind to, 0 picks a free one.
+    :param state: (Optional) A FakeMailbox to serve, built from `state_kwargs` when not given.
+    :param state_kwargs: Arguments for FakeMailbox, e.g. messages=make_mailbox(500), latency=0.05.
+    :return: A tuple (server, base_url); base_url is passed to GmailClient, and the
+             FakeMailbox is available as server.state.
+
+    sample usage:
+        server, base_url = start_server(messages=make_mailbox(500))
+        client = GmailClient("test", base_url=base_url)
+        ...
+        server.shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), FakeGmailHandler)
+    server.daemon_threads = True
+    server.state = state or FakeMailbox(**state_kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Gmail API.")
+    parser.add_argument('--port', type=int, default=8768, help="Port to listen on.")
+    parser.add_argument('--mailbox', type=str, help="JSON fixture mailbox to serve instead of a generated one.")
+    parser.add_argument('--messages', type=int, default=500, help="Messages in the generated mailbox.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request.")
+    parser.add_argument('--token', type=str, default="test", help="Bearer token clients must send.")
+    parser.add_argument('--deliver_every', type=float, default=0.0, help="Deliver a new message every N seconds.")
+
+    args = parser.parse_args()
+
+    if args.mailbox:
+        mailbox = FakeMailbox.from_file(args.mailbox, latency=args.latency, token=args.token)
+    else:
+        mailbox = FakeMailbox(make_mailbox(args.messages), latency=args.latency, token=args.token)
+    server, base_url = start_server(port=args.port, state=mailbox)
+    print(f"Fake Gmail API at {base_url} with {len(mailbox.messages)} messages (token: {args.token})")
+    try:
+        for seed in itertools.count(1):
+            if args.deliver_every:
+                time.sleep(args.deliver_every)
+                mailbox.deliver(**make_mailbox(1, seed=seed, start=int(time.time() * 1000))[0])
+            else:
+                threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(mailbox.counters())
+
+# sample use:
+# python -m src.email.fake_gmail --messages 2000 --latency 0.05
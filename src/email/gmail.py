@@ -2,12 +2,471 @@
 FILE: src/email/gmail.py
 
 DESCRIPTION: Utility functions for scanning job emails using the Gmail API.
+The mailbox is synced into a local store (src/email/store.py): the first check
+lists the label and downloads every message once, later checks only ask the
+history API for what changed since the stored checkpoint. Message bodies are
+downloaded through Gmail's batch endpoint, up to 50 per request.
 """
 
-def check_gmail_inbox():
+# global imports
+import os
+import re
+import json
+import time
+import html
+import uuid
+import base64
+import argparse
+import requests
+from email.utils import parseaddr
+from requests.adapters import HTTPAdapter
+
+# local imports
+from src.email.store import MailStore, Message
+
+GMAIL_API_URL = "https://gmail.googleapis.com"
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+# Gmail accepts up to 100 calls per batch but recommends no more than 50
+BATCH_SIZE = 50
+LIST_PAGE_SIZE = 500
+RETRY_STATUS = {429, 500, 502, 503, 504}
+HISTORY_TYPES = ("messageAdded", "messageDeleted", "labelAdded", "labelRemoved")
+TAG = re.compile(r"<[^>]+>")
+BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+class GmailAPIError(Exception):
+    """
+    A Gmail API call failed (after any retries).
+
+    :ivar status: HTTP status code of the last response, or None if no response arrived.
+    :ivar reason: Gmail's error reason, e.g. "rateLimitExceeded".
+    """
+    def __init__(self, message, status=None, reason=None):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+    @classmethod
+    def from_response(cls, status, body, message):
+        reason = None
+        try:
+            error = json.loads(body)["error"]
+            reason = (error.get("errors") or [{}])[0].get("reason") or error.get("status")
+            message = f"{message}: {error.get('message', body)}"
+        except (ValueError, KeyError, TypeError, AttributeError):
+            message = f"{message}: {body[:200] if isinstance(body, str) else body}"
+        return cls(message, status=status, reason=reason)
+
+
+class HistoryExpiredError(GmailAPIError):
+    """
+    The stored history checkpoint is older than Gmail keeps (404); a full sync is needed.
+    """
+
+
+def _decode_body(data) -> str:
+    # base64url without padding
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)).decode("utf-8", "replace")
+
+
+def message_text(payload) -> str:
+    """
+    The text of a message payload: its text/plain part, or its text/html part without tags.
+    """
+    plain, rich = [], []
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        stack.extend(reversed(part.get("parts") or []))
+        data = (part.get("body") or {}).get("data")
+        if not data:
+            continue
+        mime_type = part.get("mimeType", "")
+        if mime_type == "text/plain":
+            plain.append(_decode_body(data))
+        elif mime_type == "text/html":
+            rich.append(_decode_body(data))
+    if plain:
+        return "\n".join(plain).strip()
+    text = html.unescape(TAG.sub(" ", "\n".join(rich)))
+    return BLANK_LINES.sub("\n\n", text).strip()
+
+
+def parse_message(raw) -> Message:
+    """
+    Builds a Message from a users.messages.get resource (format "full" or "metadata").
+    """
+    payload = raw.get("payload") or {}
+    headers = {header["name"].lower(): header["value"] for header in payload.get("headers", [])}
+    sender_name, sender_email = parseaddr(headers.get("from", ""))
+    return Message(
+        id=raw["id"],
+        thread_id=raw.get("threadId", raw["id"]),
+        history_id=int(raw["historyId"]) if raw.get("historyId") else None,
+        date=int(raw.get("internalDate") or 0),
+        sender=sender_name or sender_email,
+        sender_email=sender_email.lower() or None,
+        recipients=headers.get("to"),
+        subject=headers.get("subject"),
+        snippet=html.unescape(raw.get("snippet", "")),
+        labels=raw.get("labelIds", ()),
+        body=message_text(payload) if payload.get("parts") or (payload.get("body") or {}).get("data") else None,
+    )
+
+
+class GmailClient:
+    """
+    A pooled client for the Gmail API, authorized with an OAuth access token.
+
+    The token is taken from `access_token`, the GMAIL_ACCESS_TOKEN environment
+    variable, or `token_path` (an authorized-user JSON file as written by
+    Google's OAuth tools); with a refresh token in the file, an expired token is
+    refreshed and saved when the API answers 401.
+
+    sample usage:
+        with GmailClient() as client:
+            history_id = client.profile()["historyId"]
+            raw = client.get_messages(["18c2f..."])
+    """
+
+    def __init__(self, access_token=None, token_path="data/gmail_token.json", base_url=GMAIL_API_URL, user_id="me",
+                 timeout=(5, 30), max_retries=3, session=None):
+        """
+        :param access_token: (Optional) OAuth access token.
+        :param token_path: (Optional) Authorized-user JSON file with the token (and a refresh token).
+        :param base_url: (Optional) Root URL of the API, e.g. a local fake_gmail server.
+        :param user_id: (Optional) The mailbox, "me" for the token's owner.
+        :param timeout: (Optional) (connect, read) timeout in seconds.
+        :param max_retries: (Optional) Retries of a call answered with 429 or 5xx.
+        :param session: (Optional) requests.Session to use.
+        """
+        self.token_path = token_path
+        self.credentials = self._load_credentials(access_token)
+        self.base_url = base_url.rstrip("/")
+        self.user_path = f"/gmail/v1/users/{user_id}"
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.requests = 0
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load_credentials(self, access_token):
+        if access_token or os.getenv("GMAIL_ACCESS_TOKEN"):
+            return {"token": access_token or os.getenv("GMAIL_ACCESS_TOKEN")}
+        try:
+            with open(self.token_path, 'r', encoding='utf-8') as f:
+                credentials = json.load(f)
+        except (OSError, ValueError):
+            raise GmailAPIError(f"No Gmail credentials: set GMAIL_ACCESS_TOKEN or create {self.token_path}") from None
+        # Google's tools write "token"; plain OAuth responses use "access_token"
+        credentials.setdefault("token", credentials.get("access_token"))
+        return credentials
+
+    def _refresh(self):
+        """
+        Exchanges the refresh token for a new access token and saves it.
+
+        :return: False if there is nothing to refresh with.
+        """
+        credentials = self.credentials
+        if not credentials.get("refresh_token"):
+            return False
+        response = self.session.post(credentials.get("token_uri", TOKEN_URI), timeout=self.timeout, data={
+            "grant_type": "refresh_token",
+            "refresh_token": credentials["refresh_token"],
+            "client_id": credentials.get("client_id"),
+            "client_secret": credentials.get("client_secret"),
+        })
+        if response.status_code != 200:
+            raise GmailAPIError.from_response(response.status_code, response.text, "Refreshing the Gmail token failed")
+        credentials["token"] = response.json()["access_token"]
+        with open(self.token_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(credentials, f)
+        os.replace(self.token_path + ".tmp", self.token_path)
+        return True
+
+    def _send(self, method, path, **kwargs) -> requests.Response:
+        """
+        Sends one request, retrying 429/5xx with backoff and refreshing the token once on 401.
+
+        :raises GmailAPIError: If the call still fails.
+        """
+        refreshed = False
+        attempt = 0
+        while True:
+            headers = dict(kwargs.pop("headers", {}), Authorization=f"Bearer {self.credentials['token']}")
+            self.requests += 1
+            try:
+                response = self.session.request(method, f"{self.base_url}{path}", headers=headers,
+                                                timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                if attempt >= self.max_retries:
+                    raise GmailAPIError(f"{method} {path} failed: {e}") from e
+                response = None
+            kwargs["headers"] = headers
+            if response is not None and response.status_code == 401 and not refreshed and self._refresh():
+                refreshed = True
+                continue
+            if response is not None and response.status_code not in RETRY_STATUS:
+                if response.status_code >= 400:
+                    raise GmailAPIError.from_response(response.status_code, response.text, f"{method} {path} failed")
+                return response
+            if attempt >= self.max_retries:
+                raise GmailAPIError.from_response(response.status_code, response.text, f"{method} {path} failed")
+            try:
+                delay = float(response.headers["Retry-After"])
+            except (AttributeError, KeyError, ValueError):
+                delay = 0.5 * 2 ** attempt
+            time.sleep(delay)
+            attempt += 1
+
+    def _get(self, path, params=None) -> dict:
+        return self._send("GET", f"{self.user_path}{path}", params=params).json()
+
+    def profile(self) -> dict:
+        """
+        :return: {"emailAddress", "messagesTotal", "threadsTotal", "historyId"}.
+        """
+        return self._get("/profile")
+
+    def list_message_ids(self, label_ids=("INBOX",), query=None):
+        """
+        Yields (message id, thread id) of every message with the labels, newest first.
+
+        :param label_ids: (Optional) Labels the messages must have.
+        :param query: (Optional) Gmail search query, e.g. "newer_than:30d".
+        """
+        params = {"labelIds": list(label_ids), "maxResults": LIST_PAGE_SIZE}
+        if query:
+            params["q"] = query
+        while True:
+            page = self._get("/messages", params)
+            for message in page.get("messages", []):
+                yield message["id"], message["threadId"]
+            if not page.get("nextPageToken"):
+                return
+            params["pageToken"] = page["nextPageToken"]
+
+    def history(self, start_history_id, history_types=HISTORY_TYPES) -> tuple:
+        """
+        The mailbox changes after a history checkpoint.
+
+        :param start_history_id: The checkpoint, e.g. the historyId of the last sync.
+        :param history_types: (Optional) Kinds of changes to return.
+        :return: A tuple (history records oldest first, current history ID).
+        :raises HistoryExpiredError: If the checkpoint is too old; a full sync is needed.
+        """
+        params = {"startHistoryId": start_history_id, "historyTypes": list(history_types), "maxResults": 500}
+        records = []
+        while True:
+            try:
+                page = self._get("/history", params)
+            except GmailAPIError as e:
+                if e.status == 404:
+                    raise HistoryExpiredError(str(e), status=404, reason=e.reason) from e
+                raise
+            records.extend(page.get("history", []))
+            if not page.get("nextPageToken"):
+                return records, int(page["historyId"])
+            params["pageToken"] = page["nextPageToken"]
+
+    def _batch(self, paths) -> dict:
+        """
+        Sends GET requests through the batch endpoint, one HTTP request for all of them.
+
+        :param paths: Request paths, at most BATCH_SIZE.
+        :return: {index in paths: (status, body text)}.
+        """
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = [f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <item{i}>\r\n\r\n"
+                 f"GET {path}\r\n\r\n" for i, path in enumerate(paths)]
+        body = "".join(parts) + f"--{boundary}--\r\n"
+        response = self._send("POST", "/batch/gmail/v1", data=body.encode("utf-8"),
+                              headers={"Content-Type": f"multipart/mixed; boundary={boundary}"})
+        return parse_batch_response(response.headers.get("Content-Type", ""), response.content)
+
+    def get_messages(self, message_ids, message_format="full") -> dict:
+        """
+        Downloads messages in batches of BATCH_SIZE. Calls throttled inside a batch are
+        sent again in a later batch; messages deleted in the meantime are skipped.
+
+        :param message_ids: The message IDs.
+        :param message_format: (Optional) "full" (with bodies), "metadata" or "minimal".
+        :return: {message id: users.messages.get resource}.
+        :raises GmailAPIError: If a message cannot be downloaded.
+        """
+        messages = {}
+        pending = list(dict.fromkeys(message_ids))
+        attempt = 0
+        while pending:
+            retry = []
+            for i in range(0, len(pending), BATCH_SIZE):
+                batch = pending[i:i + BATCH_SIZE]
+                results = self._batch([f"{self.user_path}/messages/{message_id}?format={message_format}"
+                                       for message_id in batch])
+                for index, message_id in enumerate(batch):
+                    status, body = results.get(index, (None, ""))
+                    if status == 200:
+                        messages[message_id] = json.loads(body)
+                    elif status == 404:
+                        continue
+                    elif status in RETRY_STATUS or status is None:
+                        retry.append(message_id)
+                    else:
+                        raise GmailAPIError.from_response(status, body, f"Getting message {message_id} failed")
+            if retry and attempt >= self.max_retries:
+                raise GmailAPIError(f"{len(retry)} messages could not be downloaded after {attempt} retries",
+                                    status=429)
+            if retry:
+                time.sleep(0.5 * 2 ** attempt)
+            pending = retry
+            attempt += 1
+        return messages
+
+
+def parse_batch_response(content_type, content) -> dict:
+    """
+    Splits a multipart/mixed batch response into its embedded HTTP responses.
+
+    :return: {request index: (status, body text)}, the index taken from "Content-ID: <response-item{i}>".
     """
-    Stub function to check Gmail inbox.
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        raise GmailAPIError(f"Batch response without a multipart boundary: {content_type!r}")
+    delimiter = b"--" + match.group(1).encode("ascii")
+    results = {}
+    for part in content.split(delimiter)[1:]:
+        if part.startswith(b"--"):
+            break
+        part = part.replace(b"\r\n", b"\n")
+        outer, _, inner = part.strip(b"\n").partition(b"\n\n")
+        content_id = re.search(rb"Content-ID:\s*<response-item(\d+)>", outer, re.IGNORECASE)
+        head, _, body = inner.partition(b"\n\n")
+        status_line = head.split(b"\n", 1)[0].split()
+        if content_id is None or len(status_line) < 2:
+            continue
+        results[int(content_id.group(1))] = (int(status_line[1]), body.decode("utf-8", "replace").strip())
+    return results
+
+
+def sync_mailbox(client, store, label="INBOX", full=False) -> dict:
+    """
+    Brings the local store up to date with one label of the mailbox.
+
+    Without a checkpoint (or with full=True, or when Gmail no longer has the
+    checkpoint's history) the label is listed and every message not stored yet is
+    downloaded. Otherwise only the history since the checkpoint is read: new
+    messages are downloaded, deleted ones and ones that lost the label are removed,
+    and label changes are applied.
+
+    :param client: A GmailClient.
+    :param store: A MailStore.
+    :param label: (Optional) The label to keep a copy of.
+    :param full: (Optional) Relist the label even if a checkpoint exists.
+    :return: {"mode" ("full" or "incremental"), "added" (message IDs, in mailbox order), "removed",
+             "relabeled", "history_id", "requests" (HTTP requests made)}.
     """
-    print("Stub: Checking Gmail inbox...")
-    # Implement your actual logic to connect to Gmail API
-    return []
+    started = client.requests
+    checkpoint = store.history_id
+    mode = "incremental"
+    if checkpoint is None or full:
+        mode = "full"
+    else:
+        try:
+            records, history_id = client.history(checkpoint)
+        except HistoryExpiredError:
+            mode = "full"
+
+    if mode == "full":
+        # Take the checkpoint first, so changes made while listing are picked up by the next sync
+        profile = client.profile()
+        history_id = int(profile["historyId"])
+        listed = [message_id for message_id, _ in client.list_message_ids((label,))]
+        removed = store.ids() - set(listed)
+        wanted = store.missing(listed)
+        relabeled = {}
+        store.set_meta(email=profile.get("emailAddress"))
+    else:
+        # The last change to a message decides: {id: labels it has now, or None if deleted}
+        latest = {}
+        for record in records:
+            for change in record.get("messagesAdded", []) + record.get("labelsAdded", []) + \
+                    record.get("labelsRemoved", []):
+                message = change["message"]
+                latest[message["id"]] = tuple(message.get("labelIds", ()))
+            for change in record.get("messagesDeleted", []):
+                latest[change["message"]["id"]] = None
+        stored = store.labels(latest)
+        removed = {message_id for message_id, labels in latest.items()
+                   if message_id in stored and (labels is None or label not in labels)}
+        relabeled = {message_id: labels for message_id, labels in latest.items()
+                     if message_id in stored and message_id not in removed and set(labels) != stored[message_id]}
+        wanted = [message_id for message_id, labels in latest.items()
+                  if labels is not None and label in labels and message_id not in stored]
+
+    store.delete(removed)
+    store.set_labels(relabeled)
+    raw = client.get_messages(wanted)
+    added = [message_id for message_id in wanted if message_id in raw]
+    store.put(parse_message(raw[message_id]) for message_id in added)
+    store.set_meta(history_id=history_id, last_sync=time.time())
+    return {"mode": mode, "added": added, "removed": len(removed), "relabeled": len(relabeled),
+            "history_id": history_id, "requests": client.requests - started}
+
+
+def check_gmail_inbox(store_path="data/gmail.sqlite3", client=None, label="INBOX", full=False):
+    """
+    Syncs the local copy of the inbox and returns the messages that arrived since the
+    last check (all of them on the first check).
+
+    :param store_path: (Optional) Location of the local store.
+    :param client: (Optional) A GmailClient; one with the default credentials is made otherwise.
+    :param label: (Optional) The label to check.
+    :param full: (Optional) Relist the whole label instead of reading the history.
+    :return: The new messages (Message records), newest first.
+    :raises GmailAPIError: If Gmail cannot be reached or the credentials are missing.
+    """
+    own_client = client is None
+    client = client or GmailClient()
+    try:
+        with MailStore(store_path) as store:
+            result = sync_mailbox(client, store, label, full)
+            return sorted(store.get(result["added"]), key=lambda message: message.date, reverse=True)
+    finally:
+        if own_client:
+            client.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sync the local copy of the Gmail inbox.")
+    parser.add_argument('--path', type=str, default="data/gmail.sqlite3", help="Location of the local store.")
+    parser.add_argument('--base_url', type=str, default=GMAIL_API_URL, help="API root, e.g. a local fake_gmail server.")
+    parser.add_argument('--token', type=str, default=None, help="OAuth access token (default: GMAIL_ACCESS_TOKEN or data/gmail_token.json).")
+    parser.add_argument('--label', type=str, default="INBOX", help="Label to sync.")
+    parser.add_argument('--full', action='store_true', help="Relist the whole label.")
+
+    args = parser.parse_args()
+
+    with GmailClient(args.token, base_url=args.base_url) as gmail_client, MailStore(args.path) as mail_store:
+        started = time.perf_counter()
+        summary = sync_mailbox(gmail_client, mail_store, args.label, args.full)
+        print(f"{summary['mode']} sync in {time.perf_counter() - started:.2f}s with {summary['requests']} requests: "
+              f"{len(summary['added'])} added, {summary['removed']} removed, {summary['relabeled']} relabeled; "
+              f"{len(mail_store)} messages stored")
+
+# sample use:
+# python -m src.email.gmail --base_url http://127.0.0.1:8768 --token test
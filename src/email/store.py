@@ -0,0 +1,263 @@
+"""
+FILE: src/email/store.py
+
+DESCRIPTION: The local copy of the mailbox. Synced messages are kept in SQLite,
+indexed by sender, subject, thread and date, together with the Gmail history
+checkpoint the copy is current to, so a check only has to ask Gmail for what
+changed since then.
+"""
+
+# global imports
+import os
+import time
+import sqlite3
+import argparse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    history_id INTEGER,
+    date INTEGER NOT NULL,
+    sender TEXT,
+    sender_email TEXT,
+    recipients TEXT,
+    subject TEXT,
+    snippet TEXT,
+    labels TEXT NOT NULL DEFAULT '',
+    body TEXT,
+    synced REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS messages_sender ON messages (sender_email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS messages_subject ON messages (subject COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS messages_thread ON messages (thread_id, date);
+CREATE INDEX IF NOT EXISTS messages_date ON messages (date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+COLUMNS = ("id", "thread_id", "history_id", "date", "sender", "sender_email", "recipients", "subject", "snippet",
+           "labels", "body")
+
+
+class Message:
+    """
+    One email. `date` is Gmail's internal date in milliseconds since the epoch,
+    and `labels` a tuple of label IDs, e.g. ("INBOX", "UNREAD").
+    """
+    __slots__ = COLUMNS
+
+    def __init__(self, id, thread_id, history_id=None, date=0, sender=None, sender_email=None, recipients=None,
+                 subject=None, snippet=None, labels=(), body=None):
+        self.id = id
+        self.thread_id = thread_id
+        self.history_id = history_id
+        self.date = date
+        self.sender = sender
+        self.sender_email = sender_email
+        self.recipients = recipients
+        self.subject = subject
+        self.snippet = snippet
+        self.labels = tuple(labels)
+        self.body = body
+
+    def __repr__(self):
+        return f"Message(id={self.id!r}, sender={self.sender_email!r}, subject={self.subject!r})"
+
+    def as_dict(self, body=True) -> dict:
+        fields = {name: getattr(self, name) for name in self.__slots__ if body or name != "body"}
+        fields["labels"] = list(self.labels)
+        return fields
+
+
+def _labels_column(labels):
+    # Surrounding spaces let a label be matched with LIKE '% INBOX %'
+    return f" {' '.join(labels)} " if labels else ""
+
+
+def _message_from_row(row):
+    fields = dict(zip(COLUMNS, row))
+    fields["labels"] = tuple(fields["labels"].split())
+    return Message(**fields)
+
+
+class MailStore:
+    """
+    Synced messages and the history checkpoint, in SQLite.
+
+    sample usage:
+        with MailStore() as store:
+            for message in store.search(sender="recruiting@acme.com", limit=10):
+                print(message.subject)
+    """
+
+    def __init__(self, path="data/gmail.sqlite3"):
+        """
+        :param path: Location of the SQLite file.
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def __contains__(self, message_id):
+        return self.conn.execute("SELECT 1 FROM messages WHERE id = ?", (message_id,)).fetchone() is not None
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, **values):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", values.items())
+
+    @property
+    def history_id(self):
+        """
+        The Gmail history ID the store is current to, or None before the first full sync.
+        """
+        value = self.get_meta("history_id")
+        return int(value) if value is not None else None
+
+    def ids(self) -> set:
+        return {message_id for (message_id,) in self.conn.execute("SELECT id FROM messages")}
+
+    def missing(self, message_ids) -> list:
+        """
+        The IDs among `message_ids` that are not stored yet, in their original order.
+        """
+        stored = set()
+        message_ids = list(message_ids)
+        # SQLite's default limit on host parameters is 999
+        for i in range(0, len(message_ids), 500):
+            batch = message_ids[i:i + 500]
+            stored.update(message_id for (message_id,) in self.conn.execute(
+                f"SELECT id FROM messages WHERE id IN ({','.join('?' * len(batch))})", batch))
+        return [message_id for message_id in message_ids if message_id not in stored]
+
+    def put(self, messages):
+        """
+        Inserts or replaces messages.
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO messages ({', '.join(COLUMNS)}, synced) VALUES ({', '.join('?' * len(COLUMNS))}, ?)",
+                [(m.id, m.thread_id, m.history_id, m.date, m.sender, m.sender_email, m.recipients, m.subject,
+                  m.snippet, _labels_column(m.labels), m.body, now) for m in messages])
+
+    def set_labels(self, labels_by_id):
+        """
+        Replaces the labels of stored messages: {message id: labels}.
+        """
+        with self.conn:
+            self.conn.executemany("UPDATE messages SET labels = ? WHERE id = ?",
+                                  [(_labels_column(labels), message_id) for message_id, labels in labels_by_id.items()])
+
+    def labels(self, message_ids) -> dict:
+        """
+        The stored labels of messages, {message id: set of labels}, for those that are stored.
+        """
+        result = {}
+        message_ids = list(message_ids)
+        for i in range(0, len(message_ids), 500):
+            batch = message_ids[i:i + 500]
+            result.update((message_id, set(labels.split())) for message_id, labels in self.conn.execute(
+                f"SELECT id, labels FROM messages WHERE id IN ({','.join('?' * len(batch))})", batch))
+        return result
+
+    def delete(self, message_ids):
+        with self.conn:
+            self.conn.executemany("DELETE FROM messages WHERE id = ?", [(message_id,) for message_id in message_ids])
+
+    def get(self, message_ids) -> list:
+        """
+        Stored messages by ID, in the order given; IDs that are not stored are skipped.
+        """
+        message_ids = list(message_ids)
+        found = {}
+        for i in range(0, len(message_ids), 500):
+            batch = message_ids[i:i + 500]
+            found.update((row[0], _message_from_row(row)) for row in self.conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM messages WHERE id IN ({','.join('?' * len(batch))})", batch))
+        return [found[message_id] for message_id in message_ids if message_id in found]
+
+    def search(self, sender=None, subject=None, thread_id=None, label=None, since=None, until=None, limit=None) -> list:
+        """
+        Stored messages, newest first.
+
+        :param sender: (Optional) Sender address, matched exactly (case-insensitive).
+        :param subject: (Optional) Text the subject contains (case-insensitive).
+        :param thread_id: (Optional) Only this thread, oldest first.
+        :param label: (Optional) Label the message has, e.g. "UNREAD".
+        :param since: (Optional) Earliest internal date, in milliseconds.
+        :param until: (Optional) Latest internal date, in milliseconds.
+        :param limit: (Optional) Maximum number of messages.
+        """
+        clauses, params = [], []
+        if sender is not None:
+            clauses.append("sender_email = ? COLLATE NOCASE")
+            params.append(sender)
+        if subject is not None:
+            clauses.append("subject LIKE ? COLLATE NOCASE")
+            params.append(f"%{subject}%")
+        if thread_id is not None:
+            clauses.append("thread_id = ?")
+            params.append(thread_id)
+        if label is not None:
+            clauses.append("labels LIKE ?")
+            params.append(f"% {label} %")
+        if since is not None:
+            clauses.append("date >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("date <= ?")
+            params.append(until)
+        query = f"SELECT {', '.join(COLUMNS)} FROM messages"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY date" if thread_id is not None else " ORDER BY date DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [_message_from_row(row) for row in self.conn.execute(query, params)]
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM messages")
+            self.conn.execute("DELETE FROM meta")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Search the local copy of the mailbox.")
+    parser.add_argument('--path', type=str, default="data/gmail.sqlite3", help="Location of the store.")
+    parser.add_argument('--sender', type=str, help="Sender address.")
+    parser.add_argument('--subject', type=str, help="Text the subject contains.")
+    parser.add_argument('--limit', type=int, default=20, help="Maximum number of messages.")
+
+    args = parser.parse_args()
+
+    with MailStore(args.path) as store:
+        print(f"{len(store)} messages stored, history ID {store.history_id}")
+        for message in store.search(sender=args.sender, subject=args.subject, limit=args.limit):
+            sent = time.strftime('%Y-%m-%d %H:%M', time.localtime(message.date / 1000))
+            print(f"  {sent}  {message.sender_email}  {message.subject}")
+
+# sample use:
+# python -m src.email.store --subject interview
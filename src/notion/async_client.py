@@ -0,0 +1,165 @@
+'''
+FILE: src/notion/async_client.py
+DESCRIPTION: An asyncio front-end to the Notion client with bounded
+concurrency, for bulk reads and writes that would otherwise run one after
+another.
+'''
+
+# global imports
+import asyncio
+
+# local imports
+from src.notion.client import NotionClient
+
+
+class AsyncNotionClient:
+    """
+    Asyncio variant of NotionClient. Each call runs the matching NotionClient
+    method on a worker thread, so pooling, rate limiting, retries and the
+    errors raised are exactly those of the sync path; an asyncio.Semaphore
+    caps how many calls are in flight at once.
+
+    sample usage:
+        async with AsyncNotionClient(headers=HEADERS, database_id=DATABASE_ID, concurrency=8) as client:
+            rows = await client.get_rows()
+            pages = await client.get_rows_by_id([row["id"] for row in rows])
+    """
+
+    def __init__(self, headers=None, database_id=None, api_key=None, concurrency=8, client=None, **client_kwargs):
+        """
+        :param headers: (Optional) Headers including authorization for the Notion API.
+        :param database_id: (Optional) Default database used by the database operations.
+        :param api_key: (Optional) Notion integration token, used when `headers` is None.
+        :param concurrency: (Optional) Maximum number of requests in flight at once.
+        :param client: (Optional) An existing NotionClient to wrap instead of creating one.
+        :param client_kwargs: Extra arguments for NotionClient, e.g. base_url.
+        """
+        if client is None:
+            # One pooled connection per concurrent request
+            client_kwargs.setdefault("pool_size", concurrency)
+            client = NotionClient(headers=headers, database_id=database_id, api_key=api_key, **client_kwargs)
+        self.client = client
+        self.concurrency = concurrency
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Closes every pooled connection of the underlying client.
+        """
+        self.client.close()
+
+    async def _call(self, func, *args):
+        # The semaphore has to be created inside the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args)
+
+    async def query(self, database_id=None, filter_obj=None, sorts=None, page_size=100, start_cursor=None):
+        """
+        Runs a single database query request, see NotionClient.query.
+        """
+        return await self._call(self.client.query, database_id, filter_obj, sorts, page_size, start_cursor)
+
+    async def iter_rows(self, database_id=None, filter_obj=None, sorts=None, page_size=100, start_cursor=None):
+        """
+        Async generator over every row of the database, following pagination.
+        Rows of a page are yielded as soon as that page arrives.
+
+        sample usage:
+            async for row in client.iter_rows():
+                ...
+        """
+        has_more = True
+        current_cursor = start_cursor
+
+        while has_more:
+            data = await self.query(database_id, filter_obj, sorts, page_size, current_cursor)
+
+            for row in data.get("results", []):
+                yield row
+
+            # Check for pagination
+            has_more = data.get("has_more", False)
+            current_cursor = data.get("next_cursor", None)
+
+    async def get_rows(self, database_id=None, filter_obj=None, sorts=None, page_size=100, start_cursor=None) -> list:
+        """
+        Retrieves (queries) all rows (pages) from the database, see NotionClient.get_rows.
+        """
+        return [row async for row in self.iter_rows(database_id, filter_obj, sorts, page_size, start_cursor)]
+
+    async def get_row(self, page_id) -> dict:
+        """
+        Retrieves a specific page (row) by its page ID, see NotionClient.get_row.
+        """
+        return await self._call(self.client.get_row, page_id)
+
+    async def add_row(self, properties, database_id=None):
+        """
+        Creates a new page (row) in the database, see NotionClient.add_row.
+        """
+        return await self._call(self.client.add_row, properties, database_id)
+
+    async def update_row(self, page_id, properties):
+        """
+        Updates an existing page (row), see NotionClient.update_row.
+        """
+        return await self._call(self.client.update_row, page_id, properties)
+
+    async def delete_row(self, page_id):
+        """
+        Archives (effectively "deletes") a page (row), see NotionClient.delete_row.
+        """
+        return await self._call(self.client.delete_row, page_id)
+
+    async def get_rows_by_id(self, page_ids, return_exceptions=False) -> list:
+        """
+        Fetches many pages concurrently.
+
+        :param page_ids: An iterable of page IDs.
+        :param return_exceptions: (Optional) Put a failed call's NotionAPIError in its slot
+                                  of the result instead of raising it.
+        :return: A list of page objects, in the order of `page_ids`.
+        """
+        return await asyncio.gather(*(self.get_row(page_id) for page_id in page_ids),
+                                    return_exceptions=return_exceptions)
+
+    async def add_rows(self, rows, database_id=None, return_exceptions=False) -> list:
+        """
+        Creates many pages concurrently.
+
+        :param rows: An iterable of property dictionaries, one per new row.
+        :param return_exceptions: (Optional) See get_rows_by_id.
+        :return: A list of created page objects, in input order.
+        """
+        return await asyncio.gather(*(self.add_row(properties, database_id) for properties in rows),
+                                    return_exceptions=return_exceptions)
+
+    async def update_rows(self, updates, return_exceptions=False) -> list:
+        """
+        Updates many pages concurrently.
+
+        :param updates: An iterable of (page_id, properties) pairs.
+        :param return_exceptions: (Optional) See get_rows_by_id.
+        :return: A list of updated page objects, in input order.
+        """
+        return await asyncio.gather(*(self.update_row(page_id, properties) for page_id, properties in updates),
+                                    return_exceptions=return_exceptions)
+
+    async def delete_rows(self, page_ids, return_exceptions=False) -> list:
+        """
+        Archives many pages concurrently.
+
+        :param page_ids: An iterable of page IDs.
+        :param return_exceptions: (Optional) See get_rows_by_id.
+        :return: A list of booleans, in the order of `page_ids`.
+        """
+        return await asyncio.gather(*(self.delete_row(page_id) for page_id in page_ids),
+                                    return_exceptions=return_exceptions)
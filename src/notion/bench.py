@@ -0,0 +1,198 @@
+'''
+FILE: src/notion/bench.py
+DESCRIPTION: Benchmark suite for the Notion client, run against the local
+stand-in server in src/notion/fake_server.py: connection pooling, full-scan
+rows/sec, bulk insert writes/sec, throughput under 429s, and record decoding.
+'''
+
+# global imports
+import io
+import json
+import time
+import asyncio
+import contextlib
+import random
+import argparse
+import tracemalloc
+import requests
+
+# local imports
+from src.notion.client import NotionClient
+from src.notion.async_client import AsyncNotionClient
+from src.notion.fake_server import start_server, make_page
+from src.notion.records import RecordCodec
+from src.notion.scheduler import RequestScheduler
+
+
+def _client(server, base_url, pool_size=10):
+    # The stand-in server has no rate limit, so do not pace the client either
+    scheduler = RequestScheduler(rate=None, backoff_base=0.05)
+    return NotionClient(api_key="fake", database_id=server.state.database_id, base_url=base_url,
+                        pool_size=pool_size, scheduler=scheduler)
+
+
+def bench_pool(calls=200):
+    """
+    Compares the per-call latency of bare `requests.get` calls (a new
+    connection per call) with calls made through the pooled NotionClient.
+
+    :param calls: Number of GET /pages/<id> calls for each variant.
+    :return: A dictionary with the mean latency (ms) of each variant.
+    """
+    server, base_url = start_server(rows=1)
+    client = _client(server, base_url)
+    page_id = next(iter(server.state.pages))
+    try:
+        start = time.perf_counter()
+        for _ in range(calls):
+            requests.get(f"{base_url}/pages/{page_id}", headers=client.headers)
+        unpooled = (time.perf_counter() - start) / calls * 1000
+
+        start = time.perf_counter()
+        for _ in range(calls):
+            client.get_row(page_id)
+        pooled = (time.perf_counter() - start) / calls * 1000
+    finally:
+        client.close()
+        server.shutdown()
+
+    return {"calls": calls, "unpooled_ms": unpooled, "pooled_ms": pooled}
+
+
+def bench_scan(rows=5000, latency=0.02):
+    """
+    Measures full-scan throughput (rows/sec) with and without prefetching the next page.
+
+    :param rows: Number of rows in the fake database.
+    :param latency: Seconds of simulated latency per request.
+    :return: A dictionary with rows/sec for each variant.
+    """
+    server, base_url = start_server(rows=rows, latency=latency)
+    client = _client(server, base_url)
+    result = {"rows": rows, "latency": latency}
+    try:
+        for prefetch in (False, True):
+            start = time.perf_counter()
+            count = 0
+            for _ in client.iter_rows(prefetch=prefetch):
+                # Stand-in for per-row work so there is something to overlap with
+                time.sleep(latency / 100)
+                count += 1
+            result[f"{'prefetch' if prefetch else 'sequential'}_rows_per_sec"] = count / (time.perf_counter() - start)
+    finally:
+        client.close()
+        server.shutdown()
+    return result
+
+
+def bench_inserts(writes=300, latency=0.02, concurrency=8):
+    """
+    Measures bulk insert throughput (writes/sec), one row at a time versus
+    through AsyncNotionClient with bounded concurrency.
+
+    :param writes: Number of rows inserted by each variant.
+    :param latency: Seconds of simulated latency per request.
+    :param concurrency: Requests in flight for the concurrent variant.
+    :return: A dictionary with writes/sec for each variant.
+    """
+    server, base_url = start_server(latency=latency)
+    client = _client(server, base_url, pool_size=concurrency)
+    rows = [{"Company": {"title": [{"text": {"content": f"Company {i}"}}]},
+             "Job ID": {"rich_text": [{"text": {"content": f"BENCH-{i}"}}]},
+             "Stage": {"select": {"name": "Ready to Apply"}}} for i in range(writes)]
+    result = {"writes": writes, "latency": latency, "concurrency": concurrency}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for properties in rows:
+                client.add_row(properties)
+            result["sequential_writes_per_sec"] = writes / (time.perf_counter() - start)
+
+            async_client = AsyncNotionClient(client=client, concurrency=concurrency)
+            start = time.perf_counter()
+            asyncio.run(async_client.add_rows(rows))
+            result["concurrent_writes_per_sec"] = writes / (time.perf_counter() - start)
+    finally:
+        client.close()
+        server.shutdown()
+    return result
+
+
+def bench_throttled(rows=2000, rate_limit_every=5):
+    """
+    Measures full-scan throughput while the server answers every Nth request with 429,
+    and checks that no rows are lost to throttling.
+
+    :return: A dictionary with rows/sec, rows returned and the number of 429s served.
+    """
+    server, base_url = start_server(rows=rows, rate_limit_every=rate_limit_every, retry_after=0.01)
+    client = _client(server, base_url)
+    try:
+        start = time.perf_counter()
+        count = sum(1 for _ in client.iter_rows(page_size=20))
+        elapsed = time.perf_counter() - start
+    finally:
+        client.close()
+        server.shutdown()
+    return {"rows": rows, "returned": count, "throttled": server.state.throttled, "rows_per_sec": count / elapsed}
+
+
+def bench_records(rows=5000):
+    """
+    Compares the memory held by raw Notion page dictionaries with the same rows
+    decoded into JobApplication records, and measures the bulk decode rate.
+
+    :param rows: Number of synthetic rows.
+    :return: A dictionary with bytes per row for each representation and rows/sec decoded.
+    """
+    rng = random.Random(0)
+    codec = RecordCodec.from_file()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Round-trip through JSON so the pages are built the way the client builds them
+    pages = json.loads(json.dumps([make_page(i, rng=rng) for i in range(rows)]))
+    page_bytes = tracemalloc.get_traced_memory()[0] - before
+
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    records = codec.decode_many(pages)
+    elapsed = time.perf_counter() - start
+    record_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    # Decode rate without tracemalloc overhead
+    start = time.perf_counter()
+    codec.decode_many(pages)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "rows": len(records),
+        "page_bytes_per_row": page_bytes / rows,
+        "record_bytes_per_row": record_bytes / rows,
+        "decode_rows_per_sec": rows / elapsed,
+    }
+
+
+BENCHMARKS = {
+    "pool": bench_pool,
+    "scan": bench_scan,
+    "inserts": bench_inserts,
+    "throttled": bench_throttled,
+    "records": bench_records,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the Notion client against a local stand-in server.")
+    parser.add_argument('benchmarks', nargs='*', default=list(BENCHMARKS), help="Benchmarks to run (default: all).")
+
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        result = BENCHMARKS[name]()
+        print(f"{name}: " + ", ".join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                                      for key, value in result.items()))
+
+# sample use:
+# python -m src.notion.bench scan inserts
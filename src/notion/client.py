@@ -0,0 +1,327 @@
+'''
+FILE: src/notion/client.py
+DESCRIPTION: A pooled, keep-alive client for the Notion API. A single
+requests.Session is shared by every call so repeated requests (and every
+page of a paginated query) reuse the same TCP/TLS connection. Every request
+goes through the shared RequestScheduler, which paces calls to Notion's
+rate limit and retries throttled ones; calls that still fail raise one of
+the errors in src/notion/errors.py.
+'''
+
+# global imports
+import json
+import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+# local imports
+from src.notion.scheduler import get_default_scheduler
+from src.notion.schema import SchemaCache
+
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"
+
+
+class NotionClient:
+    """
+    Owns a pooled connection to the Notion API together with the request
+    headers and (optionally) the database ID, and exposes the database
+    operations used throughout the project.
+
+    sample usage:
+        client = NotionClient(headers=HEADERS, database_id=DATABASE_ID)
+        rows = client.get_rows()
+        row = client.get_row(rows[0]["id"])
+    """
+
+    def __init__(self, headers=None, database_id=None, api_key=None,
+                 base_url=NOTION_API_URL, pool_size=10, scheduler=None, timeout=None):
+        """
+        :param headers: (Optional) Headers including authorization for the Notion API.
+                        Built from `api_key` when not given.
+        :param database_id: (Optional) Default database used by the database operations.
+        :param api_key: (Optional) Notion integration token, used when `headers` is None.
+        :param base_url: (Optional) Root URL of the API, e.g. a local stand-in server.
+        :param pool_size: (Optional) Number of keep-alive connections kept in the pool.
+        :param scheduler: (Optional) RequestScheduler to send through, defaults to the
+                          process-wide one so every client shares Notion's rate limit.
+        :param timeout: (Optional) Per-call timeout, overrides the scheduler default.
+        """
+        if headers is None:
+            headers = {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+                "Notion-Version": NOTION_VERSION,
+            }
+        self.headers = dict(headers)
+        self.database_id = database_id
+        self.base_url = base_url.rstrip("/")
+        self.scheduler = scheduler or get_default_scheduler()
+        self.timeout = timeout
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        """
+        Closes every pooled connection.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, method, path, payload=None, timeout=None):
+        """
+        Sends a single request on the pooled session through the scheduler.
+
+        :param method: HTTP method, e.g. "GET" or "PATCH".
+        :param path: API path relative to the base URL, e.g. "/pages/<id>".
+        :param payload: (Optional) JSON body of the request.
+        :param timeout: (Optional) Timeout for this call.
+        :return: The decoded JSON response.
+        :raises NotionAPIError: If the call still fails after the scheduler's retries.
+        """
+        data = json.dumps(payload) if payload is not None else None
+        response = self.scheduler.send(self.session, method, f"{self.base_url}{path}", data=data,
+                                       timeout=timeout if timeout is not None else self.timeout)
+        return response.json()
+
+    def _database_id(self, database_id):
+        database_id = database_id or self.database_id
+        if not database_id:
+            raise ValueError("No database ID given and no default set on the client.")
+        return database_id
+
+    def query(self, database_id=None, filter_obj=None, sorts=None, page_size=100, start_cursor=None):
+        """
+        Runs a single database query request (one page of results).
+
+        :param database_id: (Optional) The ID of the Notion database, defaults to the client's.
+        :param filter_obj: (Optional) A filter object to narrow down the query results.
+        :param sorts: (Optional) A list of sort instructions for the query.
+        :param page_size: (Optional) Number of pages per request. Max 100.
+        :param start_cursor: (Optional) Cursor returned by a previous query.
+        :return: The raw query response (results, has_more, next_cursor).
+        :raises NotionAPIError: If the query still fails after retries.
+        """
+        payload = {
+            "page_size": page_size,
+        }
+        if filter_obj:
+            payload["filter"] = filter_obj
+        if sorts:
+            payload["sorts"] = sorts
+        if start_cursor:
+            payload["start_cursor"] = start_cursor
+
+        return self._request("POST", f"/databases/{self._database_id(database_id)}/query", payload)
+
+    def iter_pages(self, database_id=None, filter_obj=None, sorts=None, page_size=100,
+                   start_cursor=None, prefetch=True):
+        """
+        Generator over the raw query responses of the database, one per cursor page.
+        Each response carries `next_cursor`, which can be saved and passed back as
+        `start_cursor` to resume a scan later.
+
+        :param prefetch: (Optional) Request the next page on a background thread while
+                         the current one is being consumed.
+        :return: An iterator of query responses (results, has_more, next_cursor).
+        :raises NotionAPIError: If a page still fails after retries.
+
+        sample usage:
+            for page in client.iter_pages(start_cursor=saved_cursor):
+                process(page["results"])
+                saved_cursor = page["next_cursor"]
+        """
+        fetch = lambda cursor: self.query(database_id, filter_obj, sorts, page_size, cursor)
+
+        if not prefetch:
+            data = fetch(start_cursor)
+            while True:
+                yield data
+                if not data.get("has_more"):
+                    return
+                data = fetch(data.get("next_cursor"))
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            future = executor.submit(fetch, start_cursor)
+            while future is not None:
+                data = future.result()
+                # Start on the next page before handing this one to the caller
+                future = executor.submit(fetch, data["next_cursor"]) if data.get("has_more") else None
+                yield data
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_rows(self, database_id=None, filter_obj=None, sorts=None, page_size=100,
+                  start_cursor=None, prefetch=True):
+        """
+        Generator over every row (page) of the database, yielding the rows of each
+        cursor page as soon as it arrives. See iter_pages for the parameters.
+
+        sample usage:
+            for row in client.iter_rows():
+                ...
+        """
+        for data in self.iter_pages(database_id, filter_obj, sorts, page_size, start_cursor, prefetch):
+            yield from data.get("results", [])
+
+    def get_rows(self, database_id=None, filter_obj=None, sorts=None, page_size=100, start_cursor=None) -> list:
+        """
+        Retrieves (queries) all rows (pages) from the database, following pagination.
+        A page that is throttled mid-way is retried rather than cutting the result short.
+        Prefer iter_rows to start work before the last page arrives.
+
+        :return: A list of page objects that belong to this database.
+        :raises NotionAPIError: If any page of the query still fails after retries.
+
+        sample usage:
+            rows = client.get_rows()
+        """
+        return list(self.iter_rows(database_id, filter_obj, sorts, page_size, start_cursor, prefetch=False))
+
+    def get_row(self, page_id) -> dict:
+        """
+        Retrieves a specific page (row) by its page ID.
+
+        :return: The JSON data for the page.
+        :raises NotionAPIError: If the page cannot be retrieved.
+        """
+        return self._request("GET", f"/pages/{page_id}")
+
+    def add_row(self, properties, database_id=None):
+        """
+        Creates a new page (row) in the database.
+
+        :param properties: A dictionary specifying the properties of the row.
+        :return: The newly created page object as a dict.
+        :raises NotionAPIError: If the row cannot be created.
+        """
+        payload = {
+            "parent": {"database_id": self._database_id(database_id)},
+            "properties": properties
+        }
+        row = self._request("POST", "/pages", payload)
+        print("Row added successfully!")
+        return row
+
+    def update_row(self, page_id, properties):
+        """
+        Updates an existing page (row) with new property values.
+
+        :return: The updated page object as a dict.
+        :raises NotionAPIError: If the row cannot be updated.
+        """
+        payload = {
+            "properties": properties
+        }
+        # Notion requires a PATCH request for updates
+        row = self._request("PATCH", f"/pages/{page_id}", payload)
+        print("Row updated successfully!")
+        return row
+
+    def delete_row(self, page_id):
+        """
+        Archives (effectively "deletes") a page (row).
+
+        :return: True once the row is archived.
+        :raises NotionAPIError: If the row cannot be archived.
+        """
+        payload = {
+            "archived": True
+        }
+        self._request("PATCH", f"/pages/{page_id}", payload)
+        print("Row archived (deleted) successfully!")
+        return True
+
+    def schema_cache(self, database_id=None, output_path="data/notion_db_schema.json") -> SchemaCache:
+        """
+        Returns the SchemaCache of the database, creating it on first use.
+
+        sample usage:
+            stage = client.schema_cache().property("Stage")
+        """
+        key = (self._database_id(database_id), output_path)
+        with self._lock:
+            cache = self._schemas.get(key)
+            if cache is None:
+                cache = self._schemas[key] = SchemaCache(self, key[0], output_path)
+        return cache
+
+    def get_db_schema(self, database_id=None, output_path="data/notion_db_schema.json", refresh=False):
+        """
+        Returns the schema of the database. It is served from the SchemaCache (backed by the
+        JSON file at `output_path`) and only fetched again once stale; a fetched schema that
+        changed is saved to `output_path`.
+
+        :param output_path: The file path backing the cached schema.
+        :param refresh: (Optional) Check Notion now instead of trusting the cache.
+        :return: The database schema as a dictionary.
+        :raises NotionAPIError: If the schema has to be fetched and cannot be.
+        """
+        return self.schema_cache(database_id, output_path).get(refresh)
+
+    def update_db_schema(self, updates, database_id=None):
+        """
+        Updates the schema of the database. See `database.update_db_schema`
+        for the structure of `updates`. Options are merged against the cached
+        schema, and the PATCH response replaces it, so no extra fetches are made.
+
+        :return: The updated database object as a dictionary, or None if there was nothing to update.
+        :raises NotionAPIError: If the schema cannot be fetched or updated.
+        """
+        database_id = self._database_id(database_id)
+        cache = self.schema_cache(database_id)
+
+        # Prepare the properties to update
+        updated_properties = {}
+        for prop_name, prop_changes in updates.get("properties", {}).items():
+            property_obj = cache.property(prop_name)
+            if "new_name" in prop_changes:
+                # Rename the property (copied, so the cached schema is left untouched)
+                renamed = dict(property_obj)
+                renamed["name"] = prop_changes["new_name"]
+                updated_properties[prop_changes["new_name"]] = renamed
+            else:
+                # Update or add options for select/multi_select
+                if prop_changes["type"] in ["select", "multi_select"]:
+                    if not property_obj:
+                        print(f"Property '{prop_name}' does not exist in the database.")
+                        continue
+
+                    # Merge existing options with new ones, avoiding duplicates based on option name
+                    new_options = prop_changes[prop_changes["type"]].get("options", [])
+                    # Prepare the updated property
+                    updated_properties[prop_name] = {
+                        "type": prop_changes["type"],
+                        prop_changes["type"]: {
+                            "options": cache.merge_options(prop_name, new_options)
+                        }
+                    }
+                else:
+                    print(f"Property type '{prop_changes['type']}' not supported for updates.")
+                    continue
+
+        if not updated_properties:
+            print("No valid updates found to apply.")
+            return None
+
+        payload = {
+            "properties": updated_properties
+        }
+        updated_database = self._request("PATCH", f"/databases/{database_id}", payload)
+        print("Database schema updated successfully!")
+        # The response is the updated database object, so it replaces the cached schema directly
+        cache.set(updated_database)
+        return updated_database
@@ -1,16 +1,37 @@
 '''
 FILE: src/notion/database.py
 DESCRIPTION: This file contains utility functions for interacting with Notion databases.
+Failed calls raise the typed errors from src/notion/errors.py.
 '''
 
-# global imports
-import json
-import requests
-import os
+# local imports
+from src.notion.client import NotionClient
+
+# One pooled client per distinct set of headers, so repeated calls reuse
+# the same keep-alive connection instead of opening a new one each time.
+_clients = {}
+
+
+def get_client(headers) -> NotionClient:
+    """
+    Returns the shared NotionClient for the given headers, creating it on first use.
+
+    :param headers: Headers including authorization for the Notion API.
+    :return: A NotionClient bound to these headers.
+
+    sample usage:
+        client = get_client(HEADERS)
+    """
+    key = tuple(sorted(headers.items()))
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = NotionClient(headers=headers)
+    return client
 
 def get_rows(database_id, headers, filter_obj=None, sorts=None, page_size=100, start_cursor=None) -> list:
     """
     Retrieves (queries) all rows (pages) from the given Notion database.
+    Convenience wrapper over iter_rows that collects every row into a list.
 
     :param database_id: The ID of the Notion database.
     :param headers: Headers including authorization for the Notion API.
@@ -21,43 +42,51 @@ def get_rows(database_id, headers, filter_obj=None, sorts=None, page_size=100, s
     :param page_size: (Optional) Number of pages per request. Max 100.
     :param start_cursor: (Optional) Used for pagination. If provided, starts from this cursor.
     :return: A list of page objects that belong to this database (possibly multiple requests if needed).
+    :raises NotionAPIError: If a page of the query still fails after retries
+                            (throttled pages are waited out, not dropped).
 
     sample usage:
         rows = get_rows(DATABASE_ID, HEADERS)
     """
+    return get_client(headers).get_rows(database_id, filter_obj, sorts, page_size, start_cursor)
 
-    url = f"https://api.notion.com/v1/databases/{database_id}/query"
 
-    all_pages = []
-    has_more = True
-    current_cursor = start_cursor
+def iter_pages(database_id, headers, filter_obj=None, sorts=None, page_size=100, start_cursor=None, prefetch=True):
+    """
+    Streams the raw query responses of the given Notion database, one per cursor page,
+    without materializing the whole database.
 
-    while has_more:
-        payload = {
-            "page_size": page_size,
-        }
-        if filter_obj:
-            payload["filter"] = filter_obj
-        if sorts:
-            payload["sorts"] = sorts
-        if current_cursor:
-            payload["start_cursor"] = current_cursor
+    :param database_id: The ID of the Notion database.
+    :param headers: Headers including authorization for the Notion API.
+    :param filter_obj: (Optional) A filter object to narrow down the query results.
+    :param sorts: (Optional) A list of sort instructions for the query.
+    :param page_size: (Optional) Number of pages per request. Max 100.
+    :param start_cursor: (Optional) Resume from a `next_cursor` saved from an earlier response.
+    :param prefetch: (Optional) Fetch the next page in the background while the current one is consumed.
+    :return: An iterator of query responses (results, has_more, next_cursor).
+    :raises NotionAPIError: If a page of the query still fails after retries.
 
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+    sample usage:
+        for page in iter_pages(DATABASE_ID, HEADERS):
+            handle(page["results"])
+            cursor = page["next_cursor"]
+    """
+    return get_client(headers).iter_pages(database_id, filter_obj, sorts, page_size, start_cursor, prefetch)
 
-        if response.status_code != 200:
-            print(f"Failed to query database: {response.status_code}")
-            print(response.text)
-            return []
 
-        data = response.json()
-        all_pages.extend(data.get("results", []))
+def iter_rows(database_id, headers, filter_obj=None, sorts=None, page_size=100, start_cursor=None, prefetch=True):
+    """
+    Streams the rows (pages) of the given Notion database as each cursor page arrives.
+    Takes the same parameters as iter_pages.
 
-        # Check for pagination
-        has_more = data.get("has_more", False)
-        current_cursor = data.get("next_cursor", None)
+    :return: An iterator of page objects.
+    :raises NotionAPIError: If a page of the query still fails after retries.
 
-    return all_pages
+    sample usage:
+        for row in iter_rows(DATABASE_ID, HEADERS):
+            ...
+    """
+    return get_client(headers).iter_rows(database_id, filter_obj, sorts, page_size, start_cursor, prefetch)
 
 
 def get_row(page_id, headers) -> dict:
@@ -66,20 +95,13 @@ def get_row(page_id, headers) -> dict:
 
     :param page_id: The ID of the page (row) in Notion.
     :param headers: Headers including authorization for the Notion API.
-    :return: The JSON data for the page, or None if an error occurred.
+    :return: The JSON data for the page.
+    :raises NotionAPIError: If the page cannot be retrieved.
 
     sample usage:
         row = get_row(row_id, HEADERS)
     """
-    url = f"https://api.notion.com/v1/pages/{page_id}"
-    response = requests.get(url, headers=headers)
-
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Failed to retrieve page: {response.status_code}")
-        print(response.text)
-        return None
+    return get_client(headers).get_row(page_id)
 
 
 def add_row(database_id, headers, properties):
@@ -91,7 +113,8 @@ def add_row(database_id, headers, properties):
     :param properties: A dictionary specifying the properties of the row.
                        The keys should match the database property names or IDs.
                        The values should be property values conforming to the Notion schema.
-    :return: The newly created page object as a dict, or None if an error occurred.
+    :return: The newly created page object as a dict.
+    :raises NotionAPIError: If the row cannot be created.
 
     sample usage:
         properties = {
@@ -99,21 +122,7 @@ def add_row(database_id, headers, properties):
         }
         new_row = add_row(DATABASE_ID, HEADERS, properties)
     """
-    url = "https://api.notion.com/v1/pages"
-    payload = {
-        "parent": {"database_id": database_id},
-        "properties": properties
-    }
-
-    response = requests.post(url, headers=headers, data=json.dumps(payload))
-
-    if response.status_code == 200:
-        print("Row added successfully!")
-        return response.json()
-    else:
-        print(f"Failed to add row: {response.status_code}")
-        print(response.text)
-        return None
+    return get_client(headers).add_row(properties, database_id)
 
 
 def update_row(page_id, headers, properties):
@@ -124,7 +133,8 @@ def update_row(page_id, headers, properties):
     :param headers: Headers including authorization for the Notion API.
     :param properties: A dictionary specifying the updated property values, 
                        matching the Notion database schema.
-    :return: The updated page object as a dict, or None if an error occurred.
+    :return: The updated page object as a dict.
+    :raises NotionAPIError: If the row cannot be updated.
 
     sample usage:
         properties = {
@@ -132,21 +142,7 @@ def update_row(page_id, headers, properties):
         }
         updated_row = update_row(row_id, HEADERS, properties)
     """
-    url = f"https://api.notion.com/v1/pages/{page_id}"
-    payload = {
-        "properties": properties
-    }
-
-    # Notion requires a PATCH request for updates
-    response = requests.patch(url, headers=headers, data=json.dumps(payload))
-
-    if response.status_code == 200:
-        print("Row updated successfully!")
-        return response.json()
-    else:
-        print(f"Failed to update row: {response.status_code}")
-        print(response.text)
-        return None
+    return get_client(headers).update_row(page_id, properties)
 
 
 def delete_row(page_id, headers):
@@ -157,54 +153,31 @@ def delete_row(page_id, headers):
 
     :param page_id: The ID of the page (row) to archive.
     :param headers: Headers including authorization for the Notion API.
-    :return: True if successful, False otherwise.
+    :return: True once the row is archived.
+    :raises NotionAPIError: If the row cannot be archived.
 
     sample usage:
         delete_row(row_id, HEADERS)
     """
-    url = f"https://api.notion.com/v1/pages/{page_id}"
-    payload = {
-        "archived": True
-    }
-
-    response = requests.patch(url, headers=headers, data=json.dumps(payload))
+    return get_client(headers).delete_row(page_id)
 
-    if response.status_code == 200:
-        print("Row archived (deleted) successfully!")
-        return True
-    else:
-        print(f"Failed to archive row: {response.status_code}")
-        print(response.text)
-        return False
 
-
-def get_db_schema(database_id, headers, output_path="data/notion_db_schema.json"):
+def get_db_schema(database_id, headers, output_path="data/notion_db_schema.json", refresh=False):
     """
-    Retrieves the schema of the specified Notion database and saves it to a JSON file.
+    Retrieves the schema of the specified Notion database. The schema is cached in memory
+    and in the JSON file, and only fetched again once the cache is stale (or `refresh` is set).
 
     :param database_id: The ID of the Notion database.
     :param headers: Headers including authorization for the Notion API.
     :param output_path: The file path where the schema will be saved.
-    :return: The database schema as a dictionary, or None if an error occurred.
+    :param refresh: (Optional) Check Notion now instead of trusting the cache.
+    :return: The database schema as a dictionary.
+    :raises NotionAPIError: If the schema cannot be retrieved.
 
     sample usage:
         schema = get_db_schema(DATABASE_ID, HEADERS)
     """
-    url = f"https://api.notion.com/v1/databases/{database_id}"
-    response = requests.get(url, headers=headers)
-
-    if response.status_code == 200:
-        schema = response.json()
-        # Ensure the output directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(schema, f, indent=2)
-        print(f"Database schema saved to {output_path}")
-        return schema
-    else:
-        print(f"Failed to retrieve database schema: {response.status_code}")
-        print(response.text)
-        return None
+    return get_client(headers).get_db_schema(database_id, output_path, refresh)
 
 
 def update_db_schema(database_id, headers, updates):
@@ -239,7 +212,8 @@ def update_db_schema(database_id, headers, updates):
                 }
             }
         }
-    :return: The updated database object as a dictionary, or None if an error occurred.
+    :return: The updated database object as a dictionary, or None if there was nothing to update.
+    :raises NotionAPIError: If the schema cannot be fetched or updated.
 
     sample usage:
         updates = {
@@ -247,66 +221,4 @@ def update_db_schema(database_id, headers, updates):
         }
         updated_db = update_db_schema(DATABASE_ID, HEADERS, updates)
     """
-    url = f"https://api.notion.com/v1/databases/{database_id}"
-
-    # Fetch current schema
-    current_schema = get_db_schema(database_id, headers)
-    if not current_schema:
-        print("Cannot update schema without fetching the current schema.")
-        return None
-
-    # Prepare the properties to update
-    updated_properties = {}
-    for prop_name, prop_changes in updates.get("properties", {}).items():
-        if "new_name" in prop_changes:
-            # Rename the property
-            updated_properties[prop_changes["new_name"]] = current_schema["properties"].get(prop_name)
-            del updated_properties[prop_changes["new_name"]]["name"]  # Remove old name
-            updated_properties[prop_changes["new_name"]]["name"] = prop_changes["new_name"]
-        else:
-            # Update or add options for select/multi_select
-            if prop_changes["type"] in ["select", "multi_select"]:
-                property_obj = current_schema["properties"].get(prop_name)
-                if not property_obj:
-                    print(f"Property '{prop_name}' does not exist in the database.")
-                    continue
-
-                # Merge existing options with new ones
-                existing_options = property_obj.get(prop_changes["type"], {}).get("options", [])
-                new_options = prop_changes[prop_changes["type"]].get("options", [])
-                # Avoid duplicates based on option name
-                existing_option_names = {opt["name"] for opt in existing_options}
-                for opt in new_options:
-                    if opt["name"] not in existing_option_names:
-                        existing_options.append(opt)
-                # Prepare the updated property
-                updated_properties[prop_name] = {
-                    "type": prop_changes["type"],
-                    prop_changes["type"]: {
-                        "options": existing_options
-                    }
-                }
-            else:
-                print(f"Property type '{prop_changes['type']}' not supported for updates.")
-                continue
-
-    if not updated_properties:
-        print("No valid updates found to apply.")
-        return None
-
-    payload = {
-        "properties": updated_properties
-    }
-
-    response = requests.patch(url, headers=headers, data=json.dumps(payload))
-
-    if response.status_code == 200:
-        updated_database = response.json()
-        print("Database schema updated successfully!")
-        # Optionally, save the updated schema
-        get_db_schema(database_id, headers)  # This will overwrite the existing schema file
-        return updated_database
-    else:
-        print(f"Failed to update database schema: {response.status_code}")
-        print(response.text)
-        return None
+    return get_client(headers).update_db_schema(updates, database_id)
@@ -0,0 +1,59 @@
+'''
+FILE: src/notion/errors.py
+DESCRIPTION: Exception types raised by the Notion client once a request
+has truly failed (after any retries).
+'''
+
+
+class NotionAPIError(Exception):
+    """
+    Base class for every error raised by the Notion client.
+
+    :ivar status: HTTP status code of the last response, or None if no response arrived.
+    :ivar code: Notion error code from the response body, e.g. "validation_error".
+    :ivar body: Raw text of the last response body.
+    """
+    def __init__(self, message, status=None, code=None, body=None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.body = body
+
+    @classmethod
+    def from_response(cls, response, message):
+        """
+        Builds the error from a requests.Response, picking up Notion's error code and message.
+        """
+        code = None
+        try:
+            data = response.json()
+            code = data.get("code")
+            message = f"{message}: {data.get('message', response.text)}"
+        except ValueError:
+            message = f"{message}: {response.text}"
+        return cls(message, status=response.status_code, code=code, body=response.text)
+
+
+class NotionRequestError(NotionAPIError):
+    """
+    The request was rejected (4xx other than 429), e.g. a bad filter or a missing page.
+    Retrying will not help.
+    """
+
+
+class NotionRateLimitError(NotionAPIError):
+    """
+    Still throttled (429) after every retry was used up.
+    """
+
+
+class NotionServerError(NotionAPIError):
+    """
+    Notion kept answering with a server error (5xx) after every retry was used up.
+    """
+
+
+class NotionTimeoutError(NotionAPIError):
+    """
+    The request timed out or the connection failed after every retry was used up.
+    """
@@ -0,0 +1,446 @@
+'''
+FILE: src/notion/fake_server.py
+DESCRIPTION: A local stand-in for the Notion API endpoints used by the
+client (database query with filters, sorts and cursor pagination, pages
+CRUD, database GET/PATCH). It serves a synthetic applications database and
+can add latency and inject 429s, so the client can be measured and
+regression-tested without touching the real workspace.
+'''
+
+# global imports
+import json
+import time
+import uuid
+import zlib
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Pied Piper"]
+STAGES = ["Waiting of Referal", "Ready to Apply", "Applied", "Recruiter Call", "OT", "Interview", "Offer", "Rejected"]
+LOCATIONS = ["Palo Alto", "CA", "WA", "NY", "Multiple Locations", "Beaverton", "OR"]
+DESIGNATIONS = ["Intern", "Data Science", "Quant", "Applied Scientist", "Software", "Machine Learning", "Backend"]
+USER = {"object": "user", "id": "7685ee79-e130-4dce-840d-c3b743a770bd"}
+ANNOTATIONS = {"bold": False, "italic": False, "strikethrough": False, "underline": False, "code": False, "color": "default"}
+
+
+def _rich_text(content):
+    return [{"type": "text", "text": {"content": content, "link": None}, "annotations": dict(ANNOTATIONS),
+             "plain_text": content, "href": None}]
+
+
+def make_page(i, database_id="fake-database", rng=random):
+    """
+    Builds a synthetic page of the applications database, shaped like a real
+    Notion page object (ids, user objects, annotations, urls, ...).
+
+    :param i: Index of the row, used for the Job ID and edit time.
+    :param database_id: The parent database ID.
+    :param rng: (Optional) random.Random instance for reproducible data.
+    :return: A Notion page object.
+    """
+    edited = (datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:00.000Z")
+    page_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    pick = lambda options, k: [{"id": f"{zlib.crc32(name.encode()):08x}", "name": name, "color": "default"}
+                               for name in rng.sample(options, k)]
+    return {
+        "object": "page",
+        "id": page_id,
+        "created_time": edited,
+        "last_edited_time": edited,
+        "created_by": dict(USER),
+        "last_edited_by": dict(USER),
+        "cover": None,
+        "icon": None,
+        "parent": {"type": "database_id", "database_id": database_id},
+        "archived": False,
+        "in_trash": False,
+        "properties": {
+            "Designation": {"id": "Ex_X", "type": "multi_select", "multi_select": pick(DESIGNATIONS, rng.randint(1, 3))},
+            "Stage": {"id": "%5D%3EAz", "type": "select", "select": pick(STAGES, 1)[0]},
+            "Job ID": {"id": "%5EGf%5D", "type": "rich_text", "rich_text": _rich_text(f"JOB-{i:07d}")},
+            "Location": {"id": "i%40iv", "type": "multi_select", "multi_select": pick(LOCATIONS, rng.randint(1, 2))},
+            "Date Applied": {"id": "%7Bg_%7C", "type": "date",
+                             "date": {"start": edited[:10], "end": None, "time_zone": None}},
+            "Company": {"id": "title", "type": "title", "title": _rich_text(rng.choice(COMPANIES))},
+        },
+        "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+        "public_url": None,
+    }
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+
+def _error(status, code, message):
+    return status, {"object": "error", "status": status, "code": code, "message": message}
+
+
+def _value(prop):
+    """
+    Plain value of a stored (read-form) property: text, option name(s), date start or scalar.
+    """
+    prop_type = prop["type"]
+    value = prop.get(prop_type)
+    if prop_type in ("title", "rich_text"):
+        return "".join(part["plain_text"] for part in value)
+    if prop_type in ("select", "status"):
+        return value["name"] if value else None
+    if prop_type == "multi_select":
+        return [opt["name"] for opt in value]
+    if prop_type == "date":
+        return value["start"] if value else None
+    return value
+
+
+def _matches(condition, value):
+    """
+    Evaluates one Notion filter condition (e.g. {"equals": "Applied"}) against a plain value.
+    """
+    (operator, operand), = condition.items()
+    if operator == "is_empty":
+        return not value
+    if operator == "is_not_empty":
+        return bool(value)
+    if isinstance(value, list):
+        if operator == "contains":
+            return operand in value
+        if operator == "does_not_contain":
+            return operand not in value
+        raise ValueError(f"Unsupported multi_select filter '{operator}'.")
+    if operator == "equals":
+        return value == operand
+    if operator == "does_not_equal":
+        return value != operand
+    if value is None:
+        return False
+    if operator == "contains":
+        return operand in value
+    if operator == "does_not_contain":
+        return operand not in value
+    if operator == "starts_with":
+        return value.startswith(operand)
+    if operator == "ends_with":
+        return value.endswith(operand)
+    # Dates and numbers; ISO strings of the same shape compare correctly
+    comparisons = {
+        "before": lambda a, b: a < b, "after": lambda a, b: a > b,
+        "on_or_before": lambda a, b: a <= b, "on_or_after": lambda a, b: a >= b,
+        "less_than": lambda a, b: a < b, "greater_than": lambda a, b: a > b,
+        "less_than_or_equal_to": lambda a, b: a <= b, "greater_than_or_equal_to": lambda a, b: a >= b,
+    }
+    if operator not in comparisons:
+        raise ValueError(f"Unsupported filter '{operator}'.")
+    # Compare dates with date-times on their common prefix
+    if isinstance(value, str) and isinstance(operand, str):
+        length = min(len(value), len(operand))
+        return comparisons[operator](value[:length], operand[:length])
+    return comparisons[operator](value, operand)
+
+
+class FakeNotion:
+    """
+    In-memory state of the stand-in: one database (schema + pages) plus the
+    fault injection settings. Safe to use from the server's handler threads.
+
+    sample usage:
+        state = FakeNotion(rows=10000, latency=0.05, rate_limit_every=20)
+    """
+
+    def __init__(self, database_id="fake-database", schema_path="data/notion_db_schema.json", rows=0,
+                 latency=0.0, rate_limit_every=0, retry_after=0.1, seed=0):
+        """
+        :param database_id: ID of the fake database.
+        :param schema_path: Schema (database object) the fake database starts from.
+        :param rows: Number of synthetic rows to create.
+        :param latency: Seconds added to every response, or a (min, max) range.
+        :param rate_limit_every: Answer every Nth request with 429, 0 to disable.
+        :param retry_after: Retry-After (seconds) sent with injected 429s.
+        :param seed: Seed of the synthetic data.
+        """
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            self.schema = json.load(f)
+        self.schema["id"] = database_id
+        self.database_id = database_id
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.pages = {}
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+        rng = random.Random(seed)
+        for i in range(rows):
+            page = make_page(i, database_id, rng)
+            for name, prop in page["properties"].items():
+                prop.update(self._read_form(name, {prop["type"]: self._write_form(prop)}))
+            self.pages[page["id"]] = page
+
+    def _write_form(self, prop):
+        value = prop[prop["type"]]
+        if prop["type"] in ("select", "status"):
+            return {"name": value["name"]} if value else None
+        if prop["type"] == "multi_select":
+            return [{"name": opt["name"]} for opt in value]
+        return value
+
+    def _option(self, prop_name, ref):
+        prop = self.schema["properties"][prop_name]
+        options = prop[prop["type"]].setdefault("options", [])
+        for opt in options:
+            if opt["id"] == ref.get("id") or opt["name"] == ref.get("name"):
+                return {k: opt[k] for k in ("id", "name", "color")}
+        # Unknown names create the option, as Notion does
+        opt = {"id": f"{zlib.crc32(ref['name'].encode()):08x}", "name": ref["name"], "color": "default", "description": None}
+        options.append(opt)
+        return {k: opt[k] for k in ("id", "name", "color")}
+
+    def _read_form(self, prop_name, value):
+        """
+        Converts a property value as sent by a client into the form Notion returns.
+        """
+        prop = self.schema["properties"].get(prop_name)
+        if prop is None:
+            raise KeyError(prop_name)
+        prop_type = prop["type"]
+        value = value.get(prop_type)
+        if prop_type in ("title", "rich_text"):
+            content = "".join(part.get("text", {}).get("content", part.get("plain_text", "")) for part in value or [])
+            value = _rich_text(content) if content else []
+        elif prop_type in ("select", "status"):
+            value = self._option(prop_name, value) if value else None
+        elif prop_type == "multi_select":
+            value = [self._option(prop_name, ref) for ref in value or []]
+        elif prop_type == "date" and value:
+            value = {"start": value["start"], "end": value.get("end"), "time_zone": value.get("time_zone")}
+        return {"id": prop["id"], "type": prop_type, prop_type: value}
+
+    def throttle(self):
+        """
+        Counts a request and tells whether it should be answered with 429.
+        """
+        with self.lock:
+            self.requests += 1
+            if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+                self.throttled += 1
+                return True
+        return False
+
+    def delay(self):
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def _row_matches(self, page, filter_obj):
+        if "and" in filter_obj:
+            return all(self._row_matches(page, f) for f in filter_obj["and"])
+        if "or" in filter_obj:
+            return any(self._row_matches(page, f) for f in filter_obj["or"])
+        if "timestamp" in filter_obj:
+            key = filter_obj["timestamp"]
+            return _matches(filter_obj[key], page[key])
+        prop = page["properties"].get(filter_obj["property"])
+        if prop is None:
+            raise KeyError(filter_obj["property"])
+        condition = next(v for k, v in filter_obj.items() if k != "property")
+        return _matches(condition, _value(prop))
+
+    def query(self, database_id, payload):
+        if database_id.replace("-", "") != self.database_id.replace("-", ""):
+            return _error(404, "object_not_found", f"Could not find database with ID: {database_id}.")
+        page_size = min(payload.get("page_size", 100), 100)
+        with self.lock:
+            rows = [page for page in self.pages.values() if not page["archived"]]
+        try:
+            if payload.get("filter"):
+                rows = [page for page in rows if self._row_matches(page, payload["filter"])]
+        except (KeyError, ValueError) as e:
+            return _error(400, "validation_error", f"Invalid filter: {e}")
+        # Apply sorts last-to-first so the first sort is the primary key
+        for sort in reversed(payload.get("sorts") or []):
+            if "timestamp" in sort:
+                key = lambda page, name=sort["timestamp"]: page[name]
+            else:
+                key = lambda page, name=sort["property"]: _value(page["properties"][name]) or ""
+            rows.sort(key=key, reverse=sort.get("direction") == "descending")
+
+        start = int(payload.get("start_cursor") or 0)
+        results = rows[start:start + page_size]
+        has_more = start + page_size < len(rows)
+        return 200, {"object": "list", "results": results, "has_more": has_more,
+                     "next_cursor": str(start + page_size) if has_more else None, "type": "page_or_database"}
+
+    def get_page(self, page_id):
+        with self.lock:
+            page = self.pages.get(page_id)
+        if page is None:
+            return _error(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+        return 200, page
+
+    def create_page(self, payload):
+        parent = payload.get("parent", {}).get("database_id", "")
+        if parent.replace("-", "") != self.database_id.replace("-", ""):
+            return _error(404, "object_not_found", f"Could not find database with ID: {parent}.")
+        with self.lock:
+            page = make_page(len(self.pages), self.database_id)
+            page["created_time"] = page["last_edited_time"] = _now()
+            try:
+                properties = {name: self._read_form(name, value)
+                              for name, value in payload.get("properties", {}).items()}
+            except KeyError as e:
+                return _error(400, "validation_error", f"{e} is not a property that exists.")
+            # Properties that were not given are empty
+            for name, prop in page["properties"].items():
+                page["properties"][name] = properties.get(name) or self._read_form(name, {prop["type"]: None})
+            self.pages[page["id"]] = page
+        return 200, page
+
+    def update_page(self, page_id, payload):
+        with self.lock:
+            page = self.pages.get(page_id)
+            if page is None:
+                return _error(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+            try:
+                for name, value in payload.get("properties", {}).items():
+                    page["properties"][name] = self._read_form(name, value)
+            except KeyError as e:
+                return _error(400, "validation_error", f"{e} is not a property that exists.")
+            if "archived" in payload:
+                page["archived"] = page["in_trash"] = bool(payload["archived"])
+            page["last_edited_time"] = _now()
+        return 200, page
+
+    def get_database(self, database_id):
+        if database_id.replace("-", "") != self.database_id.replace("-", ""):
+            return _error(404, "object_not_found", f"Could not find database with ID: {database_id}.")
+        return 200, self.schema
+
+    def update_database(self, database_id, payload):
+        status, schema = self.get_database(database_id)
+        if status != 200:
+            return status, schema
+        with self.lock:
+            for name, changes in payload.get("properties", {}).items():
+                prop = schema["properties"].setdefault(name, {"id": name, "name": name})
+                prop.update(changes)
+                if changes.get("type") in ("select", "multi_select"):
+                    for opt in prop[changes["type"]].get("options", []):
+                        opt.setdefault("id", f"{zlib.crc32(opt['name'].encode()):08x}")
+            schema["last_edited_time"] = _now()
+        return 200, schema
+
+
+class FakeNotionHandler(BaseHTTPRequestHandler):
+    """
+    Serves the Notion endpoints used by the client from the server's FakeNotion state.
+    Speaks HTTP/1.1 so clients can keep connections alive.
+    """
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs
+    # add ~40ms to every response on a kept-alive connection.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _handle(self, method):
+        state = self.server.state
+        payload = self._read_json()
+        state.delay()
+        if state.throttle():
+            status, body = _error(429, "rate_limited", "You have been rate limited. Please try again in a few minutes.")
+            self._send_json(status, body, {"Retry-After": str(state.retry_after)})
+            return
+
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if parts[:1] != ["v1"]:
+            status, body = _error(404, "invalid_request_url", "Invalid request URL.")
+        elif method == "POST" and len(parts) == 4 and parts[1] == "databases" and parts[3] == "query":
+            status, body = state.query(parts[2], payload)
+        elif method == "POST" and parts[1:] == ["pages"]:
+            status, body = state.create_page(payload)
+        elif len(parts) == 3 and parts[1] == "pages" and method in ("GET", "PATCH"):
+            status, body = state.get_page(parts[2]) if method == "GET" else state.update_page(parts[2], payload)
+        elif len(parts) == 3 and parts[1] == "databases" and method in ("GET", "PATCH"):
+            status, body = state.get_database(parts[2]) if method == "GET" else state.update_database(parts[2], payload)
+        else:
+            status, body = _error(400, "invalid_request_url", "Invalid request URL.")
+        self._send_json(status, body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+
+def start_server(host="127.0.0.1", port=0, state=None, **state_kwargs):
+    """
+    Starts the stand-in server on a background thread.
+
+    :param host: Interface to bind to.
+    :param port: Port to bind to, 0 picks a free one.
+    :param state: (Optional) A FakeNotion to serve, built from `state_kwargs` when not given.
+    :param state_kwargs: Arguments for FakeNotion, e.g. rows=10000, latency=0.05, rate_limit_every=20.
+    :return: A tuple (server, base_url) where base_url can be passed to NotionClient;
+             the FakeNotion is available as server.state.
+
+    sample usage:
+        server, base_url = start_server(rows=1000)
+        client = NotionClient(api_key="fake", database_id=server.state.database_id, base_url=base_url)
+        ...
+        server.shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), FakeNotionHandler)
+    server.daemon_threads = True
+    server.state = state or FakeNotion(**state_kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Notion API.")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on.")
+    parser.add_argument('--rows', type=int, default=1000, help="Number of synthetic rows.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument('--rate_limit_every', type=int, default=0, help="Answer every Nth request with 429.")
+
+    args = parser.parse_args()
+
+    server, base_url = start_server(port=args.port, rows=args.rows, latency=args.latency,
+                                    rate_limit_every=args.rate_limit_every)
+    print(f"Fake Notion API at {base_url} (database ID: {server.state.database_id})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+# sample use:
+# python -m src.notion.fake_server --rows 10000 --latency 0.05
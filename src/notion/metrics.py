@@ -0,0 +1,222 @@
+'''
+FILE: src/notion/metrics.py
+DESCRIPTION: Per-request instrumentation for the Notion API. Every call sent
+through the RequestScheduler is recorded (endpoint, method, status, bytes in
+and out, latency, retries) into per-endpoint counters and fixed-size latency
+histograms, and kept in a bounded log that can be dumped as JSON lines.
+'''
+
+# global imports
+import re
+import json
+import math
+import time
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+# Path segments that follow these are object IDs
+ID_PARENTS = {"pages", "databases", "blocks", "users"}
+ID_PATTERN = re.compile(r"[0-9a-fA-F-]{32,36}")
+
+
+def endpoint_name(url) -> str:
+    """
+    Turns a request URL into its endpoint template, e.g.
+    ".../v1/databases/1674d511.../query" -> "/databases/{id}/query".
+    """
+    parts = urlsplit(url).path.strip("/").split("/")
+    if parts and parts[0] == "v1":
+        parts = parts[1:]
+    for i, part in enumerate(parts):
+        if (i > 0 and parts[i - 1] in ID_PARENTS) or ID_PATTERN.fullmatch(part):
+            parts[i] = "{id}"
+    return "/" + "/".join(parts)
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram: constant memory, percentiles accurate to
+    the bucket width (about 5%).
+    """
+    GROWTH = 1.05
+    MIN_SECONDS = 1e-4
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket(self, seconds):
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        return int(math.log(seconds / self.MIN_SECONDS, self.GROWTH)) + 1
+
+    def add(self, seconds):
+        bucket = self._bucket(seconds)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p) -> float:
+        """
+        Returns the latency (seconds) at percentile `p` (0-100), using the upper edge of its bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.max, self.MIN_SECONDS * self.GROWTH ** bucket)
+        return self.max
+
+
+class EndpointStats:
+    """
+    Counters and latency histogram for one (method, endpoint) pair.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.statuses = {}
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "statuses": dict(self.statuses),
+            "mean_ms": self.latency.total / self.latency.count * 1000 if self.latency.count else 0.0,
+            "p50_ms": self.latency.percentile(50) * 1000,
+            "p95_ms": self.latency.percentile(95) * 1000,
+            "p99_ms": self.latency.percentile(99) * 1000,
+            "max_ms": self.latency.max * 1000,
+        }
+
+
+class Metrics:
+    """
+    Thread-safe registry of per-endpoint stats plus a bounded log of recent calls.
+
+    sample usage:
+        metrics = get_default_metrics()
+        for line in metrics.summary_lines():
+            print(line)
+        metrics.dump_jsonl("data/notion_metrics.jsonl")
+    """
+
+    def __init__(self, max_events=10000):
+        """
+        :param max_events: Number of most recent calls kept for dump_jsonl (until they are dumped).
+        """
+        self.stats = {}
+        self.events = deque(maxlen=max_events)
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def record(self, method, url, status, bytes_in, bytes_out, latency, retries, waited=0.0):
+        """
+        Records one API call (after its retries).
+
+        :param method: HTTP method.
+        :param url: Request URL; IDs are folded into the endpoint template.
+        :param status: Final HTTP status, or None if no response arrived.
+        :param bytes_in: Size of the final response body.
+        :param bytes_out: Size of the request body.
+        :param latency: Seconds from the first attempt to the final response, including retries.
+        :param retries: Number of retries made.
+        :param waited: Seconds spent waiting on the rate limiter.
+        """
+        endpoint = endpoint_name(url)
+        with self.lock:
+            stats = self.stats.get((method, endpoint))
+            if stats is None:
+                stats = self.stats[(method, endpoint)] = EndpointStats()
+            stats.calls += 1
+            stats.retries += retries
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if status is None or status >= 400:
+                stats.errors += 1
+            stats.latency.add(latency)
+            self.events.append({
+                "time": time.time(), "method": method, "endpoint": endpoint, "status": status,
+                "bytes_in": bytes_in, "bytes_out": bytes_out, "latency_ms": latency * 1000,
+                "waited_ms": waited * 1000, "retries": retries,
+            })
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+            self.events.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> list:
+        """
+        Returns one dictionary per (method, endpoint) with its counters and p50/p95/p99 latency.
+        """
+        with self.lock:
+            return [{"method": method, "endpoint": endpoint, **stats.as_dict()}
+                    for (method, endpoint), stats in sorted(self.stats.items(), key=lambda item: item[0][1])]
+
+    def summary_lines(self) -> list:
+        """
+        Formats the snapshot as fixed-width text lines, e.g. for the curses menu.
+        """
+        lines = [f"{'METHOD':<6} {'ENDPOINT':<26} {'CALLS':>6} {'ERR':>4} {'RETRY':>5} "
+                 f"{'P50 ms':>8} {'P95 ms':>8} {'P99 ms':>8} {'KB IN':>8} {'KB OUT':>7}"]
+        for row in self.snapshot():
+            lines.append(f"{row['method']:<6} {row['endpoint']:<26} {row['calls']:>6} {row['errors']:>4} "
+                         f"{row['retries']:>5} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+                         f"{row['bytes_in'] / 1024:>8.1f} {row['bytes_out'] / 1024:>7.1f}")
+        return lines
+
+    def dump_jsonl(self, path, summary=True):
+        """
+        Appends the calls recorded since the last dump (and, optionally, one summary line per
+        endpoint) to a JSON lines file. Dumped calls are removed from the log, so dumping twice
+        never writes a call twice.
+
+        :param path: The file to append to.
+        :param summary: (Optional) Also write the per-endpoint snapshot, tagged "type": "summary".
+                        Its counters are cumulative since start-up (or `reset`), given as "since".
+        :return: The number of lines written.
+        """
+        with self.lock:
+            events = list(self.events)
+            self.events.clear()
+            since = self.started
+        lines = [{"type": "call", **event} for event in events]
+        if summary:
+            lines += [{"type": "summary", "cumulative": True, "since": since, **row} for row in self.snapshot()]
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                for line in lines:
+                    f.write(json.dumps(line) + "\n")
+        except OSError:
+            # Keep the calls for the next dump
+            with self.lock:
+                self.events.extendleft(reversed(events))
+            raise
+        return len(lines)
+
+
+_default_metrics = Metrics()
+
+
+def get_default_metrics() -> Metrics:
+    """
+    Returns the process-wide registry that schedulers record into by default.
+    """
+    return _default_metrics
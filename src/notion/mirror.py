@@ -0,0 +1,293 @@
+'''
+FILE: src/notion/mirror.py
+DESCRIPTION: A local SQLite mirror of the applications database. A sync
+only asks Notion for pages edited since the stored high-water mark and
+upserts them, so reads like "all rows in Stage = Applied" or "does Job ID X
+exist" are answered locally without a full API scan. Notion's queries never
+return archived pages, so a full scan still runs now and then (once a day by
+default) to find rows deleted since.
+'''
+
+# global imports
+import os
+import json
+import time
+import sqlite3
+import argparse
+from dotenv import load_dotenv
+
+# local imports
+from src.notion.client import NotionClient
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    page_id TEXT PRIMARY KEY,
+    last_edited_time TEXT NOT NULL,
+    archived INTEGER NOT NULL DEFAULT 0,
+    company TEXT,
+    stage TEXT,
+    job_id TEXT,
+    location TEXT,
+    designation TEXT,
+    date_applied TEXT,
+    page TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rows_stage ON rows (stage) WHERE archived = 0;
+CREATE INDEX IF NOT EXISTS rows_job_id ON rows (job_id) WHERE archived = 0;
+CREATE INDEX IF NOT EXISTS rows_company ON rows (company) WHERE archived = 0;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Mirror column -> Notion property name
+COLUMNS = {
+    "company": "Company",
+    "stage": "Stage",
+    "job_id": "Job ID",
+    "location": "Location",
+    "designation": "Designation",
+    "date_applied": "Date Applied",
+}
+# Seconds between the full scans that detect archived rows
+RECONCILE_EVERY = 24 * 3600
+
+
+def property_text(prop):
+    """
+    Flattens a Notion property value into plain text for the indexed columns.
+
+    :param prop: A property value from a page's "properties".
+    :return: The text of the value (multi_select names are comma-joined), or None if empty.
+    """
+    if not prop:
+        return None
+    prop_type = prop.get("type")
+    value = prop.get(prop_type)
+    if prop_type in ("title", "rich_text"):
+        return "".join(part.get("plain_text", "") for part in value) or None
+    if prop_type in ("select", "status"):
+        return value["name"] if value else None
+    if prop_type == "multi_select":
+        return ", ".join(opt["name"] for opt in value) or None
+    if prop_type == "date":
+        return value["start"] if value else None
+    return value if isinstance(value, (str, int, float)) else None
+
+
+class NotionMirror:
+    """
+    SQLite mirror of a Notion database with incremental (delta) sync.
+
+    sample usage:
+        with NotionMirror(client, DATABASE_ID) as mirror:
+            mirror.sync()
+            applied = mirror.rows(stage="Applied")
+            mirror.has_job_id("12345")
+    """
+
+    def __init__(self, client, database_id=None, path="data/notion_mirror.sqlite3"):
+        """
+        :param client: The NotionClient to sync through.
+        :param database_id: (Optional) The database to mirror, defaults to the client's.
+        :param path: Location of the SQLite file.
+        """
+        self.client = client
+        self.database_id = database_id or client.database_id
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def high_water_mark(self):
+        """
+        The newest last_edited_time stored locally, or None before the first sync.
+        """
+        return self._get_meta("high_water_mark")
+
+    def upsert(self, pages):
+        """
+        Inserts or replaces pages in the mirror. Pages flagged archived / in_trash are kept but marked archived.
+
+        :param pages: An iterable of Notion page objects.
+        :return: The number of pages written.
+        """
+        records = []
+        for page in pages:
+            props = page.get("properties", {})
+            records.append((
+                page["id"],
+                page["last_edited_time"],
+                int(bool(page.get("archived") or page.get("in_trash"))),
+                *(property_text(props.get(name)) for name in COLUMNS.values()),
+                json.dumps(page),
+            ))
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO rows (page_id, last_edited_time, archived, {', '.join(COLUMNS)}, page) "
+            f"VALUES ({', '.join('?' * (len(COLUMNS) + 4))})",
+            records,
+        )
+        return len(records)
+
+    def mark_archived(self, page_ids):
+        """
+        Marks rows as archived locally, e.g. after delete_row.
+        """
+        self.conn.executemany("UPDATE rows SET archived = 1 WHERE page_id = ?", ((pid,) for pid in page_ids))
+        self.conn.commit()
+
+    @property
+    def reconciled_at(self):
+        """
+        When the last full scan finished (seconds since the epoch), or None before the first sync.
+        """
+        value = self._get_meta("reconciled_at")
+        return float(value) if value is not None else None
+
+    def sync(self, reconcile=False, progress=None, reconcile_every=RECONCILE_EVERY):
+        """
+        Pulls the pages edited since the high-water mark and upserts them. The first sync
+        (and any reconciling sync) scans the whole database and marks every local row that
+        Notion no longer returns as archived, since queries never return archived pages.
+        Pages that come back archived or in the trash are marked archived in either case.
+
+        :param reconcile: (Optional) Force a full scan to detect rows archived since the last sync.
+        :param progress: (Optional) Callable taking (pages=..., rows=...) after each cursor page,
+                         e.g. Job.report; an exception it raises stops the sync after a commit.
+        :param reconcile_every: (Optional) Seconds after which a sync becomes a full scan even
+                                without `reconcile`; None to only scan when asked.
+        :return: A dictionary with the number of rows "updated" and "archived", and "full_scan".
+        :raises NotionAPIError: If a query still fails after retries; rows already pulled are kept.
+        """
+        hwm = self.high_water_mark
+        reconciled_at = self.reconciled_at
+        overdue = reconcile_every is not None and (reconciled_at is None or time.time() - reconciled_at >= reconcile_every)
+        full_scan = reconcile or hwm is None or overdue
+        filter_obj = None
+        if not full_scan:
+            # Notion rounds last_edited_time to the minute, so re-read the boundary minute
+            filter_obj = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": hwm}}
+        sorts = [{"timestamp": "last_edited_time", "direction": "ascending"}]
+
+        seen = set()
+        updated = 0
+        archived = 0
+        pages = 0
+        started = time.time()
+        newest = hwm
+        for data in self.client.iter_pages(self.database_id, filter_obj, sorts):
+            results = data.get("results", [])
+            # Pages that come back archived are marked so by upsert; count those that were live here
+            gone = [page["id"] for page in results if page.get("archived") or page.get("in_trash")]
+            if gone:
+                archived += self.conn.execute(
+                    f"SELECT COUNT(*) FROM rows WHERE archived = 0 AND page_id IN ({','.join('?' * len(gone))})",
+                    gone).fetchone()[0]
+            updated += self.upsert(results)
+            for page in results:
+                seen.add(page["id"])
+                if newest is None or page["last_edited_time"] > newest:
+                    newest = page["last_edited_time"]
+            # Commit per cursor page so an interrupted sync resumes from here
+            if newest:
+                self._set_meta("high_water_mark", newest)
+            self.conn.commit()
+            pages += 1
+            if progress is not None:
+                progress(pages=pages, rows=updated)
+
+        if full_scan:
+            live = [pid for (pid,) in self.conn.execute("SELECT page_id FROM rows WHERE archived = 0")]
+            gone = [pid for pid in live if pid not in seen]
+            self._set_meta("reconciled_at", str(started))
+            self.mark_archived(gone)
+            archived += len(gone)
+
+        return {"updated": updated, "archived": archived, "full_scan": full_scan}
+
+    def rows(self, stage=None, company=None, include_archived=False) -> list:
+        """
+        Returns mirrored page objects, optionally narrowed by Stage and/or Company.
+
+        :param stage: (Optional) Only rows in this Stage, e.g. "Applied".
+        :param company: (Optional) Only rows for this Company.
+        :param include_archived: (Optional) Include rows archived in Notion.
+        :return: A list of Notion page objects, as last synced.
+        """
+        return list(self.iter_rows(stage, company, include_archived))
+
+    def iter_rows(self, stage=None, company=None, include_archived=False):
+        """
+        Streams mirrored page objects one at a time; takes the same parameters as `rows`.
+        """
+        clauses, params = [], []
+        if not include_archived:
+            clauses.append("archived = 0")
+        if stage is not None:
+            clauses.append("stage = ?")
+            params.append(stage)
+        if company is not None:
+            clauses.append("company = ?")
+            params.append(company)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.conn.execute(f"SELECT page FROM rows {where} ORDER BY last_edited_time", params)
+        for (page,) in cursor:
+            yield json.loads(page)
+
+    def get(self, page_id) -> dict:
+        """
+        Returns the mirrored page object for `page_id`, or None if it is not mirrored.
+        """
+        row = self.conn.execute("SELECT page FROM rows WHERE page_id = ?", (page_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def has_job_id(self, job_id) -> bool:
+        """
+        Whether a live (non-archived) row with this Job ID is mirrored.
+        """
+        row = self.conn.execute("SELECT 1 FROM rows WHERE job_id = ? AND archived = 0 LIMIT 1", (job_id,)).fetchone()
+        return row is not None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sync and query the local mirror of a Notion database.")
+    parser.add_argument('database_id', type=str, help="The ID of the Notion database.")
+    parser.add_argument('--path', type=str, default="data/notion_mirror.sqlite3", help="Location of the SQLite mirror.")
+    parser.add_argument('--reconcile', action='store_true',
+                        help="Full scan to detect archived rows now (done automatically once a day).")
+    parser.add_argument('--stage', type=str, help="Print the rows in this Stage after syncing.")
+    parser.add_argument('--job_id', type=str, help="Check whether this Job ID exists after syncing.")
+
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = NotionClient(api_key=os.getenv("NOTION_API_KEY"))
+    mirror = NotionMirror(client, args.database_id, args.path)
+    result = mirror.sync(reconcile=args.reconcile)
+    print(f"Synced: {result['updated']} updated, {result['archived']} archived.")
+    if args.stage:
+        for page in mirror.rows(stage=args.stage):
+            print(page["id"], property_text(page["properties"].get("Company")))
+    if args.job_id:
+        print(f"Job ID {args.job_id}: {'found' if mirror.has_job_id(args.job_id) else 'not found'}")
+
+# sample use:
+# python -m src.notion.mirror 1674d51105a8805f8312e91518420596 --stage Applied
@@ -0,0 +1,160 @@
+'''
+FILE: src/notion/records.py
+DESCRIPTION: Compact, typed JobApplication records decoded from Notion page
+JSON, and the matching encoder back to Notion properties. The decoder is
+built once from the property types in the database schema, so bulk decoding
+is a flat loop over precomputed (field, property, decode function) steps.
+'''
+
+# global imports
+import sys
+import json
+
+# local imports
+from src.notion.schema import encode_value, option_index
+
+# JobApplication field -> Notion property name
+FIELDS = {
+    "company": "Company",
+    "stage": "Stage",
+    "job_id": "Job ID",
+    "location": "Location",
+    "designation": "Designation",
+    "date_applied": "Date Applied",
+}
+
+
+class JobApplication:
+    """
+    One row of the applications database. Uses __slots__ and interned strings
+    (stages, locations and designations repeat across rows) to keep the
+    per-row footprint a small fraction of the raw page dictionary.
+    Multi-select fields are tuples of option names; dates are ISO strings.
+    """
+    __slots__ = ("page_id", "last_edited_time", *FIELDS)
+
+    def __init__(self, page_id=None, last_edited_time=None, company=None, stage=None, job_id=None,
+                 location=(), designation=(), date_applied=None):
+        self.page_id = page_id
+        self.last_edited_time = last_edited_time
+        self.company = company
+        self.stage = stage
+        self.job_id = job_id
+        self.location = location
+        self.designation = designation
+        self.date_applied = date_applied
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"JobApplication({fields})"
+
+    def __eq__(self, other):
+        if not isinstance(other, JobApplication):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _decode_text(value):
+    if not value:
+        return None
+    return "".join(part["plain_text"] for part in value) or None
+
+
+def _decode_select(value):
+    return sys.intern(value["name"]) if value else None
+
+
+def _decode_multi_select(value):
+    return tuple(sys.intern(opt["name"]) for opt in value) if value else ()
+
+
+def _decode_date(value):
+    return value["start"] if value else None
+
+
+def _decode_plain(value):
+    return value
+
+
+DECODERS = {
+    "title": _decode_text,
+    "rich_text": _decode_text,
+    "select": _decode_select,
+    "status": _decode_select,
+    "multi_select": _decode_multi_select,
+    "date": _decode_date,
+    "number": _decode_plain,
+    "url": _decode_plain,
+    "email": _decode_plain,
+    "phone_number": _decode_plain,
+    "checkbox": _decode_plain,
+}
+
+
+class RecordCodec:
+    """
+    Decodes Notion pages into JobApplication records and encodes records back
+    into Notion properties, based on the property types of the database schema.
+
+    sample usage:
+        codec = RecordCodec.from_file("data/notion_db_schema.json")
+        applications = codec.decode_many(rows)
+        properties = codec.encode(applications[0], fields=["stage"])
+    """
+
+    def __init__(self, schema):
+        """
+        :param schema: The database object, e.g. from get_db_schema or SchemaCache.get.
+        :raises KeyError: If a JobApplication field has no matching property in the schema.
+        """
+        properties = schema["properties"]
+        self.steps = []
+        self.types = {}
+        self.options = {}
+        for field, prop_name in FIELDS.items():
+            prop = properties[prop_name]
+            self.types[field] = prop["type"]
+            self.options[field] = option_index(prop)
+            self.steps.append((field, prop_name, prop["type"], DECODERS[prop["type"]]))
+
+    @classmethod
+    def from_file(cls, path="data/notion_db_schema.json"):
+        """
+        Builds the codec from a schema saved by get_db_schema.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def decode(self, page) -> JobApplication:
+        """
+        Decodes one Notion page object.
+        """
+        record = JobApplication(page["id"], page.get("last_edited_time"))
+        props = page["properties"]
+        for field, prop_name, prop_type, decode in self.steps:
+            prop = props.get(prop_name)
+            if prop is not None:
+                setattr(record, field, decode(prop.get(prop_type)))
+        return record
+
+    def decode_many(self, pages) -> list:
+        """
+        Decodes an iterable of Notion page objects (e.g. get_rows or iter_rows).
+        """
+        decode = self.decode
+        return [decode(page) for page in pages]
+
+    def encode(self, record, fields=None) -> dict:
+        """
+        Encodes a record as Notion properties for add_row/update_row.
+
+        :param record: A JobApplication.
+        :param fields: (Optional) Only encode these fields, e.g. ["stage"] for an update.
+        :return: A {property name: property value} dictionary.
+        """
+        fields = fields or FIELDS
+        return {FIELDS[field]: encode_value(self.types[field], getattr(record, field), self.options[field])
+                for field in fields}
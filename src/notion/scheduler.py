@@ -0,0 +1,231 @@
+'''
+FILE: src/notion/scheduler.py
+DESCRIPTION: A rate-limit-aware request scheduler shared by every Notion
+call. It paces requests with a token bucket sized to Notion's documented
+limit (about 3 requests per second), waits out 429 responses using
+Retry-After, and retries 5xx responses and timeouts with jittered
+exponential backoff before raising a typed error. Calls that are not safe to
+repeat (page creates) are retried only when Notion cannot have received them.
+'''
+
+# global imports
+import time
+import random
+import threading
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# local imports
+from src.notion.errors import NotionRequestError, NotionRateLimitError, NotionServerError, NotionTimeoutError
+from src.notion.metrics import get_default_metrics
+
+# Notion's documented average rate limit for an integration
+NOTION_RATE_LIMIT = 3
+# Transient failures worth retrying; Notion documents 409 conflict_error as retryable too
+RETRY_STATUSES = {409, 500, 502, 503, 504}
+# Methods that can be repeated without changing the result; POST is only safe for queries
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "PATCH", "DELETE"}
+
+
+def is_idempotent(method, url) -> bool:
+    """
+    Whether a call can be sent again after it may have reached Notion, e.g. after a
+    read timeout or a 5xx. A repeated database query is harmless, a repeated page
+    create adds a duplicate row.
+    """
+    method = method.upper()
+    return method in IDEMPOTENT_METHODS or (method == "POST" and url.rstrip("/").endswith("/query"))
+
+
+def was_not_sent(error) -> bool:
+    """
+    Whether a requests exception means the request never reached the server: the
+    connection could not be opened (refused, DNS failure, connect timeout).
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.Timeout) or not isinstance(error, requests.ConnectionError):
+        return False
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `acquire` blocks until a token is available,
+    so callers are paced at `rate` tokens per second with bursts of up to
+    `capacity`.
+    """
+    def __init__(self, rate=NOTION_RATE_LIMIT, capacity=None):
+        """
+        :param rate: Tokens added per second, None for no limit (e.g. a local stand-in server).
+        :param capacity: (Optional) Maximum burst size, defaults to `rate`.
+        """
+        self.rate = float(rate) if rate is not None else None
+        self.capacity = float(capacity if capacity is not None else (rate or 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def pause(self, seconds):
+        """
+        Stops handing out tokens for `seconds`, e.g. after a 429 with Retry-After.
+        Every caller sharing the bucket waits, not just the one that was throttled.
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def acquire(self):
+        """
+        Takes one token, sleeping until one is available.
+
+        :return: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.paused_until and self.rate is None:
+                    return waited
+                if now >= self.paused_until:
+                    start = max(self.updated, self.paused_until)
+                    self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    delay = (1 - self.tokens) / self.rate
+                else:
+                    delay = self.paused_until - now
+            time.sleep(delay)
+            waited += delay
+
+
+class RequestScheduler:
+    """
+    Sends requests through a shared TokenBucket and retries throttled or
+    transiently failing calls. Only calls that are still failing after the
+    retries raise (see src/notion/errors.py). Calls that are not idempotent
+    (see is_idempotent) are retried only after a 429 or a failed connect.
+
+    sample usage:
+        scheduler = RequestScheduler(rate=3)
+        response = scheduler.send(session, "GET", url)
+    """
+    def __init__(self, rate=NOTION_RATE_LIMIT, burst=None, max_retries=5,
+                 backoff_base=0.5, backoff_max=30.0, timeout=(5, 30), metrics=None):
+        """
+        :param rate: Requests per second allowed across every caller of this scheduler,
+                     None to disable pacing.
+        :param burst: (Optional) Maximum burst size, defaults to `rate`.
+        :param max_retries: Retries for a 429, 5xx or timeout before giving up.
+        :param backoff_base: Base delay (seconds) of the exponential backoff.
+        :param backoff_max: Upper bound (seconds) for a single backoff delay.
+        :param timeout: Default per-call timeout, seconds or a (connect, read) tuple.
+        :param metrics: (Optional) Metrics registry every call is recorded into,
+                        defaults to the process-wide one.
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.metrics = metrics or get_default_metrics()
+
+    def backoff(self, attempt):
+        """
+        Full-jitter exponential backoff delay for the given retry attempt (0-based).
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def retry_after(self, response, attempt):
+        """
+        Seconds to wait after a 429: the Retry-After header if present, else the backoff delay.
+        """
+        value = response.headers.get("Retry-After")
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return self.backoff(attempt)
+
+    def send(self, session, method, url, timeout=None, **kwargs):
+        """
+        Sends one request, waiting for a token first and retrying when throttled.
+
+        :param session: The requests.Session to send on.
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param timeout: (Optional) Timeout for this call, overrides the scheduler default.
+        :param kwargs: Extra arguments for session.request, e.g. data.
+        :return: The successful (2xx) requests.Response.
+        :raises NotionRequestError: On a 4xx response other than 429.
+        :raises NotionRateLimitError: If still throttled after every retry.
+        :raises NotionServerError: If still failing with 5xx after every retry.
+        :raises NotionTimeoutError: If the call kept timing out or failing to connect, or timed
+                                    out once when it is not idempotent.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        idempotent = is_idempotent(method, url)
+        attempt = 0
+        waited = 0.0
+        response = None
+        start = time.perf_counter()
+
+        try:
+            while True:
+                waited += self.bucket.acquire()
+                try:
+                    response = session.request(method, url, timeout=timeout, **kwargs)
+                except (requests.Timeout, requests.ConnectionError) as e:
+                    response = None
+                    if attempt >= self.max_retries or not (idempotent or was_not_sent(e)):
+                        raise NotionTimeoutError(f"{method} {url} failed: {e}") from e
+                    time.sleep(self.backoff(attempt))
+                    attempt += 1
+                    continue
+
+                if response.status_code < 400:
+                    return response
+
+                if response.status_code == 429:
+                    if attempt >= self.max_retries:
+                        raise NotionRateLimitError.from_response(response, f"{method} {url} rate limited")
+                    self.bucket.pause(self.retry_after(response, attempt))
+                elif response.status_code in RETRY_STATUSES:
+                    if attempt >= self.max_retries or not idempotent:
+                        if response.status_code < 500:
+                            raise NotionRequestError.from_response(response, f"{method} {url} failed")
+                        raise NotionServerError.from_response(response, f"{method} {url} failed")
+                    time.sleep(self.backoff(attempt))
+                else:
+                    raise NotionRequestError.from_response(response, f"{method} {url} failed")
+                attempt += 1
+        finally:
+            data = kwargs.get("data")
+            self.metrics.record(
+                method, url,
+                status=response.status_code if response is not None else None,
+                bytes_in=len(response.content) if response is not None else 0,
+                bytes_out=len(data) if data else 0,
+                latency=time.perf_counter() - start,
+                retries=attempt,
+                waited=waited,
+            )
+
+
+# Notion's limit applies per integration, so every client shares one scheduler by default
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RequestScheduler:
+    """
+    Returns the process-wide scheduler used by clients that are not given their own.
+    """
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
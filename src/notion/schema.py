@@ -0,0 +1,201 @@
+'''
+FILE: src/notion/schema.py
+DESCRIPTION: An in-memory cache of a Notion database schema, backed by the
+JSON file in data/. Keeps precomputed lookups (property name -> property,
+select/multi_select option name -> option) so option merging and property
+encoding do not need a network round-trip or a scan of the options lists.
+'''
+
+# global imports
+import os
+import json
+import time
+import threading
+
+# Property types whose values are encoded from a single plain value
+SIMPLE_TYPES = {"number", "url", "email", "phone_number", "checkbox"}
+
+
+def encode_value(prop_type, value, options=None) -> dict:
+    """
+    Encodes a plain Python value as a Notion property value of the given type.
+
+    :param prop_type: The property type, e.g. "select".
+    :param value: str for title/rich_text/select/status/date/url/email/phone_number,
+                  a list of str for multi_select, a number or bool for number/checkbox.
+    :param options: (Optional) Option name -> option lookup of the property; known options
+                    are referred to by id, unknown names are created by Notion on write.
+    :return: The Notion property value, e.g. {"select": {"id": "..."}}.
+    """
+    def encode_option(name):
+        opt = options.get(name) if options else None
+        return {"id": opt["id"]} if opt else {"name": name}
+
+    if prop_type in ("title", "rich_text"):
+        return {prop_type: [{"text": {"content": str(value)}}] if value else []}
+    if prop_type in ("select", "status"):
+        return {prop_type: encode_option(value) if value else None}
+    if prop_type == "multi_select":
+        return {prop_type: [encode_option(v) for v in value or []]}
+    if prop_type == "date":
+        return {prop_type: {"start": value} if value else None}
+    if prop_type in SIMPLE_TYPES:
+        return {prop_type: value}
+    raise ValueError(f"Property type '{prop_type}' not supported for encoding.")
+
+
+def option_index(prop) -> dict:
+    """
+    Returns the option name -> option lookup of a select/multi_select/status property
+    from the schema, or an empty dictionary for other property types.
+    """
+    if prop.get("type") not in ("select", "multi_select", "status"):
+        return {}
+    return {opt["name"]: opt for opt in prop.get(prop["type"], {}).get("options", [])}
+
+
+class SchemaCache:
+    """
+    Caches the schema (database object) of one Notion database.
+
+    The schema is loaded from `path` when it belongs to the same database and
+    is considered fresh for `ttl` seconds. After that, the next `get` refetches
+    it; if the database's last_edited_time has not changed, the lookups and the
+    file on disk are left as they are.
+
+    sample usage:
+        cache = SchemaCache(client, DATABASE_ID)
+        stage = cache.property("Stage")
+        applied = cache.option("Stage", "Applied")
+        properties = cache.encode_properties({"Company": "Acme", "Stage": "Applied"})
+    """
+
+    def __init__(self, client, database_id=None, path="data/notion_db_schema.json", ttl=300):
+        """
+        :param client: The NotionClient used to fetch the schema.
+        :param database_id: (Optional) The database, defaults to the client's.
+        :param path: JSON file backing the cache.
+        :param ttl: Seconds a fetched schema is trusted before checking Notion again.
+        """
+        self.client = client
+        self.database_id = database_id or client.database_id
+        self.path = path
+        self.ttl = ttl
+        self.schema = None
+        self.fetched_at = 0.0
+        self.properties = {}
+        self.options = {}
+        self.lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+        if schema.get("id", "").replace("-", "") != self.database_id.replace("-", ""):
+            return
+        # A schema from disk is as fresh as the file
+        self._index(schema, os.path.getmtime(self.path))
+
+    def _index(self, schema, fetched_at):
+        self.schema = schema
+        self.fetched_at = fetched_at
+        self.properties = schema.get("properties", {})
+        self.options = {name: option_index(prop) for name, prop in self.properties.items()}
+
+    @property
+    def last_edited_time(self):
+        return self.schema.get("last_edited_time") if self.schema else None
+
+    def is_fresh(self) -> bool:
+        return self.schema is not None and time.time() - self.fetched_at < self.ttl
+
+    def invalidate(self):
+        """
+        Forces the next `get` to check Notion.
+        """
+        with self.lock:
+            self.fetched_at = 0.0
+
+    def set(self, schema):
+        """
+        Stores a database object (e.g. the response of a schema PATCH) and saves it to disk.
+        """
+        with self.lock:
+            self._index(schema, time.time())
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(schema, f, indent=2)
+            print(f"Database schema saved to {self.path}")
+
+    def get(self, refresh=False) -> dict:
+        """
+        Returns the schema, fetching it only if the cached one is stale (or `refresh` is set).
+
+        :param refresh: (Optional) Ignore the TTL and check Notion now.
+        :return: The database object.
+        :raises NotionAPIError: If the schema has to be fetched and the call fails.
+        """
+        with self.lock:
+            if not refresh and self.is_fresh():
+                return self.schema
+            schema = self.client._request("GET", f"/databases/{self.database_id}")
+            if self.schema is not None and schema.get("last_edited_time") == self.last_edited_time:
+                # Unchanged: keep the lookups and skip rewriting the file
+                self.fetched_at = time.time()
+            else:
+                self.set(schema)
+            return self.schema
+
+    def property(self, name) -> dict:
+        """
+        Returns the schema entry (id, type, ...) of a property, or None if it does not exist.
+        The schema is checked against Notion first if it is older than the TTL.
+        """
+        self.get()
+        return self.properties.get(name)
+
+    def option(self, prop_name, option_name) -> dict:
+        """
+        Returns the select/multi_select/status option with this name, or None.
+        The schema is checked against Notion first if it is older than the TTL.
+        """
+        self.get()
+        return self.options.get(prop_name, {}).get(option_name)
+
+    def merge_options(self, prop_name, new_options) -> list:
+        """
+        Returns the existing options of a property followed by those of `new_options`
+        whose names are not already present. The cached schema is not modified, but it
+        is checked against Notion first if it is older than the TTL, so options added
+        since are not dropped.
+        """
+        self.get()
+        known = self.options.get(prop_name, {})
+        merged = list(known.values())
+        for opt in new_options:
+            if opt["name"] not in known:
+                merged.append(opt)
+        return merged
+
+    def encode_property(self, name, value) -> dict:
+        """
+        Encodes a plain Python value as a Notion property value, based on the property type.
+        See encode_value for the accepted values.
+
+        :param name: The property name.
+        :return: The Notion property value, e.g. {"select": {"id": "..."}}.
+        :raises KeyError: If the property does not exist in the schema.
+        """
+        prop = self.property(name)
+        if prop is None:
+            raise KeyError(f"Property '{name}' does not exist in the database.")
+        return encode_value(prop["type"], value, self.options.get(name))
+
+    def encode_properties(self, values) -> dict:
+        """
+        Encodes a {property name: plain value} dictionary for add_row/update_row.
+        """
+        return {name: self.encode_property(name, value) for name, value in values.items()}
@@ -0,0 +1,199 @@
+'''
+FILE: src/notion/writes.py
+DESCRIPTION: A write buffer for Notion rows. Creates, updates and archives
+are queued and then flushed through a worker pool, after collapsing every
+pending update of a page into one PATCH and dropping creates whose Job ID
+already exists, so a batch costs one request per distinct row change.
+'''
+
+# global imports
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# local imports
+from src.notion.errors import NotionAPIError
+
+# Notion accepts at most 100 conditions in one compound filter
+MAX_FILTER_CONDITIONS = 100
+
+
+def written_text(prop):
+    """
+    Reads the plain text of a title/rich_text property value in the form sent to Notion,
+    e.g. {"rich_text": [{"text": {"content": "123"}}]}.
+
+    :return: The text, or None if the value has none.
+    """
+    if not prop:
+        return None
+    for key in ("title", "rich_text"):
+        if key in prop:
+            text = "".join(part.get("plain_text") or part.get("text", {}).get("content", "")
+                           for part in prop[key])
+            return text or None
+    return None
+
+
+class WriteBuffer:
+    """
+    Queues row writes and sends them in one flush.
+
+    Before sending, all updates to the same page are merged into one PATCH (later
+    values win), an archive drops the page's pending updates, and creates whose
+    `job_id_property` value is already in the database (or earlier in the same
+    batch) are skipped.
+
+    sample usage:
+        buffer = WriteBuffer(client, DATABASE_ID, mirror=mirror)
+        for posting in postings:
+            buffer.create(properties_for(posting))
+        buffer.update(page_id, {"Stage": {"select": {"name": "Applied"}}})
+        result = buffer.flush()
+    """
+
+    def __init__(self, client, database_id=None, max_workers=4, job_id_property="Job ID", mirror=None):
+        """
+        :param client: The NotionClient to write through.
+        :param database_id: (Optional) The database new rows go to, defaults to the client's.
+        :param max_workers: (Optional) Number of writes in flight during a flush. The client's
+                            scheduler still paces them to Notion's rate limit.
+        :param job_id_property: (Optional) Property used to detect duplicate creates.
+        :param mirror: (Optional) A synced NotionMirror; existing Job IDs are checked locally
+                       instead of with a query.
+        """
+        self.client = client
+        self.database_id = database_id or client.database_id
+        self.max_workers = max_workers
+        self.job_id_property = job_id_property
+        self.mirror = mirror
+        self.lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.creates = []
+        self.updates = {}
+        self.archives = set()
+
+    def __len__(self):
+        return len(self.creates) + len(self.updates) + len(self.archives)
+
+    def create(self, properties):
+        """
+        Queues a new row.
+        """
+        with self.lock:
+            self.creates.append(properties)
+
+    def update(self, page_id, properties):
+        """
+        Queues property changes for a page, merged with any already queued for it.
+        """
+        with self.lock:
+            if page_id in self.archives:
+                return
+            self.updates.setdefault(page_id, {}).update(properties)
+
+    def archive(self, page_id):
+        """
+        Queues a page to be archived. Its pending updates are dropped.
+        """
+        with self.lock:
+            self.updates.pop(page_id, None)
+            self.archives.add(page_id)
+
+    def existing_job_ids(self, job_ids) -> set:
+        """
+        Returns the subset of `job_ids` already present in the database.
+
+        :raises KeyError: If `job_id_property` does not exist in the database.
+        :raises NotionAPIError: If the schema or the query cannot be fetched.
+        """
+        if self.mirror is not None:
+            return {job_id for job_id in job_ids if self.mirror.has_job_id(job_id)}
+
+        prop = self.client.schema_cache(self.database_id).property(self.job_id_property)
+        if prop is None:
+            raise KeyError(f"Property '{self.job_id_property}' does not exist in the database.")
+        prop_type = prop["type"]
+        job_ids = list(job_ids)
+        existing = set()
+        for i in range(0, len(job_ids), MAX_FILTER_CONDITIONS):
+            chunk = job_ids[i:i + MAX_FILTER_CONDITIONS]
+            filter_obj = {"or": [{"property": self.job_id_property, prop_type: {"equals": job_id}}
+                                 for job_id in chunk]}
+            for row in self.client.iter_rows(self.database_id, filter_obj, prefetch=False):
+                text = written_text(row["properties"].get(self.job_id_property))
+                if text:
+                    existing.add(text)
+        return existing
+
+    def _requeue(self, creates, updates, archives):
+        """
+        Puts writes taken by a flush back in front of any queued since, e.g. when the
+        duplicate check fails. Later updates still win, and archives still drop updates.
+        """
+        with self.lock:
+            self.creates = creates + self.creates
+            merged = updates
+            for page_id, properties in self.updates.items():
+                merged.setdefault(page_id, {}).update(properties)
+            self.archives = archives | self.archives
+            self.updates = {page_id: properties for page_id, properties in merged.items()
+                            if page_id not in self.archives}
+
+    def _dedupe_creates(self, creates):
+        unique = {}
+        unkeyed = []
+        for properties in creates:
+            job_id = written_text(properties.get(self.job_id_property))
+            if job_id is None:
+                unkeyed.append(properties)
+            elif job_id not in unique:
+                unique[job_id] = properties
+        existing = self.existing_job_ids(unique) if unique else set()
+        kept = [properties for job_id, properties in unique.items() if job_id not in existing]
+        return kept + unkeyed
+
+    def flush(self) -> dict:
+        """
+        Sends every queued write and empties the buffer.
+
+        :return: A dictionary with the "created", "updated" and "archived" page objects / IDs,
+                 the number of creates "skipped" as duplicates, and the writes that "failed"
+                 as (operation, argument, NotionAPIError) tuples.
+        :raises NotionAPIError: If the duplicate check fails; nothing is sent and every
+                                write stays queued for the next flush.
+        :raises KeyError: If `job_id_property` does not exist; the writes stay queued as well.
+        """
+        with self.lock:
+            creates, updates, archives = self.creates, self.updates, self.archives
+            self._clear()
+
+        try:
+            to_create = self._dedupe_creates(creates)
+        except BaseException:
+            self._requeue(creates, updates, archives)
+            raise
+        result = {"created": [], "updated": [], "archived": [], "skipped": len(creates) - len(to_create), "failed": []}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = []
+            for properties in to_create:
+                futures.append(("created", properties, executor.submit(self.client.add_row, properties, self.database_id)))
+            for page_id, properties in updates.items():
+                futures.append(("updated", page_id, executor.submit(self.client.update_row, page_id, properties)))
+            for page_id in archives:
+                futures.append(("archived", page_id, executor.submit(self.client.delete_row, page_id)))
+
+            for operation, argument, future in futures:
+                try:
+                    value = future.result()
+                except NotionAPIError as e:
+                    result["failed"].append((operation, argument, e))
+                    continue
+                result[operation].append(argument if operation == "archived" else value)
+
+        if self.mirror is not None:
+            self.mirror.upsert(result["created"] + result["updated"])
+            self.mirror.mark_archived(result["archived"])
+        return result
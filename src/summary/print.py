@@ -1,139 +1,569 @@
 # General Imports
 import os
+import copy
+import json
+import mmap
+import codecs
+import hashlib
 import argparse
+import warnings
+import threading
+import functools
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-def scan_directory_structure(src_dir, file_extensions, exclude_files, exclude_dirs):
+# Files at least this large are copied from an mmap instead of being read into memory
+LARGE_FILE_SIZE = 1 << 20
+# Files larger than this are listed in the structure but their contents are skipped
+MAX_FILE_SIZE = 10 << 20
+# Bytes read from the start of a file to decide whether it is text
+SNIFF_SIZE = 8192
+# Headers of common binary formats that may not contain a NUL byte early on
+BINARY_MAGIC = (b'\x89PNG', b'GIF8', b'\xff\xd8\xff', b'%PDF', b'PK\x03\x04', b'\x7fELF', b'\x1f\x8b', b'SQLite format 3')
+MANIFEST_VERSION = 1
+# Tokenizer used to size shards; any Hugging Face tokenizer name works
+DEFAULT_TOKENIZER = "gpt2"
+# Rough characters per token, used when transformers is not available
+CHARS_PER_TOKEN = 4
+
+def scan_tree(src_dir, file_extensions, exclude_files, exclude_dirs, skip_paths=()):
     """
-    Scans the directory structure of the source directory and builds a nested dictionary representation.
+    Walks the source directory once, building the nested directory structure and the
+    list of files to summarise together. Directories and files are visited in sorted
+    order, so the output is the same on every run and every platform.
     
     Parameters:
     src_dir (str): The source directory to scan.
     file_extensions (list): The file extensions to look for (default is ['.py']).
     exclude_files (list): List of file names to exclude from scanning.
     exclude_dirs (list): List of directory names to exclude from scanning.
+    skip_paths (iterable): Files or directories never to include, e.g. the summary being written.
     
     Returns:
-    dict: A nested dictionary representing the directory structure.
-    """
-
-    def build_nested_structure(current_dir, structure):
-        for dirpath, dirnames, filenames in os.walk(current_dir):
-            # Exclude specified directories
-            dirnames[:] = [d for d in dirnames if d not in exclude_dirs]
-            
-            
-            relative_dirpath = os.path.relpath(dirpath, src_dir)
-            if relative_dirpath == '.':
-                current_level = structure
-            else:
-                parts = relative_dirpath.split(os.sep)
-                current_level = structure
-                for part in parts:
-                    if part not in current_level:
-                        current_level[part] = {}
-                    current_level = current_level[part]
-
-            for filename in filenames:
-                if filename not in exclude_files and any(filename.endswith(ext) for ext in file_extensions):
-                    current_level[filename] = 'file'
-            
-            for dirname in dirnames:
-                if dirname not in current_level:
-                    current_level[dirname] = {}
-
-    def directory_structure_str(directory_structure, level=1):
-        """
-        Builds a string representation of the directory structure in a formatted manner.
-        
-        Parameters:
-        directory_structure (dict): The nested dictionary representing the directory structure.
-        level (int): The current depth level in the directory structure.
-        """
-        output = []
-        tab = '\t'
-        
-        for key, value in directory_structure.items():
-            if value == 'file':
-                output.append(f"{'+' * level}f{tab * level}{key}\n")
-            else:
-                output.append(f"{'+' * level}d{tab * level}{key}\n")
-                output.append(directory_structure_str(value, level + 1))
-        
-        return ''.join(output)
-
+    tuple: A nested dictionary representing the directory structure, and a list of
+           (relative path, path, size, mtime in ns) tuples in output order.
+    """
+    skip_paths = {os.path.realpath(path) for path in skip_paths}
     directory_structure = {}
-    build_nested_structure(src_dir, directory_structure)
-    dir_str = directory_structure_str(directory_structure)
+    files = []
+
+    def walk(current_dir, real_dir, relative_dir, structure):
+        try:
+            entries = sorted(os.scandir(current_dir), key=lambda entry: entry.name)
+        except OSError:
+            return
+        subdirs = []
+        # Files first, then directories, as in the original two-pass listing
+        for entry in entries:
+            if entry.is_dir():
+                if entry.name not in exclude_dirs and not (skip_paths and os.path.join(real_dir, entry.name) in skip_paths):
+                    subdirs.append(entry)
+            elif entry.name not in exclude_files and any(entry.name.endswith(ext) for ext in file_extensions):
+                if skip_paths and os.path.join(real_dir, entry.name) in skip_paths:
+                    continue
+                structure[entry.name] = 'file'
+                stat = entry.stat()
+                files.append((relative_dir + entry.name, entry.path, stat.st_size, stat.st_mtime_ns))
+        for entry in subdirs:
+            structure[entry.name] = {}
+            walk(entry.path, os.path.realpath(entry.path), relative_dir + entry.name + os.sep, structure[entry.name])
 
-    return directory_structure, dir_str
+    walk(src_dir, os.path.realpath(src_dir), '', directory_structure)
+    return directory_structure, files
 
-def scan_file_contents(src_dir, file_extensions, exclude_files, exclude_dirs):
+def directory_structure_str(directory_structure, level=1):
     """
-    Scans the contents of all files with the specified extensions in the source directory and its subdirectories.
+    Builds a string representation of the directory structure in a formatted manner.
     
     Parameters:
-    src_dir (str): The source directory to scan.
-    file_extensions (list): The file extensions to look for (default is ['.py']).
-    exclude_files (list): List of file names to exclude from scanning.
-    exclude_dirs (list): List of directory names to exclude from scanning.
+    directory_structure (dict): The nested dictionary representing the directory structure.
+    level (int): The current depth level in the directory structure.
+    """
+    output = []
+    tab = '\t'
+    
+    for key, value in directory_structure.items():
+        if value == 'file':
+            output.append(f"{'+' * level}f{tab * level}{key}\n")
+        else:
+            output.append(f"{'+' * level}d{tab * level}{key}\n")
+            output.append(directory_structure_str(value, level + 1))
+    
+    return ''.join(output)
+
+def is_binary(head):
+    """
+    Sniffs the first bytes of a file: NUL bytes, a known binary header or invalid UTF-8 mean binary.
+    """
+    if b'\0' in head or head.startswith(BINARY_MAGIC):
+        return True
+    try:
+        # Not final: the sniffed prefix may end in the middle of a character
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return True
+    return False
+
+def read_file(path, size, max_file_size=MAX_FILE_SIZE):
+    """
+    Reads, sniffs and hashes a file in a worker thread. Large files are hashed in
+    chunks and left to be streamed by the writer.
     
     Returns:
-    dict: A dictionary with file paths as keys and their contents as values.
-    """
-    file_contents = {}
-    
-    for dirpath, dirnames, filenames in os.walk(src_dir):
-        # Exclude specified directories
-        dirnames[:] = [d for d in dirnames if d not in exclude_dirs]
-        
-        for filename in filenames:
-            if any(filename.endswith(ext) for ext in file_extensions) and filename not in exclude_files:
-                file_path = os.path.join(dirpath, filename)
-                relative_file_path = os.path.relpath(file_path, src_dir)
-                
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                file_contents[relative_file_path] = content
+    dict: "hash", "skip" (None, "binary" or "oversized") and "content" (bytes, or None
+          if the file is large or skipped).
+    """
+    if size > max_file_size:
+        return {"hash": None, "skip": "oversized", "content": None}
+    with open(path, 'rb') as file:
+        head = file.read(SNIFF_SIZE)
+        if is_binary(head):
+            return {"hash": None, "skip": "binary", "content": None}
+        digest = hashlib.blake2b(head, digest_size=16)
+        if size < LARGE_FILE_SIZE:
+            rest = file.read()
+            digest.update(rest)
+            return {"hash": digest.hexdigest(), "skip": None, "content": head + rest}
+        while chunk := file.read(LARGE_FILE_SIZE):
+            digest.update(chunk)
+    return {"hash": digest.hexdigest(), "skip": None, "content": None}
 
-    return file_contents
+def iter_file_contents(files, max_workers=8, max_file_size=MAX_FILE_SIZE, reuse=None):
+    """
+    Reads files on a thread pool and yields them in their original order. At most a
+    few reads per worker are in flight, so memory stays bounded on large trees.
+    
+    Parameters:
+    files (list): (relative path, path, size, mtime) tuples from scan_tree.
+    max_workers (int): Number of reader threads.
+    max_file_size (int): Files larger than this are skipped.
+    reuse (callable): (Optional) Called with (relative path, size, mtime); returns a cached
+                      result for a file whose stat has not changed, or None if it has to be read.
+    
+    Yields:
+    tuple: (relative path, path, result), with result as returned by read_file (or reuse).
+    """
+    window = max_workers * 4
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summary") as executor:
+        for relative_path, path, size, mtime_ns in files:
+            cached = reuse(relative_path, size, mtime_ns) if reuse is not None else None
+            if cached is not None:
+                pending.append((relative_path, path, None, cached))
+            else:
+                pending.append((relative_path, path, executor.submit(read_file, path, size, max_file_size), None))
+            if len(pending) >= window:
+                relative_path, path, future, cached = pending.popleft()
+                yield relative_path, path, cached if future is None else future.result()
+        while pending:
+            relative_path, path, future, cached = pending.popleft()
+            yield relative_path, path, cached if future is None else future.result()
+
+def section_header(relative_path):
+    return f'|||||||||||||\t\tFile: {relative_path}\t\t|||||||||||||\n'.encode('utf-8')
+
+def copy_large_file(path, summary_file):
+    """
+    Copies a file into the (binary) summary file from an mmap, without building a string.
+    """
+    with open(path, 'rb') as file:
+        try:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                summary_file.write(mapped)
+        except (ValueError, OSError):
+            # Empty or unmappable (e.g. a pipe): fall back to a chunked copy
+            file.seek(0)
+            while chunk := file.read(LARGE_FILE_SIZE):
+                summary_file.write(chunk)
 
-def write_directory_structure(dir_str, file_contents, summary_file):
+def copy_range(source, offset, length, summary_file):
     """
-    Writes the directory structure and file contents to the summary file.
+    Copies `length` bytes at `offset` of an open file (the previous summary) in chunks.
+    """
+    source.seek(offset)
+    while length > 0:
+        chunk = source.read(min(length, LARGE_FILE_SIZE))
+        if not chunk:
+            raise ValueError("previous summary is shorter than its manifest")
+        summary_file.write(chunk)
+        length -= len(chunk)
+
+def write_directory_structure(dir_str, files, summary_file, max_workers=8, max_file_size=MAX_FILE_SIZE,
+                              previous=None, previous_summary=None):
+    """
+    Writes the directory structure and streams the file contents to the summary file.
+    Sections of files whose contents did not change are copied from the previous summary.
     
     Parameters:
     dir_str (str): The formatted string representation of the directory structure.
-    file_contents (dict): The dictionary containing file paths and their contents.
-    summary_file (file object): The file object of the summary file to write to.
+    files (list): (relative path, path, size, mtime) tuples from scan_tree.
+    summary_file (file object): The summary file, opened in binary mode.
+    max_workers (int): Number of reader threads.
+    max_file_size (int): Files larger than this are skipped.
+    previous (dict): (Optional) Manifest entries of the previous run, by relative path.
+    previous_summary (file object): (Optional) The previous summary, opened in binary mode.
+    
+    Returns:
+    list: Manifest entries for the files, in output order, each with a "status" of
+          "unchanged" (stat matched), "rehashed" (contents matched), "written" or "skipped".
     """
+    previous = previous if previous_summary is not None else {}
+
+    def reuse(relative_path, size, mtime_ns):
+        entry = previous.get(relative_path)
+        if entry is not None and entry["size"] == size and entry["mtime_ns"] == mtime_ns:
+            return {"hash": entry["hash"], "skip": entry["skip"], "content": None, "unchanged": True}
+        return None
+
     # Write the directory structure
-    summary_file.write(dir_str)
-    summary_file.write('\nd: directory, f: file\n\n')
+    summary_file.write(dir_str.encode('utf-8'))
+    summary_file.write(b'\nd: directory, f: file\n\n')
 
     # Write the file contents
-    summary_file.write('FILE CONTENTS:\n\n')
-    for file_path, content in file_contents.items():
-        summary_file.write(f'|||||||||||||\t\tFile: {file_path}\t\t|||||||||||||\n')
-        summary_file.write(content)
-        summary_file.write('\n\n')
+    summary_file.write(b'FILE CONTENTS:\n\n')
+    entries = []
+    stats = {relative_path: (size, mtime_ns) for relative_path, _, size, mtime_ns in files}
+    for relative_path, path, result in iter_file_contents(files, max_workers, max_file_size, reuse):
+        size, mtime_ns = stats[relative_path]
+        entry = {"path": relative_path, "size": size, "mtime_ns": mtime_ns, "hash": result["hash"],
+                 "skip": result["skip"], "offset": summary_file.tell(), "length": 0}
+        old = previous.get(relative_path)
+        if result["skip"]:
+            entry["status"] = "skipped"
+        elif old is not None and old["hash"] == result["hash"]:
+            entry["status"] = "unchanged" if result.get("unchanged") else "rehashed"
+            copy_range(previous_summary, old["offset"], old["length"], summary_file)
+        else:
+            entry["status"] = "written"
+            summary_file.write(section_header(relative_path))
+            if result["content"] is None:
+                copy_large_file(path, summary_file)
+            else:
+                summary_file.write(result["content"])
+            summary_file.write(b'\n\n')
+        entry["length"] = summary_file.tell() - entry["offset"]
+        entries.append(entry)
+    return entries
+
+def manifest_path_for(summary_file_path):
+    return summary_file_path + '.manifest.json'
+
+def load_manifest(summary_file_path, src_dir):
+    """
+    Loads the manifest of the previous run, if it still describes the summary file on disk.
+    
+    Returns:
+    dict: The manifest, or None if there is none or it is stale (different source
+          directory, or the summary was changed by something else).
+    """
+    try:
+        with open(manifest_path_for(summary_file_path), 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        stat = os.stat(summary_file_path)
+    except (OSError, ValueError):
+        return None
+    if (manifest.get("version") != MANIFEST_VERSION
+            or manifest.get("src_dir") != os.path.realpath(src_dir)
+            or manifest.get("summary") != {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}):
+        return None
+    return manifest
 
-def create_summary_file(src_dir, summary_file_path, file_extensions, exclude_files, exclude_dirs):
+def create_summary_file(src_dir, summary_file_path, file_extensions, exclude_files, exclude_dirs, max_workers=8,
+                        max_file_size=MAX_FILE_SIZE, full=False):
     """
     Creates a summary file containing the directory structure and file contents.
     
+    A sidecar manifest (<summary>.manifest.json) records each file's size, mtime,
+    content hash and byte range in the summary. On the next run only files whose
+    stat changed are read and hashed; the sections of the others are copied from
+    the previous summary, and nothing is written at all if nothing changed.
+    
     Parameters:
     src_dir (str): The source directory to scan.
     summary_file_path (str): The path to the summary file to be created.
     file_extensions (list): The file extensions to look for.
     exclude_files (list): List of file names to exclude from scanning.
     exclude_dirs (list): List of directory names to exclude from scanning.
+    max_workers (int): Number of threads reading files.
+    max_file_size (int): Files larger than this (and binary files) are listed but not included.
+    full (bool): Ignore the manifest and rebuild from scratch.
+    
+    Returns:
+    dict: The number of files per status ("unchanged", "rehashed", "written", "skipped").
+    """
+    manifest_path = manifest_path_for(summary_file_path)
+    tmp_path = summary_file_path + '.tmp'
+    # The summary is written while the tree is read, so never read it (or its manifest) back into itself
+    directory_structure, files = scan_tree(src_dir, file_extensions, exclude_files, exclude_dirs,
+                                           skip_paths=[summary_file_path, manifest_path, tmp_path])
+    title = f'DIRECTORY STRUCTURE: {src_dir}\n'
+    dir_str = directory_structure_str(directory_structure)
+    header_hash = hashlib.blake2b((title + dir_str).encode('utf-8'), digest_size=16).hexdigest()
+
+    manifest = None if full else load_manifest(summary_file_path, src_dir)
+    previous = {entry["path"]: entry for entry in manifest["files"]} if manifest else {}
+
+    # Nothing to do if the layout is the same and every file still has its recorded stat
+    if (manifest is not None and manifest["header_hash"] == header_hash
+            and manifest.get("max_file_size") == max_file_size
+            and [entry["path"] for entry in manifest["files"]] == [relative_path for relative_path, *_ in files]
+            and all((previous[relative_path]["size"], previous[relative_path]["mtime_ns"]) == (size, mtime_ns)
+                    for relative_path, _, size, mtime_ns in files)):
+        counts = {"unchanged": 0, "rehashed": 0, "written": 0, "skipped": 0}
+        for entry in manifest["files"]:
+            counts["skipped" if entry["skip"] else "unchanged"] += 1
+        return counts
+
+    if manifest is not None and manifest.get("max_file_size") != max_file_size:
+        # Files skipped (or not) under the old limit have to be looked at again
+        previous = {}
+
+    with open(tmp_path, 'wb') as summary_file:
+        summary_file.write(title.encode('utf-8'))
+        if previous:
+            with open(summary_file_path, 'rb') as previous_summary:
+                entries = write_directory_structure(dir_str, files, summary_file, max_workers, max_file_size,
+                                                    previous, previous_summary)
+        else:
+            entries = write_directory_structure(dir_str, files, summary_file, max_workers, max_file_size)
+    os.replace(tmp_path, summary_file_path)
+
+    counts = {"unchanged": 0, "rehashed": 0, "written": 0, "skipped": 0}
+    for entry in entries:
+        counts[entry.pop("status")] += 1
+
+    stat = os.stat(summary_file_path)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "src_dir": os.path.realpath(src_dir),
+        "summary": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+        "header_hash": header_hash,
+        "max_file_size": max_file_size,
+        "files": entries,
+    }
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as file:
+        # json.dumps uses the C encoder; json.dump streams through the pure-Python one
+        file.write(json.dumps(manifest))
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return counts
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(name=DEFAULT_TOKENIZER):
+    """
+    Loads (once per process) a tokenizer from the transformers dependency. transformers
+    is only imported here, so plain summaries never pay for it.
+    
+    Returns:
+    object: The tokenizer, or None if transformers or the tokenizer files are unavailable,
+            in which case token counts fall back to a characters-per-token estimate.
+    """
+    try:
+        from transformers import AutoTokenizer
+    except ImportError:
+        warnings.warn("transformers is not installed; estimating token counts from characters instead")
+        return None
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(name)
+    except (OSError, ValueError) as e:
+        warnings.warn(f"Could not load tokenizer {name!r} ({e}); estimating token counts from characters instead")
+        return None
+    # Whole files are counted, never fed to a model, so silence the max length warning
+    tokenizer.model_max_length = int(1e30)
+    return tokenizer
+
+_local = threading.local()
+
+def count_tokens(text, tokenizer):
+    if tokenizer is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    # Fast tokenizers must not be shared between threads ("Already borrowed"), so each thread uses its own copy
+    copies = _local.__dict__.setdefault("tokenizers", {})
+    if id(tokenizer) not in copies:
+        copies[id(tokenizer)] = copy.deepcopy(tokenizer)
+    return len(copies[id(tokenizer)].encode(text, add_special_tokens=False))
+
+def measure_file(path, size, max_file_size, tokenizer, token_cache):
+    """
+    Sniffs, hashes and (unless its hash is in `token_cache`) tokenizes a file in a worker thread.
+    
+    Returns:
+    dict: "hash", "skip" and "tokens" (the contents only, without the section header).
+    """
+    result = read_file(path, size, max_file_size)
+    content = result.pop("content")
+    result["tokens"] = 0
+    if result["skip"] is None:
+        result["tokens"] = token_cache.get(result["hash"])
+        if result["tokens"] is None:
+            if content is None:
+                with open(path, 'rb') as file:
+                    content = file.read()
+            result["tokens"] = count_tokens(content.decode('utf-8', 'replace'), tokenizer)
+    return result
+
+def pack_shards(entries, budget, first_shard_tokens=0):
+    """
+    Packs files into shards of at most `budget` tokens, keeping the files of a directory
+    together when they fit: a directory that does not fit in the current shard but fits
+    in an empty one starts a new shard. A single file over the budget gets a shard of its own.
+    
+    Parameters:
+    entries (list): Manifest entries (with "path" and "tokens") in output order; skipped files excluded.
+    budget (int): Token budget per shard.
+    first_shard_tokens (int): Tokens already used in the first shard, e.g. by the directory structure.
+    
+    Returns:
+    list: One list of entries per shard.
+    """
+    shards = [[]]
+    used = first_shard_tokens
+    for _, group in itertools.groupby(entries, key=lambda entry: os.path.dirname(entry["path"])):
+        group = list(group)
+        group_tokens = sum(entry["tokens"] for entry in group)
+        if shards[-1] and used + group_tokens > budget and group_tokens <= budget:
+            shards.append([])
+            used = 0
+        for entry in group:
+            if shards[-1] and used + entry["tokens"] > budget:
+                shards.append([])
+                used = 0
+            shards[-1].append(entry)
+            used += entry["tokens"]
+    return [shard for shard in shards if shard] or [[]]
+
+def load_shard_manifest(manifest_path, src_dir, tokenizer_name):
+    """
+    Loads the shard manifest of the previous run if it was made for the same source
+    directory and tokenizer, otherwise returns None.
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if (manifest.get("version") != MANIFEST_VERSION or manifest.get("src_dir") != os.path.realpath(src_dir)
+            or manifest.get("tokenizer") != tokenizer_name):
+        return None
+    return manifest
+
+def create_summary_shards(src_dir, shard_dir, file_extensions, exclude_files, exclude_dirs, budget,
+                          tokenizer_name=DEFAULT_TOKENIZER, max_workers=8, max_file_size=MAX_FILE_SIZE):
+    """
+    Splits the summary into shard files of at most `budget` tokens each, for feeding to
+    models with a limited context window.
+    
+    <shard_dir>/manifest.json lists every shard with its files and token count, and caches
+    each file's stat, hash and token count. On the next run files whose stat is unchanged
+    are not read, changed files are rehashed, only files with new contents are tokenized,
+    and shards whose files and hashes are unchanged are not rewritten.
+    
+    Parameters:
+    src_dir (str): The source directory to scan.
+    shard_dir (str): Directory the shards (shard-001.txt, ...) and manifest are written to.
+    file_extensions (list): The file extensions to look for.
+    exclude_files (list): List of file names to exclude from scanning.
+    exclude_dirs (list): List of directory names to exclude from scanning.
+    budget (int): Token budget per shard.
+    tokenizer_name (str): Hugging Face tokenizer to count with.
+    max_workers (int): Number of threads reading and tokenizing files.
+    max_file_size (int): Files larger than this (and binary files) are left out.
+    
+    Returns:
+    dict: The manifest that was written.
     """
-    directory_structure, dir_str = scan_directory_structure(src_dir, file_extensions, exclude_files, exclude_dirs)
-    file_contents = scan_file_contents(src_dir, file_extensions, exclude_files, exclude_dirs)
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest_path = os.path.join(shard_dir, 'manifest.json')
+    tokenizer = get_tokenizer(tokenizer_name)
+    # The cache key records what the counts were made with
+    counted_with = tokenizer_name if tokenizer is not None else f"chars/{CHARS_PER_TOKEN}"
+
+    directory_structure, files = scan_tree(src_dir, file_extensions, exclude_files, exclude_dirs,
+                                           skip_paths=[shard_dir])
+    previous_manifest = load_shard_manifest(manifest_path, src_dir, counted_with)
+    previous = {}
+    token_cache = {}
+    if previous_manifest is not None and previous_manifest.get("max_file_size") == max_file_size:
+        previous = {entry["path"]: entry for entry in previous_manifest["files"]}
+        token_cache = {entry["hash"]: entry["tokens"] for entry in previous_manifest["files"] if entry["hash"]}
+
+    # Stat, and only for changed files hash and tokenize, in parallel
+    entries = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tokenize") as executor:
+        pending = []
+        for relative_path, path, size, mtime_ns in files:
+            old = previous.get(relative_path)
+            if old is not None and (old["size"], old["mtime_ns"]) == (size, mtime_ns):
+                pending.append((relative_path, size, mtime_ns, None, old))
+            else:
+                future = executor.submit(measure_file, path, size, max_file_size, tokenizer, token_cache)
+                pending.append((relative_path, size, mtime_ns, future, None))
+        tokenized = 0
+        for relative_path, size, mtime_ns, future, old in pending:
+            if future is not None:
+                result = future.result()
+                tokenized += result["hash"] is not None and result["hash"] not in token_cache
+            else:
+                result = old
+            entries.append({"path": relative_path, "size": size, "mtime_ns": mtime_ns, "hash": result["hash"],
+                            "skip": result["skip"], "tokens": result["tokens"]})
+
+    # Section headers depend on the path, not the contents, so they are counted every run
+    for entry in entries:
+        if entry["skip"] is None:
+            entry["tokens"] += count_tokens(section_header(entry["path"]).decode('utf-8'), tokenizer)
+
+    structure = (f'DIRECTORY STRUCTURE: {src_dir}\n' + directory_structure_str(directory_structure)
+                 + '\nd: directory, f: file\n\n')
+    packed = pack_shards([entry for entry in entries if entry["skip"] is None], budget,
+                         count_tokens(structure, tokenizer))
+
+    previous_shards = {shard["file"]: shard for shard in (previous_manifest or {}).get("shards", [])}
+    shards = []
+    written = 0
+    paths = {relative_path: path for relative_path, path, _, _ in files}
+    for index, shard_entries in enumerate(packed, 1):
+        name = f'shard-{index:03d}.txt'
+        title = f'SUMMARY SHARD {index} OF {len(packed)}: {src_dir}\n\n'
+        head = title + (structure if index == 1 else '')
+        signature = hashlib.blake2b(json.dumps([head, [(entry["path"], entry["hash"]) for entry in shard_entries]])
+                                    .encode('utf-8'), digest_size=16).hexdigest()
+        shard = {"file": name, "tokens": count_tokens(head, tokenizer) + sum(entry["tokens"] for entry in shard_entries),
+                 "signature": signature, "paths": [entry["path"] for entry in shard_entries]}
+        shards.append(shard)
+        old = previous_shards.get(name)
+        if old is not None and old["signature"] == signature and os.path.exists(os.path.join(shard_dir, name)):
+            continue
+        with open(os.path.join(shard_dir, name + '.tmp'), 'wb') as shard_file:
+            shard_file.write(head.encode('utf-8'))
+            for entry in shard_entries:
+                shard_file.write(section_header(entry["path"]))
+                copy_large_file(paths[entry["path"]], shard_file)
+                shard_file.write(b'\n\n')
+        os.replace(os.path.join(shard_dir, name + '.tmp'), os.path.join(shard_dir, name))
+        written += 1
+
+    # Drop shards left over from a run that needed more of them
+    for name in set(previous_shards) - {shard["file"] for shard in shards}:
+        try:
+            os.remove(os.path.join(shard_dir, name))
+        except FileNotFoundError:
+            pass
 
-    with open(summary_file_path, 'w', encoding='utf-8') as summary_file:
-        summary_file.write(f'DIRECTORY STRUCTURE: {src_dir}\n')
-        write_directory_structure(dir_str, file_contents, summary_file)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "src_dir": os.path.realpath(src_dir),
+        "tokenizer": counted_with,
+        "budget": budget,
+        "max_file_size": max_file_size,
+        "shards": shards,
+        "files": entries,
+        "stats": {"tokenized": tokenized, "shards_written": written},
+    }
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as file:
+        file.write(json.dumps(manifest))
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Scan a directory and create a summary file with directory structure and file contents.")
@@ -142,10 +572,26 @@ if __name__ == '__main__':
     parser.add_argument('--file_extensions', nargs='*', default=['.py'], help="The file extensions to look for (default is ['.py']).")
     parser.add_argument('--exclude_files', nargs='*', default=[], help="List of file names to exclude from scanning.")
     parser.add_argument('--exclude_dirs', nargs='*', default=[], help="List of directory names to exclude from scanning.")
+    parser.add_argument('--workers', type=int, default=8, help="Number of threads reading files (default is 8).")
+    parser.add_argument('--max_file_size', type=int, default=MAX_FILE_SIZE, help="Skip the contents of files larger than this many bytes (default is 10 MiB).")
+    parser.add_argument('--full', action='store_true', help="Ignore the manifest and rebuild the summary from scratch.")
+    parser.add_argument('--shard_budget', type=int, help="Split the summary into shards of at most this many tokens, written to --shard_dir instead of summary_file_path.")
+    parser.add_argument('--shard_dir', type=str, help="Directory for the shards (default is <summary_file_path without extension>_shards).")
+    parser.add_argument('--tokenizer', type=str, default=DEFAULT_TOKENIZER, help=f"Hugging Face tokenizer used to count tokens (default is {DEFAULT_TOKENIZER}).")
 
     args = parser.parse_args()
 
-    create_summary_file(args.src_dir, args.summary_file_path, args.file_extensions, args.exclude_files, args.exclude_dirs)
+    if args.shard_budget:
+        shard_dir = args.shard_dir or os.path.splitext(args.summary_file_path)[0] + '_shards'
+        manifest = create_summary_shards(args.src_dir, shard_dir, args.file_extensions, args.exclude_files, args.exclude_dirs,
+                                         args.shard_budget, args.tokenizer, args.workers, args.max_file_size)
+        print(f"{len(manifest['shards'])} shards in {shard_dir}, {manifest['stats']['shards_written']} written, "
+              f"{manifest['stats']['tokenized']} files tokenized ({manifest['tokenizer']})")
+    else:
+        counts = create_summary_file(args.src_dir, args.summary_file_path, args.file_extensions, args.exclude_files, args.exclude_dirs,
+                                     args.workers, args.max_file_size, args.full)
+        print(", ".join(f"{count} {status}" for status, count in counts.items()))
 
 # sample use:
-# python src/summary/print.py '.' 'src/summary/summary.txt' --file_extensions .py .txt .env .md --exclude_dirs __pycache__ .venv .git summary
\ No newline at end of file
+# python src/summary/print.py '.' 'src/summary/summary.txt' --file_extensions .py .txt .env .md --exclude_dirs __pycache__ .venv .git summary
+# python src/summary/print.py '.' 'src/summary/summary.txt' --file_extensions .py .md --exclude_dirs __pycache__ .venv .git --shard_budget 8000
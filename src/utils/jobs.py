@@ -0,0 +1,196 @@
+'''
+File: jobs.py
+
+Description: A background job runner for the curses menu. Menu options are
+dispatched into a thread pool so the UI stays responsive; each job has its
+own log, live progress counters and cooperative cancellation.
+'''
+
+# global imports
+import sys
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job (by Job.report / Job.check_cancelled) once it has been cancelled.
+    """
+
+
+class Job:
+    """
+    One unit of background work.
+
+    The job function receives the Job and can call `report(pages=..., rows=...)`
+    to publish progress; `report` also raises JobCancelled once the job was
+    cancelled, so jobs stop at their next progress point.
+    """
+    def __init__(self, job_id, name, func, log=None):
+        """
+        :param job_id: Sequential id shown in the status bar.
+        :param name: Display name, e.g. the menu option.
+        :param func: Callable taking the Job.
+        :param log: (Optional) Writable the job's prints are routed to, e.g. a StdoutRedirector.
+        """
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.log = log
+        self.status = "queued"
+        self.progress = {}
+        self.error = None
+        self.result = None
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """
+        Requests cancellation. A queued job never starts; a running job stops at its next report.
+        """
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.status = "cancelled"
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report(self, **progress):
+        """
+        Updates the job's progress counters, e.g. report(pages=3, rows=300).
+
+        :raises JobCancelled: If the job has been cancelled.
+        """
+        self.progress.update(progress)
+        self.check_cancelled()
+
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def summary(self) -> str:
+        """
+        One-line status, e.g. "[2] Run Test Function: running 4s pages=3 rows=300".
+        """
+        progress = " ".join(f"{key}={value}" for key, value in self.progress.items())
+        text = f"[{self.id}] {self.name}: {self.status} {self.elapsed():.0f}s {progress}".rstrip()
+        if self.error:
+            text += f" ({self.error})"
+        return text
+
+    def run(self):
+        self.started = time.monotonic()
+        self.status = "running"
+        routed_stdout.register(self.log)
+        try:
+            self.check_cancelled()
+            self.result = self.func(self)
+            self.status = "done"
+        except JobCancelled:
+            self.status = "cancelled"
+            print("Job cancelled.")
+        except Exception as e:
+            self.status = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+            print(traceback.format_exc())
+        finally:
+            self.finished = time.monotonic()
+            routed_stdout.unregister()
+        return self.result
+
+
+class ThreadRoutedStdout:
+    """
+    A sys.stdout replacement that sends each thread's prints to the log registered
+    for that thread, and everything else to the original stdout.
+    """
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def register(self, log):
+        self.local.log = log
+
+    def unregister(self):
+        self.local.log = None
+
+    def _target(self):
+        return getattr(self.local, "log", None) or self.fallback
+
+    def write(self, output):
+        return self._target().write(output)
+
+    def flush(self):
+        self._target().flush()
+
+
+routed_stdout = ThreadRoutedStdout(sys.stdout)
+
+
+class JobRunner:
+    """
+    Runs jobs on a thread pool and keeps track of them for the status bar.
+
+    sample usage:
+        runner = JobRunner()
+        job = runner.submit("Sync", sync_function, log=StdoutRedirector(stdscr, top=2))
+        runner.status_line()
+        job.cancel()
+    """
+    def __init__(self, max_workers=4):
+        """
+        :param max_workers: Number of jobs that run at the same time; others wait queued.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.jobs = []
+        self.lock = threading.Lock()
+        # Route prints from job threads into their own logs
+        if sys.stdout is not routed_stdout:
+            routed_stdout.fallback = sys.stdout
+            sys.stdout = routed_stdout
+
+    def submit(self, name, func, log=None) -> Job:
+        """
+        Queues `func(job)` to run in the background.
+
+        :return: The Job, already queued.
+        """
+        with self.lock:
+            job = Job(len(self.jobs) + 1, name, func, log)
+            self.jobs.append(job)
+        job.future = self.executor.submit(job.run)
+        return job
+
+    def active(self) -> list:
+        return [job for job in self.jobs if not job.done]
+
+    def status_line(self) -> str:
+        """
+        Summary of the running/queued jobs for the status bar, or of the last job if none are active.
+        """
+        jobs = self.active() or self.jobs[-1:]
+        return " | ".join(job.summary() for job in jobs)
+
+    def shutdown(self):
+        """
+        Cancels every job and waits for the running ones to stop.
+        """
+        for job in self.jobs:
+            job.cancel()
+        self.executor.shutdown(wait=True)
+        if sys.stdout is routed_stdout:
+            sys.stdout = routed_stdout.fallback
@@ -0,0 +1,59 @@
+'''
+File: lazy.py
+
+Description: Deferred imports. The entry points name every subsystem they can
+run at the top of the file, but a subsystem (and the heavy libraries it pulls
+in: requests, openai, transformers, selenium) is only imported when something
+in it is first used, so a launch only pays for the code it actually runs.
+'''
+
+# global imports
+import sys
+import importlib
+
+
+class LazyModule:
+    """
+    Stands in for a module until one of its attributes is used, then imports it.
+
+    sample usage:
+        mirror = lazy_import("src.notion.mirror")  # nothing imported yet
+        mirror.NotionMirror(client, database_id)   # imports src.notion.mirror here
+    """
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            # import_module takes the module's import lock, so concurrent first uses import it once
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """
+    Returns a module that is imported on first attribute access.
+
+    :param name: The full module name, e.g. "src.web.application".
+    :return: The module itself if it is already imported, otherwise a LazyModule.
+    """
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
@@ -0,0 +1,271 @@
+'''
+File: menu.py
+
+Description: The interactive curses menu. It is imported only when main.py runs
+without a subcommand, so headless runs never load curses or the UI modules, and
+each option imports its subsystem the first time it is chosen.
+'''
+
+# global imports
+import curses
+
+# local imports
+from src.notion.errors import NotionAPIError
+from src.notion.metrics import get_default_metrics
+from src.utils.lazy import lazy_import
+from src.utils.redirector import StdoutRedirector
+from src.utils.jobs import JobRunner
+from src.utils.table import TableView
+
+# Imported when their menu option first runs
+database = lazy_import("src.notion.database")
+mirror = lazy_import("src.notion.mirror")
+records = lazy_import("src.notion.records")
+application = lazy_import("src.web.application")
+gmail = lazy_import("src.email.gmail")
+
+
+def check_email(job):
+    """
+    Background job for 'Check Email': syncs the local copy of the inbox and prints the new emails.
+    """
+    emails = gmail.check_gmail_inbox()
+    job.report(new=len(emails))
+    for message in emails:
+        print(f"{message.sender_email} | {message.subject} | {message.snippet}")
+    return emails
+
+
+def new_jobs(job):
+    """
+    Background job for 'Get New Jobs': prints the postings not seen in earlier polls.
+    """
+    postings = application.get_new_jobs()
+    job.report(new=len(postings))
+    for posting in postings:
+        print(f"{posting.company} | {posting.role} | {posting.location} | {posting.url}")
+    return postings
+
+
+def show_applications(stdscr, database_id, headers):
+    """
+    Browse the applications one screen at a time. Rows stream from the local
+    mirror once it has been synced, otherwise straight from Notion.
+    """
+    stdscr.erase()
+    stdscr.addstr(0, 0, "Loading applications...")
+    stdscr.refresh()
+    try:
+        codec = records.RecordCodec(database.get_db_schema(database_id, headers))
+        # The rows are streamed while the table is shown, so the mirror stays open until it is closed
+        with mirror.NotionMirror(database.get_client(headers), database_id) as notion_mirror:
+            if notion_mirror.high_water_mark is not None:
+                pages = notion_mirror.iter_rows()
+            else:
+                pages = database.get_client(headers).iter_rows(database_id)
+            TableView(stdscr, (codec.decode(page) for page in pages)).run()
+    except NotionAPIError as e:
+        stdscr.addstr(2, 0, f"Notion API call failed: {e}")
+        stdscr.addstr("\nPress any key to return to the menu.")
+        stdscr.getch()
+
+
+def show_job_log(stdscr, job):
+    """
+    Display a job's output live in the curses window. Press 'c' to cancel the job.
+    """
+    def on_key(key):
+        if key == ord('c'):
+            job.cancel()
+
+    stdscr.erase()
+    job.log.view(
+        help_text="Arrows/PgUp/PgDn to scroll, c to cancel the job, q to return.",
+        header=job.summary,
+        on_key=on_key,
+        live=True,
+    )
+
+
+def show_jobs(stdscr, runner):
+    """
+    List background jobs with their status and progress. Enter opens a job's log,
+    'c' cancels the selected job, 'q' returns to the menu.
+    """
+    selected = 0
+    stdscr.timeout(250)
+    try:
+        while True:
+            stdscr.erase()
+            h, w = stdscr.getmaxyx()
+            stdscr.addstr(0, 0, "Background jobs"[:w - 1])
+            if not runner.jobs:
+                stdscr.addstr(2, 0, "No jobs have been started yet."[:w - 1])
+            for idx, job in enumerate(runner.jobs[:h - 4]):
+                attr = curses.color_pair(1) if idx == selected else curses.A_NORMAL
+                stdscr.addstr(idx + 2, 0, job.summary()[:w - 1], attr)
+            stdscr.addstr(h - 1, 0, "Enter to view log, c to cancel, q to return."[:w - 1])
+            stdscr.refresh()
+
+            key = stdscr.getch()
+            if key == curses.KEY_UP and selected > 0:
+                selected -= 1
+            elif key == curses.KEY_DOWN and selected < len(runner.jobs) - 1:
+                selected += 1
+            elif key == ord('c') and runner.jobs:
+                runner.jobs[selected].cancel()
+            elif key in [curses.KEY_ENTER, 10, 13] and runner.jobs:
+                show_job_log(stdscr, runner.jobs[selected])
+                stdscr.timeout(250)
+            elif key in [ord('q'), 27]:
+                return
+    finally:
+        stdscr.timeout(-1)
+
+
+def show_metrics(stdscr, dump_path="data/notion_metrics.jsonl"):
+    """
+    Display per-endpoint Notion API metrics in the curses window.
+    Press 'd' to append the calls recorded since the last dump to `dump_path` as JSON lines.
+    """
+    metrics = get_default_metrics()
+    stdscr.clear()
+    h, w = stdscr.getmaxyx()
+    stdscr.addstr(0, 0, "Notion API metrics (since start-up)"[:w - 1])
+    lines = metrics.summary_lines()
+    if len(lines) == 1:
+        lines.append("No API calls recorded yet.")
+    for idx, line in enumerate(lines[:h - 4]):
+        stdscr.addstr(idx + 2, 0, line[:w - 1])
+    stdscr.addstr(h - 1, 0, "Press 'd' to append the calls since the last dump as JSON lines, any other key to return."[:w - 1])
+    stdscr.refresh()
+
+    if stdscr.getch() == ord('d'):
+        count = metrics.dump_jsonl(dump_path)
+        stdscr.addstr(h - 1, 0, f"Wrote {count} lines to {dump_path}. Press any key to return."[:w - 1])
+        stdscr.clrtoeol()
+        stdscr.refresh()
+        stdscr.getch()
+
+
+def main(stdscr, database_id, headers, test):
+    """
+    Runs the menu until 'Exit' is chosen.
+
+    sample usage:
+        curses.wrapper(main, DATABASE_ID, notion_headers(), test)
+
+    :param stdscr: The curses window, from curses.wrapper.
+    :param database_id: The applications database.
+    :param headers: Notion API headers.
+    :param test: Job function behind 'Run Test Function'; receives the Job.
+    """
+    # Clear screen
+    stdscr.clear()
+
+    # Menu options
+    menu = [
+        'Run Test Function',
+        'View Applications',
+        'Check Email',
+        'Get New Jobs',
+        'Fill Job Info',
+        'View Jobs',
+        'View API Metrics',
+        'Exit'
+    ]
+    current_row = 0
+
+    # Long-running options run in the background so the menu stays responsive
+    runner = JobRunner()
+
+    def print_menu(selected_row_idx):
+        stdscr.erase()
+        h, w = stdscr.getmaxyx()
+        for idx, row in enumerate(menu):
+            x = w // 2 - len(row) // 2
+            # place the menu roughly in the vertical center
+            y = h // 2 - len(menu) // 2 + idx
+            if idx == selected_row_idx:
+                stdscr.attron(curses.color_pair(1))
+                stdscr.addstr(y, x, row)
+                stdscr.attroff(curses.color_pair(1))
+            else:
+                stdscr.addstr(y, x, row)
+        # Status bar with the running jobs
+        status = runner.status_line()
+        if status:
+            stdscr.addstr(h - 1, 0, status[:w - 1], curses.A_REVERSE)
+        stdscr.refresh()
+
+    # Initialize curses settings
+    curses.curs_set(0)
+    curses.init_pair(1, curses.COLOR_BLACK, curses.COLOR_WHITE)
+
+    print_menu(current_row)
+
+    while True:
+        # Wake up regularly to refresh the status bar
+        stdscr.timeout(250)
+        key = stdscr.getch()
+
+        # Navigate up/down
+        if key == curses.KEY_UP and current_row > 0:
+            current_row -= 1
+        elif key == curses.KEY_DOWN and current_row < len(menu) - 1:
+            current_row += 1
+        # Enter key pressed
+        elif key in [curses.KEY_ENTER, 10, 13]:
+            # Option 0 -> Run Test Function
+            if current_row == 0:
+                # Run the test in the background; its log is under 'View Jobs'
+                runner.submit(menu[current_row], test, log=StdoutRedirector(stdscr, top=2))
+                print_menu(current_row)
+
+            # Option 1 -> View Applications
+            elif current_row == 1:
+                stdscr.timeout(-1)
+                show_applications(stdscr, database_id, headers)
+                print_menu(current_row)
+
+            # Option 2 -> Check Email
+            elif current_row == 2:
+                # Syncs in the background; the new emails are in the job's log under 'View Jobs'
+                runner.submit(menu[current_row], check_email, log=StdoutRedirector(stdscr, top=2))
+                print_menu(current_row)
+
+            # Option 3 -> Get New Jobs
+            elif current_row == 3:
+                # Polls in the background; the new postings are in the job's log under 'View Jobs'
+                runner.submit(menu[current_row], new_jobs, log=StdoutRedirector(stdscr, top=2))
+                print_menu(current_row)
+
+            # Option 4 -> Fill Job Info
+            elif current_row == 4:
+                stdscr.timeout(-1)
+                stdscr.clear()
+                stdscr.addstr(0, 0, "This option is not implemented yet.\n")
+                stdscr.addstr("\nPress any key to return to the menu.")
+                stdscr.refresh()
+                stdscr.getch()
+                print_menu(current_row)
+
+            # Option 5 -> View Jobs
+            elif current_row == 5:
+                show_jobs(stdscr, runner)
+                print_menu(current_row)
+
+            # Option 6 -> View API Metrics
+            elif current_row == 6:
+                stdscr.timeout(-1)
+                show_metrics(stdscr)
+                print_menu(current_row)
+
+            # Option 7 -> Exit
+            elif current_row == 7:
+                break
+
+        print_menu(current_row)
+
+    # Stop any jobs still running before leaving curses
+    runner.shutdown()
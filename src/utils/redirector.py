@@ -5,62 +5,167 @@ Description: Utility functions for redirecting stdout to a curses window.
 '''
 
 # local imports
+import time
 import curses
-from io import StringIO
+import threading
+from collections import deque
+
 
 class StdoutRedirector:
     """
-    Redirects stdout to write into the curses window with basic line-wrapping.
+    Redirects stdout into a scrollable log view in a curses window.
+
+    Output is wrapped to the window width once, as it is written, and kept in a
+    bounded ring buffer of lines, so memory stays constant however much is
+    printed. Writes never block: redraws are throttled and only paint the
+    visible viewport, and writes from threads other than the one that created
+    the view only update the buffer (that thread's UI loop calls `render`).
+
+    sample usage:
+        redirector = StdoutRedirector(stdscr)
+        sys.stdout = redirector
+        ...
+        redirector.view()  # scroll with arrows / PgUp / PgDn, 'q' to leave
     """
-    def __init__(self, stdscr):
+    SCROLL_KEYS = {curses.KEY_UP, curses.KEY_DOWN, curses.KEY_PPAGE, curses.KEY_NPAGE, curses.KEY_HOME, curses.KEY_END}
+
+    def __init__(self, stdscr, max_lines=5000, top=0, bottom=1, refresh_interval=0.05):
+        """
+        :param stdscr: The curses window to draw into.
+        :param max_lines: Number of wrapped lines kept; older lines are dropped.
+        :param top: Rows reserved above the log (e.g. a title).
+        :param bottom: Rows reserved below the log (e.g. a status/help line).
+        :param refresh_interval: Minimum seconds between redraws triggered by writes.
+        """
         self.stdscr = stdscr
-        self.buffer = StringIO()
-        self.line = 0  # current line in the curses window
+        self.lines = deque(maxlen=max_lines)
+        self.partial = ""
+        self.top = top
+        self.bottom = bottom
+        self.offset = 0  # lines scrolled up from the end, 0 follows new output
+        self.refresh_interval = refresh_interval
+        self.last_render = 0.0
+        self.lock = threading.Lock()
+        self.owner = threading.current_thread()
+        # Cached so writes from other threads never call into curses
+        self.size = stdscr.getmaxyx()
+
+    @property
+    def height(self):
+        return max(1, self.size[0] - self.top - self.bottom)
+
+    def _wrap(self, line, width):
+        # w-1 to avoid a newline at last column
+        width = max(1, width - 1)
+        if not line:
+            return [""]
+        return [line[i : i + width] for i in range(0, len(line), width)]
 
     def write(self, output):
-        self.buffer.write(output)
-        # If there's a newline in the output, flush immediately.
-        # (This helps ensure prints appear in near real-time.)
-        if '\n' in output:
-            self.flush()
+        w = self.size[1]
+        with self.lock:
+            text = self.partial + output
+            *complete, self.partial = text.split('\n')
+            for line in complete:
+                wrapped = self._wrap(line, w)
+                self.lines.extend(wrapped)
+                # Keep a scrolled-up viewport on the same lines while output arrives
+                if self.offset:
+                    self.offset = min(self.offset + len(wrapped), max(0, len(self.lines) - self.height))
+        if complete and threading.current_thread() is self.owner:
+            if time.monotonic() - self.last_render >= self.refresh_interval:
+                self.render()
+        return len(output)
 
     def flush(self):
-        # Move cursor to start of buffer
-        self.buffer.seek(0)
-        text = self.buffer.read()
-        # Reset the buffer so future writes start fresh
-        self.buffer = StringIO()
-
-        # Split text into lines
-        lines = text.split('\n')
-        h, w = self.stdscr.getmaxyx()  # height, width of current window
-
-        for line in lines:
-            # Wrap each line if longer than the window width
-            wrapped_chunks = [
-                line[i : i + (w - 1)]  # w-1 to avoid a newline at last column
-                for i in range(0, len(line), w - 1)
-            ]
-            # If the line is empty (just a newline), we want an empty chunk to move the cursor
-            if not wrapped_chunks:
-                wrapped_chunks = [""]
-
-            for chunk in wrapped_chunks:
-                # If we've run out of vertical space, wait for keypress and then clear screen
-                if self.line >= h - 1:
-                    self.stdscr.addstr(h - 1, 0, " -- More (press any key) --")
-                    self.stdscr.refresh()
-                    self.stdscr.getch()  # wait for user
-                    self.stdscr.clear()
-                    self.line = 0
+        if threading.current_thread() is self.owner:
+            self.render()
+
+    def render(self):
+        """
+        Paints the visible part of the log. Must be called from the UI thread.
+        """
+        self.size = self.stdscr.getmaxyx()
+        w = self.size[1]
+        height = self.height
+        with self.lock:
+            end = len(self.lines) - self.offset
+            visible = [self.lines[i] for i in range(max(0, end - height), end)]
+            if self.partial and not self.offset:
+                visible = (visible + self._wrap(self.partial, w))[-height:]
 
+        for row in range(height):
+            try:
+                self.stdscr.move(self.top + row, 0)
+                self.stdscr.clrtoeol()
+                if row < len(visible):
+                    self.stdscr.addstr(self.top + row, 0, visible[row][:w - 1])
+            except curses.error:
+                # Writing to the last cell of the window raises; nothing is lost
+                pass
+        self.stdscr.refresh()
+        self.last_render = time.monotonic()
+
+    def scroll(self, lines):
+        """
+        Scrolls by `lines` (positive is up, towards older output).
+        """
+        with self.lock:
+            self.offset = min(max(0, self.offset + lines), max(0, len(self.lines) - self.height))
+
+    def handle_key(self, key) -> bool:
+        """
+        Scrolls for arrow, page, Home and End keys.
+
+        :return: True if the key was a scroll key.
+        """
+        if key not in self.SCROLL_KEYS:
+            return False
+        page = self.height - 1
+        if key == curses.KEY_UP:
+            self.scroll(1)
+        elif key == curses.KEY_DOWN:
+            self.scroll(-1)
+        elif key == curses.KEY_PPAGE:
+            self.scroll(page)
+        elif key == curses.KEY_NPAGE:
+            self.scroll(-page)
+        elif key == curses.KEY_HOME:
+            self.scroll(len(self.lines))
+        elif key == curses.KEY_END:
+            self.scroll(-len(self.lines))
+        self.render()
+        return True
+
+    def view(self, help_text="Arrows/PgUp/PgDn to scroll, q to return.", header=None, on_key=None, live=False):
+        """
+        Lets the user scroll through the log until 'q', Esc or Enter is pressed.
+
+        :param help_text: Shown on the last row.
+        :param header: (Optional) Callable returning a line drawn on the first row.
+        :param on_key: (Optional) Callable for keys the view does not handle itself.
+        :param live: (Optional) Redraw a few times a second, for output still being written
+                     by another thread.
+        """
+        self.stdscr.keypad(True)
+        self.stdscr.timeout(200 if live else -1)
+        try:
+            while True:
+                self.render()
+                h, w = self.size
                 try:
-                    self.stdscr.addstr(self.line, 0, chunk)
+                    if header is not None:
+                        self.stdscr.addstr(0, 0, header()[:w - 1])
+                        self.stdscr.clrtoeol()
+                    self.stdscr.addstr(h - 1, 0, help_text[:w - 1])
+                    self.stdscr.clrtoeol()
                 except curses.error:
-                    # If there's an error writing, we can safely ignore or handle differently
                     pass
-
-                self.line += 1
-
-        # Refresh screen to show newly printed lines
-        self.stdscr.refresh()
\ No newline at end of file
+                self.stdscr.refresh()
+                key = self.stdscr.getch()
+                if key in (ord('q'), 27, curses.KEY_ENTER, 10, 13):
+                    return
+                if not self.handle_key(key) and key != -1 and on_key is not None:
+                    on_key(key)
+        finally:
+            self.stdscr.timeout(-1)
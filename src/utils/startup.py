@@ -0,0 +1,133 @@
+'''
+File: startup.py
+
+Description: Startup-time budget for the entry points. Each entry point is run
+in a fresh interpreter under `python -X importtime`; the time spent importing
+modules beyond a bare interpreter is compared with its budget, and modules an
+entry point must never load (e.g. the ML stack for `--version`) are flagged.
+Exits with 1 when any entry point is over budget, so it can gate changes.
+'''
+
+# global imports
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Libraries that only the commands using them should import
+NETWORK = ("requests", "urllib3", "dotenv")
+HEAVY = ("openai", "transformers", "torch", "selenium")
+
+# name -> (interpreter arguments, import budget in ms, top-level packages that must not be imported)
+ENTRY_POINTS = {
+    "version": (["main.py", "--version"], 25, NETWORK + HEAVY + ("curses", "sqlite3")),
+    "help": (["main.py", "--help"], 25, NETWORK + HEAVY + ("curses", "sqlite3")),
+    "menu": (["-c", "import main, curses, src.utils.menu"], 40, NETWORK + HEAVY),
+    "sync": (["-c", "import main; main.database.get_client; main.mirror.NotionMirror"], 150, HEAVY),
+    "check-email": (["-c", "import main; main.gmail.check_gmail_inbox"], 150, HEAVY),
+    "get-new-jobs": (["-c", "import main; main.application.get_new_jobs"], 170, HEAVY),
+    "ai": (["-c", "import src.ai.gen_email, src.ai.gen_app"], 30, NETWORK + HEAVY),
+}
+
+
+def import_times(args):
+    """
+    Runs `python -X importtime <args>` from the repository root.
+
+    :return: A list of (module, depth, self_us, cumulative_us), in the order reported.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"{' '.join(args)} exited with {result.returncode}: {errors[-1] if errors else ''}")
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        modules.append((stripped, (len(name) - len(stripped) - 1) // 2, int(fields[0]), int(fields[1])))
+    return modules
+
+
+def measure(args, baseline, repeat=5) -> dict:
+    """
+    Import cost of one entry point beyond the modules a bare interpreter loads.
+
+    :param args: Interpreter arguments of the entry point.
+    :param baseline: Module names imported by `python -c pass`.
+    :param repeat: Runs to take the fastest of, to filter out noise.
+    :return: {"ms", "modules", "packages": {top-level package: ms}}
+    """
+    best = None
+    for _ in range(repeat):
+        modules = [module for module in import_times(args) if module[0] not in baseline]
+        total = sum(self_us for _, _, self_us, _ in modules)
+        if best is None or total < best[0]:
+            best = (total, modules)
+    total, modules = best
+    packages = {}
+    for name, _, self_us, _ in modules:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us / 1000
+    return {"ms": total / 1000, "modules": len(modules),
+            "packages": dict(sorted(packages.items(), key=lambda item: -item[1]))}
+
+
+def check(names=None, repeat=5, scale=1.0) -> list:
+    """
+    Measures entry points against their budgets.
+
+    :param names: (Optional) Entry points to check; all by default.
+    :param repeat: (Optional) Runs per entry point.
+    :param scale: (Optional) Multiplier for every budget, for slower machines.
+    :return: One dict per entry point with its measurement, budget, forbidden imports and "ok".
+    """
+    baseline = {name for name, _, _, _ in import_times(["-c", "pass"])}
+    results = []
+    for name in names or ENTRY_POINTS:
+        args, budget, forbidden = ENTRY_POINTS[name]
+        result = measure(args, baseline, repeat)
+        result.update(entry_point=name, budget_ms=budget * scale,
+                      forbidden=[package for package in result["packages"] if package in forbidden])
+        result["ok"] = result["ms"] <= result["budget_ms"] and not result["forbidden"]
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the import time of each entry point against its budget.")
+    parser.add_argument('entry_points', nargs='*', help=f"Entry points to check (default: all of {', '.join(ENTRY_POINTS)}).")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per entry point; the fastest is kept.")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every budget, e.g. 2 on a slow machine.")
+    parser.add_argument('--json', action='store_true', help="Print one JSON object per entry point.")
+
+    args = parser.parse_args()
+
+    unknown = [name for name in args.entry_points if name not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown entry points: {', '.join(unknown)}")
+    results = check(args.entry_points, args.repeat, args.scale)
+    for result in results:
+        if args.json:
+            print(json.dumps(result))
+            continue
+        heaviest = ", ".join(f"{package} {ms:.1f}" for package, ms in list(result["packages"].items())[:4])
+        status = "ok" if result["ok"] else "OVER BUDGET" if not result["forbidden"] else "FORBIDDEN IMPORTS"
+        print(f"{result['entry_point']:<13} {result['ms']:7.1f} ms / {result['budget_ms']:5.0f} ms  {status:<17} "
+              f"{result['modules']:>4} modules; heaviest (ms): {heaviest}")
+        if result["forbidden"]:
+            print(f"{'':<13} imports {', '.join(result['forbidden'])}")
+    sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+# sample use:
+# python -m src.utils.startup
+# python -m src.utils.startup version sync --repeat 10
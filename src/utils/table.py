@@ -0,0 +1,203 @@
+'''
+File: table.py
+
+Description: A paginated, lazily rendered table of job applications for the
+curses window. Rows are pulled from a streaming iterator only as far as the
+screen needs, and sorting/filtering work on the rows already pulled.
+'''
+
+# global imports
+import curses
+
+# (header, JobApplication attribute, width)
+COLUMNS = [
+    ("Company", "company", 24),
+    ("Stage", "stage", 18),
+    ("Job ID", "job_id", 16),
+    ("Location", "location", 22),
+    ("Date Applied", "date_applied", 12),
+]
+
+
+def cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, tuple):
+        return ", ".join(value)
+    return str(value)
+
+
+class TableView:
+    """
+    Shows JobApplication records one screen at a time.
+
+    Keys: arrows / PgUp / PgDn move, 's' cycles the sort column, 'r' reverses it,
+    'f' filters by Stage or Company, 'x' clears the filter, 'q' returns.
+    Filtering pulls more rows only until the screen is full; sorting needs every
+    row, so it drains the iterator once. Rows are never fetched twice.
+
+    sample usage:
+        records = (codec.decode(page) for page in iter_rows(DATABASE_ID, HEADERS))
+        TableView(stdscr, records).run()
+    """
+
+    def __init__(self, stdscr, records, columns=COLUMNS, title="Applications"):
+        """
+        :param stdscr: The curses window to draw into.
+        :param records: An iterator of JobApplication records, consumed lazily.
+        :param columns: (Optional) (header, attribute, width) tuples.
+        :param title: (Optional) Shown on the first row.
+        """
+        self.stdscr = stdscr
+        self.source = iter(records)
+        self.exhausted = False
+        self.loaded = []
+        self.columns = columns
+        self.title = title
+        self.sort_index = None
+        self.sort_reverse = False
+        self.filter = None  # (attribute, text)
+        self.view = []
+        self.view_upto = 0  # how many loaded rows have been considered for `view`
+        self.top = 0
+        self.selected = 0
+
+    @property
+    def page_size(self):
+        h, _ = self.stdscr.getmaxyx()
+        # title, header, separator and status rows
+        return max(1, h - 4)
+
+    def _matches(self, record):
+        if self.filter is None:
+            return True
+        attribute, text = self.filter
+        return text.lower() in cell_text(getattr(record, attribute)).lower()
+
+    def _pull(self, count):
+        """
+        Pulls up to `count` more records from the source.
+        """
+        for _ in range(count):
+            try:
+                self.loaded.append(next(self.source))
+            except StopIteration:
+                self.exhausted = True
+                return
+
+    def _extend_view(self):
+        for record in self.loaded[self.view_upto:]:
+            if self._matches(record):
+                self.view.append(record)
+        self.view_upto = len(self.loaded)
+
+    def ensure(self, count):
+        """
+        Makes sure at least `count` rows are visible in the current view, pulling lazily.
+        """
+        while len(self.view) < count and not self.exhausted:
+            self._pull(self.page_size)
+            self._extend_view()
+
+    def _rebuild(self):
+        if self.sort_index is not None:
+            # Sorting needs every row; drain what is left of the source once
+            while not self.exhausted:
+                self._pull(1000)
+        self.view = []
+        self.view_upto = 0
+        self._extend_view()
+        if self.sort_index is not None:
+            attribute = self.columns[self.sort_index][1]
+            self.view.sort(key=lambda record: cell_text(getattr(record, attribute)).lower(), reverse=self.sort_reverse)
+        self.top = self.selected = 0
+
+    def set_sort(self, index, reverse=False):
+        self.sort_index = index
+        self.sort_reverse = reverse
+        self._rebuild()
+
+    def set_filter(self, attribute, text):
+        self.filter = (attribute, text) if text else None
+        self._rebuild()
+
+    def move(self, delta):
+        self.ensure(self.selected + delta + 1)
+        self.selected = max(0, min(self.selected + delta, len(self.view) - 1))
+        if self.selected < self.top:
+            self.top = self.selected
+        elif self.selected >= self.top + self.page_size:
+            self.top = self.selected - self.page_size + 1
+
+    def render(self):
+        self.ensure(self.top + self.page_size)
+        self.stdscr.erase()
+        h, w = self.stdscr.getmaxyx()
+        header = " ".join(f"{name:<{width}.{width}}" for name, _, width in self.columns)
+        sort = ""
+        if self.sort_index is not None:
+            sort = f" sorted by {self.columns[self.sort_index][0]}{' (desc)' if self.sort_reverse else ''}"
+        filtered = f" filter {self.filter[0]}~'{self.filter[1]}'" if self.filter else ""
+        total = f"{len(self.view)}{'' if self.exhausted else '+'}"
+
+        try:
+            self.stdscr.addstr(0, 0, f"{self.title}: {total} rows{sort}{filtered}"[:w - 1])
+            self.stdscr.addstr(1, 0, header[:w - 1], curses.A_BOLD)
+            self.stdscr.addstr(2, 0, "-" * min(len(header), w - 1))
+            for row, record in enumerate(self.view[self.top:self.top + self.page_size]):
+                line = " ".join(f"{cell_text(getattr(record, attribute)):<{width}.{width}}"
+                                for _, attribute, width in self.columns)
+                attr = curses.A_REVERSE if self.top + row == self.selected else curses.A_NORMAL
+                self.stdscr.addstr(row + 3, 0, line[:w - 1], attr)
+            self.stdscr.addstr(h - 1, 0, "Arrows/PgUp/PgDn move, s sort, r reverse, f filter, x clear, q return."[:w - 1])
+        except curses.error:
+            pass
+        self.stdscr.refresh()
+
+    def prompt(self, question) -> str:
+        """
+        Asks for a line of text on the status row.
+        """
+        h, w = self.stdscr.getmaxyx()
+        self.stdscr.move(h - 1, 0)
+        self.stdscr.clrtoeol()
+        self.stdscr.addstr(h - 1, 0, question[:w - 1])
+        curses.echo()
+        curses.curs_set(1)
+        try:
+            text = self.stdscr.getstr(h - 1, min(len(question), w - 2), 60)
+        finally:
+            curses.noecho()
+            curses.curs_set(0)
+        return text.decode("utf-8", "replace").strip()
+
+    def run(self):
+        """
+        Shows the table until the user presses 'q' or Esc.
+        """
+        self.stdscr.keypad(True)
+        while True:
+            self.render()
+            key = self.stdscr.getch()
+            if key in (ord('q'), 27):
+                return
+            if key == curses.KEY_DOWN:
+                self.move(1)
+            elif key == curses.KEY_UP:
+                self.move(-1)
+            elif key == curses.KEY_NPAGE:
+                self.move(self.page_size)
+            elif key == curses.KEY_PPAGE:
+                self.move(-self.page_size)
+            elif key == ord('s'):
+                index = 0 if self.sort_index is None else (self.sort_index + 1) % len(self.columns)
+                self.set_sort(index, self.sort_reverse)
+            elif key == ord('r') and self.sort_index is not None:
+                self.set_sort(self.sort_index, not self.sort_reverse)
+            elif key == ord('f'):
+                field = self.prompt("Filter by (s)tage or (c)ompany? ").lower()
+                attribute = {"s": "stage", "c": "company"}.get(field[:1])
+                if attribute:
+                    self.set_filter(attribute, self.prompt(f"{attribute.title()} contains: "))
+            elif key == ord('x'):
+                self.set_filter(None, None)
@@ -5,10 +5,82 @@ DESCRIPTION: Utility functions for running the web browser to go through job
 links and scrape job information.
 """
 
-def scrape_job_links():
+# local imports
+from src.web.browser import get_default_pool
+from src.web.listings import ListingFetcher, read_sources
+from src.web.seen import SeenIndex
+
+
+def scrape_job_links(links_path="data/links.txt", cache_dir="data/listings_cache", **fetcher_kwargs):
+    """
+    Fetches every listing source in `links_path` concurrently and returns the open postings.
+    Sources that have not changed since the last call are answered with a 304 and
+    parsed from the local cache.
+
+    :param links_path: (Optional) File with one source URL per line.
+    :param cache_dir: (Optional) Directory for the cached sources.
+    :param fetcher_kwargs: (Optional) More ListingFetcher arguments, e.g. raw_base for a fixture server.
+    :return: A list of Posting records that are not marked closed.
     """
-    Stub function to scrape job links from the web.
+    fetcher = ListingFetcher(read_sources(links_path), cache_dir=cache_dir, **fetcher_kwargs)
+    postings = []
+    for result in fetcher.fetch_all():
+        if result["error"]:
+            print(f"Could not fetch {result['source']}: {result['error']}")
+            continue
+        print(f"{result['source']}: {'updated' if result['changed'] else 'unchanged'}, "
+              f"{len(result['postings'])} postings")
+        postings.extend(posting for posting in result["postings"] if not posting.closed)
+    return postings
+
+
+def get_new_jobs(links_path="data/links.txt", cache_dir="data/listings_cache", index_path="data/seen_postings.sqlite3",
+                 mark=True, **fetcher_kwargs):
+    """
+    Polls the listing sources and returns the open postings that no earlier poll has
+    returned. Sources that answer 304 are parsed from the local cache, and every posting
+    is checked against the seen-postings index (a Bloom filter in front of SQLite), so
+    postings a dry run, crash or cancelled poll did not record are returned next time.
+
+    :param links_path: (Optional) File with one source URL per line.
+    :param cache_dir: (Optional) Directory for the cached sources.
+    :param index_path: (Optional) Location of the seen-postings index.
+    :param mark: (Optional) Record the returned postings as seen; False for a dry run.
+    :param fetcher_kwargs: (Optional) More ListingFetcher arguments, e.g. raw_base for a fixture server.
+    :return: A list of new Posting records, in listing order.
+    :raises ConnectionError: If no source could be fetched at all.
     """
-    print("Stub: Scraping job links from websites...")
-    # Implement your actual scraping logic here
-    return []
+    fetcher = ListingFetcher(read_sources(links_path), cache_dir=cache_dir, **fetcher_kwargs)
+    # The cache validators are saved as soon as a source is fetched, so a 304 says
+    # nothing about what has been marked seen: unchanged sources are parsed too.
+    results = fetcher.fetch_all()
+    postings = []
+    for result in results:
+        if result["error"]:
+            print(f"Could not fetch {result['source']}: {result['error']}")
+        else:
+            postings.extend(posting for posting in result["postings"] if not posting.closed)
+    if results and all(result["error"] for result in results):
+        raise ConnectionError(f"None of the {len(results)} listing sources could be fetched")
+    with SeenIndex(index_path) as index:
+        new = index.filter_new(postings, mark=mark)
+        print(f"{len(new)} new of {len(postings)} open postings ({len(index)} seen in total)")
+    return new
+
+
+def scrape_job_pages(urls, pool=None):
+    """
+    Opens job pages concurrently in the shared browser pool (logged-in sessions are
+    restored per site) and reads their title and visible text.
+
+    :param urls: The job page URLs, e.g. Posting.url of new postings.
+    :param pool: (Optional) The BrowserPool to use; the process-wide pool by default.
+    :return: One {"url", "title", "text"} dictionary per URL, or the exception raised for that page.
+    """
+    def read(driver):
+        from selenium.webdriver.common.by import By
+
+        return {"url": driver.current_url, "title": driver.title,
+                "text": driver.find_element(By.TAG_NAME, "body").text}
+
+    return (pool or get_default_pool()).map(urls, read, return_exceptions=True)
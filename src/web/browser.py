@@ -0,0 +1,311 @@
+"""
+FILE: src/web/browser.py
+
+DESCRIPTION: A pool of long-lived headless browsers (Selenium WebDriver) shared
+by the web tools. Browsers are started on demand up to the pool size, reused
+across pages and recycled after a number of uses. Cookies and web storage are
+saved per site on disk, so a login made once is restored in every browser of
+the pool, and in later runs, without logging in again.
+"""
+
+# global imports
+import os
+import json
+import time
+import queue
+import threading
+import contextlib
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+# Returns [sessionStorage, localStorage] of the current page as plain objects
+DUMP_STORAGE = "return [Object.assign({}, window.sessionStorage), Object.assign({}, window.localStorage)];"
+LOAD_STORAGE = """
+const [session, local] = arguments;
+for (const [key, value] of Object.entries(session)) { window.sessionStorage.setItem(key, value); }
+for (const [key, value] of Object.entries(local)) { window.localStorage.setItem(key, value); }
+"""
+
+
+def site_of(url) -> str:
+    """
+    The origin a URL belongs to, e.g. "https://boards.greenhouse.io/acme/jobs/1" -> "https://boards.greenhouse.io".
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def launch_chrome(headless=True, page_load_timeout=30):
+    """
+    Starts a Chrome/Chromium WebDriver. Selenium is only imported here, so the
+    rest of the app never pays for it.
+
+    :raises ImportError: If selenium is not installed.
+    """
+    try:
+        from selenium import webdriver
+    except ImportError as e:
+        raise ImportError("The browser pool needs selenium: pip install selenium") from e
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    for argument in ("--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--window-size=1280,1024"):
+        options.add_argument(argument)
+    # Do not wait for images and other subresources before returning from get()
+    options.page_load_strategy = "eager"
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+
+class SiteStateStore:
+    """
+    Saved cookies and session/local storage, one JSON file per site.
+    """
+    def __init__(self, state_dir="data/browser_state"):
+        self.state_dir = state_dir
+        self.lock = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)
+
+    def _path(self, site):
+        name = urlsplit(site).netloc.replace(":", "_") or "local"
+        return os.path.join(self.state_dir, f"{name}.json")
+
+    def load(self, site):
+        """
+        :return: {"cookies", "session_storage", "local_storage", "saved_at"}, or None if nothing is saved.
+        """
+        try:
+            with open(self._path(site), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, site, cookies, session_storage, local_storage):
+        state = {"site": site, "cookies": cookies, "session_storage": session_storage,
+                 "local_storage": local_storage, "saved_at": time.time()}
+        path = self._path(site)
+        with self.lock:
+            with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(path + ".tmp", path)
+        return state
+
+    def clear(self, site):
+        with self.lock:
+            try:
+                os.remove(self._path(site))
+            except FileNotFoundError:
+                pass
+
+
+class BrowserContext:
+    """
+    One browser of the pool, with its use count and the saved state it has loaded per site.
+    """
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.loaded = {}  # site -> saved_at of the state restored into this browser
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            # The browser may already be gone; nothing left to clean up
+            pass
+
+
+class BrowserPool:
+    """
+    A bounded pool of headless browsers with per-site persisted sessions.
+
+    At most `size` browsers run at once; a browser is quit and replaced after
+    `max_uses` pages to keep memory in check. Before a page of a site is
+    opened, the site's saved cookies and storage are loaded into the browser
+    if it does not have the latest copy yet.
+
+    sample usage:
+        with BrowserPool(size=3) as pool:
+            titles = pool.map(urls, lambda driver: driver.title)
+            pool.run(login_url, do_login, save_state=True)
+    """
+
+    def __init__(self, size=2, max_uses=50, headless=True, state_dir="data/browser_state", driver_factory=None,
+                 page_load_timeout=30):
+        """
+        :param size: Maximum number of browsers running at the same time.
+        :param max_uses: Pages a browser serves before it is replaced.
+        :param headless: (Optional) Run the browsers without a window.
+        :param state_dir: (Optional) Directory for the per-site cookies and storage.
+        :param driver_factory: (Optional) Callable returning a new WebDriver; launch_chrome by default.
+        :param page_load_timeout: (Optional) Seconds before a page load is abandoned.
+        """
+        self.size = size
+        self.max_uses = max_uses
+        self.store = SiteStateStore(state_dir)
+        self.driver_factory = driver_factory or (lambda: launch_chrome(headless, page_load_timeout))
+        self.idle = queue.LifoQueue()  # the most recently used browser is the warmest
+        self.slots = threading.BoundedSemaphore(size)
+        self.launched = 0
+        self.recycled = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def acquire(self) -> BrowserContext:
+        """
+        Waits for a free slot, then takes an idle browser or starts a new one.
+        """
+        if self.closed:
+            raise RuntimeError("The browser pool is closed")
+        self.slots.acquire()
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            context = BrowserContext(self.driver_factory())
+        except BaseException:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.launched += 1
+        return context
+
+    def release(self, context, broken=False):
+        """
+        Returns a browser to the pool, or quits it if it is worn out or broken.
+        """
+        context.uses += 1
+        if broken or self.closed or context.uses >= self.max_uses:
+            context.quit()
+            with self.lock:
+                self.recycled += 1
+        else:
+            self.idle.put(context)
+        self.slots.release()
+
+    @contextlib.contextmanager
+    def context(self):
+        context = self.acquire()
+        broken = False
+        try:
+            yield context
+        except Exception as e:
+            # A browser whose session or window is gone cannot be reused
+            broken = type(e).__name__ in ("InvalidSessionIdException", "NoSuchWindowException")
+            raise
+        finally:
+            self.release(context, broken)
+
+    def restore(self, context, site):
+        """
+        Loads the saved cookies and storage of `site` into the browser, unless it already has them.
+        Cookies can only be set for the current domain, so this first opens a cheap page of the site.
+
+        :return: True if saved state exists for the site.
+        """
+        state = self.store.load(site)
+        if state is None:
+            return False
+        if context.loaded.get(site) == state["saved_at"]:
+            return True
+        driver = context.driver
+        driver.get(site + "/robots.txt")
+        driver.delete_all_cookies()
+        for cookie in state["cookies"]:
+            # Expired or cross-domain cookies are rejected by the browser; skip them
+            cookie = {key: value for key, value in cookie.items() if key != "sameSite" or value in ("Strict", "Lax", "None")}
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                continue
+        if state["session_storage"] or state["local_storage"]:
+            driver.execute_script(LOAD_STORAGE, state["session_storage"], state["local_storage"])
+        context.loaded[site] = state["saved_at"]
+        return True
+
+    def save_state(self, context, site=None):
+        """
+        Saves the browser's cookies and storage for the site of the current page (or `site`).
+        """
+        driver = context.driver
+        site = site or site_of(driver.current_url)
+        session_storage, local_storage = {}, {}
+        if site_of(driver.current_url) == site:
+            session_storage, local_storage = driver.execute_script(DUMP_STORAGE)
+        state = self.store.save(site, driver.get_cookies(), session_storage, local_storage)
+        context.loaded[site] = state["saved_at"]
+        return state
+
+    def run(self, url, func=None, save_state=False):
+        """
+        Opens `url` in a pooled browser with the site's saved session and calls `func(driver)`.
+
+        :param url: The page to open.
+        :param func: (Optional) Callable taking the WebDriver; returns the page source if not given.
+        :param save_state: (Optional) Save the site's cookies and storage afterwards, e.g. after a login.
+        :return: What `func` returned.
+        """
+        with self.context() as context:
+            site = site_of(url)
+            self.restore(context, site)
+            context.driver.get(url)
+            result = func(context.driver) if func is not None else context.driver.page_source
+            if save_state:
+                self.save_state(context, site)
+            return result
+
+    def map(self, urls, func=None, save_state=False, return_exceptions=False) -> list:
+        """
+        Runs `run(url, func)` for every URL, one per browser of the pool at a time.
+
+        :param return_exceptions: (Optional) Put a page's exception in its result slot instead of raising.
+        :return: The results, in the order of `urls`.
+        """
+        def run_one(url):
+            try:
+                return self.run(url, func, save_state)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        urls = list(urls)
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.size, len(urls)), thread_name_prefix="browser") as executor:
+            return list(executor.map(run_one, urls))
+
+    def close(self):
+        """
+        Quits every idle browser; browsers still in use are quit when they are released.
+        """
+        self.closed = True
+        while True:
+            try:
+                context = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            context.quit()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> BrowserPool:
+    """
+    Returns the process-wide pool used by login_to_site and the scrapers.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None or _default_pool.closed:
+            _default_pool = BrowserPool()
+        return _default_pool
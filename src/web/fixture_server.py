@@ -0,0 +1,360 @@
+'''
+FILE: src/web/fixture_server.py
+DESCRIPTION: A local stand-in for the sites the web tools talk to. It serves
+job listing READMEs (recorded copies from a directory, or generated tables in
+the markdown and HTML styles of the SimplifyJobs lists) with ETag and
+Last-Modified validators and 304 responses, plus a small job board behind a
+login form with cookie sessions, so the listing fetcher and the browser pool
+can be run and measured offline.
+'''
+
+# global imports
+import os
+import html
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, quote
+
+# local imports
+from src.web.listings import raw_url, read_sources
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Pied Piper"]
+ROLES = ["Software Engineer", "Data Scientist", "Machine Learning Engineer", "Backend Engineer", "Quant Researcher"]
+LOCATIONS = ["New York, NY", "San Francisco, CA", "Seattle, WA", "Remote in USA", "Austin, TX"]
+
+
+def make_readme(rows=200, style="markdown", seed=0, closed_every=7, start=0):
+    """
+    Builds a README with a postings table in the style of the SimplifyJobs lists.
+
+    :param rows: Number of postings.
+    :param style: "markdown" (pipe table with inline HTML links) or "html" (<table>).
+    :param seed: Seed for the random company/role/location picks; rows with the same index and seed match.
+    :param closed_every: (Optional) Every Nth posting is marked closed (0 for none).
+    :param start: (Optional) Index of the first posting, so later versions of a list can add rows.
+    :return: The README text.
+    """
+    lines = ["# New Grad Positions", "", "Use this repo to share and keep track of new grad jobs.", "",
+             "<!-- TABLE_START -->", ""]
+    if style == "html":
+        lines += ["<table>", "<thead>", "<tr>", "<th>Company</th>", "<th>Role</th>", "<th>Location</th>",
+                  "<th>Application</th>", "<th>Age</th>", "</tr>", "</thead>", "<tbody>"]
+    else:
+        lines += ["| Company | Role | Location | Application/Link | Date Posted |",
+                  "| ------- | ---- | -------- | :--------------: | :---------: |"]
+    previous = None
+    # Newest postings come first, as in the real lists
+    for i in reversed(range(start, start + rows)):
+        # Seeded per row, so a longer version of the same list keeps its older rows unchanged
+        rng = random.Random(seed * 1000003 + i)
+        company = rng.choice(COMPANIES)
+        role = f"{rng.choice(ROLES)} {i}"
+        location = rng.choice(LOCATIONS)
+        closed = closed_every and i % closed_every == 0
+        apply = (f'<a href="https://jobs.example.com/{company.lower().replace(" ", "-")}/{i}?utm_source=Simplify">'
+                 f'<img src="https://i.imgur.com/apply.png" width="118" alt="Apply"></a> '
+                 f'<a href="https://simplify.jobs/p/{i}?utm_source=GHList"><img src="https://i.imgur.com/simplify.png" '
+                 f'width="30" alt="Simplify"></a>')
+        if closed:
+            apply = "🔒"
+        company_cell = "↳" if company == previous else f"**[{company}](https://simplify.jobs/c/{company})**"
+        previous = company
+        if style == "html":
+            if company_cell != "↳":
+                company_cell = f'<strong><a href="https://simplify.jobs/c/{company}">{company}</a></strong>'
+            lines += ["<tr>", f"<td>{company_cell}</td>", f"<td>{role}</td>", f"<td>{location}</td>",
+                      f'<td><div align="center">{apply}</div></td>', f"<td>{i % 30}d</td>", "</tr>"]
+        else:
+            lines.append(f"| {company_cell} | {role} | {location} | {apply} | {i % 30}d |")
+    if style == "html":
+        lines += ["</tbody>", "</table>"]
+    lines += ["", "<!-- TABLE_END -->", "", "## Contributing", "", "Open an issue to add a job."]
+    return "\n".join(lines) + "\n"
+
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Sign in</title></head><body>
+<h1>Sign in</h1>{error}
+<form id="login" method="post" action="/login?next={next}">
+  <label>Username <input type="text" name="username"></label>
+  <label>Password <input type="password" name="password"></label>
+  <button type="submit">Sign in</button>
+</form>
+</body></html>
+"""
+
+JOB_LIST_PAGE = """<!DOCTYPE html>
+<html><head><title>Jobs</title></head><body>
+<h1>Open positions</h1>
+<ul id="jobs">{items}</ul>
+<script>sessionStorage.setItem("lastVisit", String(Date.now()));</script>
+</body></html>
+"""
+
+JOB_PAGE = """<!DOCTYPE html>
+<html><head><title>{role} at {company}</title></head><body>
+<h1 id="title">{role}</h1>
+<div id="company">{company}</div>
+<div id="location">{location}</div>
+<div id="description">{description}</div>
+<form id="apply" method="post" action="/jobs/{i}/apply"><button type="submit">Apply</button></form>
+</body></html>
+"""
+
+
+def make_job(i, seed=0):
+    """
+    A synthetic job posting for the fixture job board, stable for a given index and seed.
+    """
+    rng = random.Random(seed * 1000003 + i)
+    company = rng.choice(COMPANIES)
+    role = rng.choice(ROLES)
+    return {"i": i, "company": company, "role": role, "location": rng.choice(LOCATIONS),
+            "description": f"{company} is hiring a {role}. " * rng.randint(5, 40)}
+
+
+class FixtureSite:
+    """
+    The documents served by the fixture server, keyed by URL path, with their validators.
+    Replacing a document with `put` changes its ETag and Last-Modified, like a new commit.
+    """
+    def __init__(self, documents=None, latency=0.0, users=None, jobs=20):
+        """
+        :param documents: (Optional) {path: text or bytes}.
+        :param latency: (Optional) Seconds added to every response.
+        :param users: (Optional) {username: password} accepted by /login of the job board.
+        :param jobs: (Optional) Number of pages under /jobs/<i> on the job board.
+        """
+        self.documents = {}
+        self.latency = latency
+        self.users = users if users is not None else {"applicant": "hunter2"}
+        self.jobs = jobs
+        self.sessions = set()
+        self.logins = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+        for path, body in (documents or {}).items():
+            self.put(path, body)
+
+    @classmethod
+    def from_directory(cls, directory, **kwargs):
+        """
+        Serves every file under `directory` at its relative path, e.g. recorded READMEs
+        saved as <directory>/SimplifyJobs/New-Grad-Positions/HEAD/README.md.
+        """
+        documents = {}
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, 'rb') as f:
+                    documents["/" + os.path.relpath(path, directory).replace(os.sep, "/")] = f.read()
+        return cls(documents, **kwargs)
+
+    @classmethod
+    def with_listings(cls, sources, rows=200, **kwargs):
+        """
+        Serves a generated README for each GitHub source, alternating markdown and HTML tables.
+        """
+        site = cls(**kwargs)
+        for i, source in enumerate(sources):
+            site.put(urlsplit(raw_url(source, "http://fixture")).path,
+                     make_readme(rows, style="html" if i % 2 else "markdown", seed=i))
+        return site
+
+    def put(self, path, body):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        with self.lock:
+            # Last-Modified has one-second resolution; keep it moving forward on quick updates
+            previous = self.documents.get(path)
+            modified = time.time()
+            if previous is not None:
+                modified = max(modified, previous[2] + 1)
+            self.documents[path] = (body, f'"{hashlib.sha1(body).hexdigest()}"', modified)
+
+    def get(self, path):
+        with self.lock:
+            self.requests += 1
+            return self.documents.get(path)
+
+    def login(self, username, password):
+        """
+        :return: A new session token, or None if the credentials are wrong.
+        """
+        if username not in self.users or self.users[username] != password:
+            return None
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.sessions.add(token)
+            self.logins += 1
+        return token
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves FixtureSite documents over HTTP/1.1 keep-alive, answering conditional GETs with 304.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        # Keep benchmarks quiet
+        pass
+
+    def _not_modified(self, etag, modified):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _session(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        token = cookie["session"].value if "session" in cookie else None
+        return token if token in self.server.state.sessions else None
+
+    def _job_board(self, path):
+        """
+        Serves /login and, for signed-in sessions, /jobs and /jobs/<i>.
+        """
+        site = self.server.state
+        query = parse_qs(urlsplit(self.path).query)
+        if path == "/login":
+            next_path = query.get("next", ["/jobs"])[0]
+            self._send(200, LOGIN_PAGE.format(error="", next=quote(next_path)))
+            return
+        if self._session() is None:
+            self._send(303, headers={"Location": f"/login?next={quote(path)}"})
+            return
+        if path == "/jobs":
+            items = "".join(f'<li><a href="/jobs/{i}">{html.escape(make_job(i)["role"])}</a></li>'
+                            for i in range(site.jobs))
+            self._send(200, JOB_LIST_PAGE.format(items=items))
+            return
+        try:
+            i = int(path.rsplit("/", 1)[1])
+        except ValueError:
+            i = -1
+        if not 0 <= i < site.jobs:
+            self._send(404, "<h1>Not found</h1>")
+            return
+        job = {key: html.escape(str(value)) for key, value in make_job(i).items()}
+        self._send(200, JOB_PAGE.format(**job))
+
+    def do_GET(self):
+        site = self.server.state
+        if site.latency:
+            time.sleep(site.latency)
+        path = urlsplit(self.path).path
+        document = site.get(path)
+        if document is None and (path == "/login" or path == "/jobs" or path.startswith("/jobs/")):
+            self._job_board(path)
+            return
+        if document is None:
+            self._send(404, b"404: Not Found", "text/plain")
+            return
+        body, etag, modified = document
+        headers = {"ETag": etag, "Last-Modified": formatdate(modified, usegmt=True)}
+        if self._not_modified(etag, modified):
+            with site.lock:
+                site.not_modified += 1
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self._send(200, body, "text/plain; charset=utf-8", headers)
+
+    def do_POST(self):
+        site = self.server.state
+        if site.latency:
+            time.sleep(site.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8")) if length else {}
+        path = urlsplit(self.path).path
+        if path != "/login":
+            self._send(404, b"404: Not Found", "text/plain")
+            return
+        next_path = parse_qs(urlsplit(self.path).query).get("next", ["/jobs"])[0]
+        token = site.login(form.get("username", [""])[0], form.get("password", [""])[0])
+        if token is None:
+            self._send(401, LOGIN_PAGE.format(error='<p id="error">Wrong username or password.</p>',
+                                              next=quote(next_path)))
+            return
+        self._send(303, headers={"Location": next_path,
+                                 "Set-Cookie": f"session={token}; Path=/; HttpOnly; Max-Age=86400"})
+
+
+def start_server(host="127.0.0.1", port=0, state=None, **state_kwargs):
+    """
+    Starts the fixture server on a background thread.
+
+    :param host: Interface to bind to.
+    :param port: Port to bind to, 0 picks a free one.
+    :param state: (Optional) A FixtureSite to serve, built from `state_kwargs` when not given.
+    :param state_kwargs: Arguments for FixtureSite, e.g. documents={...}, latency=0.05.
+    :return: A tuple (server, base_url); base_url can be passed to ListingFetcher as raw_base,
+             and the FixtureSite is available as server.state.
+
+    sample usage:
+        server, base_url = start_server(state=FixtureSite.with_listings(read_sources()))
+        fetcher = ListingFetcher(read_sources(), raw_base=base_url)
+        ...
+        server.shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.state = state or FixtureSite(**state_kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the job listing sources.")
+    parser.add_argument('--port', type=int, default=8766, help="Port to listen on.")
+    parser.add_argument('--dir', type=str, help="Serve the recorded files in this directory instead of generated READMEs.")
+    parser.add_argument('--links', type=str, default="data/links.txt", help="Sources to generate READMEs for.")
+    parser.add_argument('--rows', type=int, default=200, help="Postings per generated README.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response.")
+
+    args = parser.parse_args()
+
+    if args.dir:
+        site = FixtureSite.from_directory(args.dir, latency=args.latency)
+    else:
+        site = FixtureSite.with_listings(read_sources(args.links), rows=args.rows, latency=args.latency)
+    server, base_url = start_server(port=args.port, state=site)
+    print(f"Fixture server at {base_url} serving {len(site.documents)} documents; "
+          f"job board at {base_url}/jobs (users: {', '.join(site.users)})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+# sample use:
+# python -m src.web.fixture_server --rows 5000
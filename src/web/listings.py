@@ -0,0 +1,445 @@
+"""
+FILE: src/web/listings.py
+
+DESCRIPTION: Fetches the job listing sources in data/links.txt (GitHub READMEs
+with markdown or HTML tables of postings, e.g. SimplifyJobs) and parses them
+into Posting records. Sources are fetched concurrently with conditional
+requests against an on-disk cache, so an unchanged README costs a 304, and
+tables are parsed from the response stream without building a document tree.
+"""
+
+# global imports
+import os
+import re
+import json
+import time
+import codecs
+import hashlib
+import argparse
+import requests
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+RAW_BASE = "https://raw.githubusercontent.com"
+CHUNK_SIZE = 64 * 1024
+
+# Posting field -> lower-case keywords of the column headers it is read from
+HEADER_FIELDS = {
+    "company": ("company",),
+    "role": ("role", "position", "title"),
+    "location": ("location",),
+    "url": ("application", "apply", "link"),
+    "date_posted": ("date posted", "age", "date"),
+}
+# Lists use this in the Company column for "same company as the row above"
+SAME_COMPANY = "↳"
+CLOSED_MARK = "🔒"
+SEPARATOR_CELL = re.compile(r"^:?-{3,}:?$")
+MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\(([^)\s]+)[^)]*\)")
+MARKDOWN_EMPHASIS = re.compile(r"\*\*|__|~~|`")
+# Links in the Application column that point back at the list rather than the job
+AGGREGATOR_HOSTS = ("simplify.jobs", "imgur.com", "i.imgur.com")
+
+
+class Posting:
+    """
+    One job posting from a listing table. Uses __slots__ since a poll can return
+    tens of thousands of them.
+    """
+    __slots__ = ("source", "company", "role", "location", "url", "date_posted", "closed")
+
+    def __init__(self, source=None, company=None, role=None, location=None, url=None, date_posted=None, closed=False):
+        self.source = source
+        self.company = company
+        self.role = role
+        self.location = location
+        self.url = url
+        self.date_posted = date_posted
+        self.closed = closed
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Posting({fields})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Posting):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def normalize_url(url):
+    """
+    Drops tracking parameters (utm_*, ref, source) and the fragment so the same job
+    linked from different lists compares equal.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not key.lower().startswith("utm_") and key.lower() not in ("ref", "source", "src")]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+def _clean(text):
+    text = MARKDOWN_LINK.sub(r"\1", text)
+    text = MARKDOWN_EMPHASIS.sub("", text)
+    return " ".join(text.split())
+
+
+class _Cell:
+    __slots__ = ("text", "links", "header")
+
+    def __init__(self, header=False):
+        self.text = ""
+        self.links = []
+        self.header = header
+
+
+class ListingParser(HTMLParser):
+    """
+    Incremental parser for the posting tables of a README. Feed it text as it
+    arrives; completed rows are turned into Postings and collected until `drain`.
+
+    Markdown tables ("| a | b |" lines, often with inline <a>/<img> tags in the
+    cells) and HTML <table>s are handled by the same pass: tags come through the
+    HTML parser, and outside a <table> the text between them is split on '|' and
+    newlines. Only the current row is ever kept, never the document.
+
+    sample usage:
+        parser = ListingParser(source="https://github.com/SimplifyJobs/New-Grad-Positions")
+        for chunk in chunks:
+            parser.feed(chunk)
+            postings.extend(parser.drain())
+        parser.close()
+        postings.extend(parser.drain())
+    """
+
+    def __init__(self, source=None):
+        super().__init__(convert_charrefs=True)
+        self.source = source
+        self.postings = []
+        self.columns = None  # field -> column index of the current table
+        self.company = None  # last company, for SAME_COMPANY rows
+        # HTML tables
+        self.tables = 0
+        self.row = None
+        self.cell = None
+        # Markdown tables
+        self.md_row = None
+        self.line_text = ""
+
+    def drain(self) -> list:
+        """
+        Returns the postings parsed since the last call.
+        """
+        postings, self.postings = self.postings, []
+        return postings
+
+    def close(self):
+        super().close()
+        self._end_line()
+
+    # ---- HTMLParser callbacks ----
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._end_line()
+            self.tables += 1
+            self.columns = None
+        elif self.tables and tag == "tr":
+            self.row = []
+        elif self.tables and tag in ("td", "th") and self.row is not None:
+            self.cell = _Cell(header=tag == "th")
+        elif tag == "a" and self.cell is not None:
+            href = dict(attrs).get("href")
+            if href:
+                self.cell.links.append(href)
+        elif tag == "img" and self.cell is not None:
+            alt = dict(attrs).get("alt") or ""
+            if CLOSED_MARK in alt:
+                self.cell.text += CLOSED_MARK
+        elif tag == "br" and self.cell is not None:
+            self.cell.text += ", "
+
+    def handle_endtag(self, tag):
+        if tag == "br" and self.cell is not None:
+            self.cell.text += ", "
+        elif not self.tables:
+            return
+        elif tag in ("td", "th") and self.cell is not None:
+            self.row.append(self.cell)
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            self._row(self.row)
+            self.row = None
+            self.cell = None
+        elif tag == "table":
+            self.tables -= 1
+            self.columns = None
+            self.row = self.cell = None
+
+    def handle_data(self, data):
+        if self.tables:
+            if self.cell is not None:
+                self.cell.text += data
+            return
+        for piece in re.split(r"(\n|\|)", data):
+            if piece == "\n":
+                self._end_line()
+            elif piece == "|":
+                if self.md_row is None:
+                    if self.line_text.strip():
+                        continue
+                    self.md_row = []
+                else:
+                    self.md_row.append(self.cell)
+                self.cell = _Cell()
+            elif self.md_row is not None:
+                self.cell.text += piece
+            else:
+                self.line_text += piece
+
+    # ---- rows ----
+
+    def _end_line(self):
+        if self.md_row is not None:
+            # The text after the closing '|' is not a cell
+            if self.cell is not None and self.cell.text.strip():
+                self.md_row.append(self.cell)
+            self._row(self.md_row)
+        elif self.line_text.strip():
+            # Any other text ends the current markdown table
+            self.columns = None
+        self.md_row = None
+        self.cell = None
+        self.line_text = ""
+
+    def _header(self, texts):
+        columns = {}
+        for index, text in enumerate(texts):
+            text = text.lower()
+            for field, keywords in HEADER_FIELDS.items():
+                if field not in columns and any(keyword in text for keyword in keywords):
+                    columns[field] = index
+                    break
+        return columns if "company" in columns and "role" in columns else None
+
+    def _row(self, cells):
+        if not cells:
+            return
+        if all(SEPARATOR_CELL.match(cell.text.strip()) for cell in cells if cell.text.strip()):
+            return
+        # Header detection only runs until a table's header is known, or on <th> rows
+        if self.columns is None or any(cell.header for cell in cells):
+            header = self._header([_clean(cell.text) for cell in cells])
+            if header is not None:
+                self.columns = header
+                return
+        if self.columns is None:
+            return
+
+        def column(field):
+            index = self.columns.get(field)
+            return cells[index] if index is not None and index < len(cells) else None
+
+        company_cell = column("company")
+        company = _clean(company_cell.text) if company_cell else None
+        if company in (SAME_COMPANY, ""):
+            company = self.company
+        self.company = company
+
+        role_cell, location_cell, url_cell, date_cell = column("role"), column("location"), column("url"), column("date_posted")
+        links = url_cell.links if url_cell else []
+        # Prefer the employer's own link over the list's redirect links
+        url = next((link for link in links if not urlsplit(link).netloc.lower().endswith(AGGREGATOR_HOSTS)),
+                   links[0] if links else None)
+        closed = any(CLOSED_MARK in cell.text for cell in (url_cell, role_cell, company_cell) if cell is not None)
+        self.postings.append(Posting(
+            source=self.source,
+            company=company,
+            role=_clean(role_cell.text) if role_cell else None,
+            location=_clean(location_cell.text).strip(", ") if location_cell else None,
+            url=normalize_url(url),
+            date_posted=_clean(date_cell.text) if date_cell else None,
+            closed=closed,
+        ))
+
+
+def parse_listings(chunks, source=None):
+    """
+    Parses posting tables from an iterable of text chunks, yielding Postings as rows complete.
+    """
+    parser = ListingParser(source)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.drain()
+    parser.close()
+    yield from parser.drain()
+
+
+def read_sources(path="data/links.txt") -> list:
+    """
+    Reads one source URL per line, skipping blank lines and '#' comments.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def raw_url(source, raw_base=RAW_BASE):
+    """
+    Maps a GitHub repository URL to its raw README (HEAD resolves to the default branch);
+    any other URL is fetched as it is.
+    """
+    parts = urlsplit(source)
+    path = parts.path.strip("/").split("/")
+    if parts.netloc.lower() in ("github.com", "www.github.com") and len(path) == 2:
+        return f"{raw_base.rstrip('/')}/{path[0]}/{path[1]}/HEAD/README.md"
+    return source
+
+
+class ListingFetcher:
+    """
+    Fetches listing sources concurrently, revalidating each against an on-disk cache
+    with If-None-Match / If-Modified-Since.
+
+    Each source's body is kept in `cache_dir` next to a small JSON file with its
+    ETag and Last-Modified. A 200 is parsed straight from the response stream while
+    it is written to the cache; a 304 is parsed from the cached copy (or not at
+    all, with parse_unchanged=False).
+
+    sample usage:
+        fetcher = ListingFetcher(read_sources("data/links.txt"))
+        for result in fetcher.fetch_all():
+            print(result["source"], result["status"], len(result["postings"]))
+    """
+
+    def __init__(self, sources, cache_dir="data/listings_cache", max_workers=4, timeout=(5, 30), raw_base=RAW_BASE,
+                 session=None):
+        """
+        :param sources: Source URLs, e.g. from read_sources.
+        :param cache_dir: (Optional) Directory for cached bodies and their validators.
+        :param max_workers: (Optional) Number of sources fetched at the same time.
+        :param timeout: (Optional) (connect, read) timeout in seconds.
+        :param raw_base: (Optional) Base URL that GitHub READMEs are fetched from, e.g. a local fixture server.
+        :param session: (Optional) requests.Session to use; one with a pool of `max_workers` is made otherwise.
+        """
+        self.sources = list(sources)
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.raw_base = raw_base
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = "autoaiapply-listings"
+        self.session = session
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+
+    def _read_cached(self, body_path):
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        with open(body_path, 'rb') as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+    def fetch(self, source, parse_unchanged=True) -> dict:
+        """
+        Fetches and parses one source.
+
+        :param source: The source URL.
+        :param parse_unchanged: (Optional) Also parse the cached body when the source answers 304.
+        :return: A dictionary with "source", "url", "status" (200, 304 or None on error),
+                 "changed", "postings" (list of Posting), "bytes" (downloaded) and "error".
+        """
+        url = raw_url(source, self.raw_base)
+        meta_path, body_path = self._cache_paths(url)
+        result = {"source": source, "url": url, "status": None, "changed": False, "postings": [], "bytes": 0,
+                  "error": None}
+        meta = {}
+        if os.path.exists(body_path):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                result["status"] = response.status_code
+                if response.status_code == 304:
+                    if parse_unchanged:
+                        result["postings"] = list(parse_listings(self._read_cached(body_path), source))
+                    return result
+                response.raise_for_status()
+
+                def chunks():
+                    # Tee the raw bytes into the cache while the parser consumes the text
+                    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+                    with open(body_path + ".tmp", 'wb') as f:
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+                            result["bytes"] += len(chunk)
+                            yield decoder.decode(chunk)
+                    yield decoder.decode(b"", final=True)
+
+                result["postings"] = list(parse_listings(chunks(), source))
+            os.replace(body_path + ".tmp", body_path)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({"url": url, "etag": response.headers.get("ETag"),
+                           "last_modified": response.headers.get("Last-Modified"),
+                           "fetched_at": time.time(), "size": result["bytes"]}, f)
+            result["changed"] = True
+        except (requests.RequestException, OSError) as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    def fetch_all(self, parse_unchanged=True) -> list:
+        """
+        Fetches every source concurrently.
+
+        :return: One result per source (see `fetch`), in the order of `sources`.
+        """
+        if not self.sources:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.sources)),
+                                thread_name_prefix="listings") as executor:
+            return list(executor.map(lambda source: self.fetch(source, parse_unchanged), self.sources))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fetch and parse the job listing sources.")
+    parser.add_argument('--links', type=str, default="data/links.txt", help="File with one source URL per line.")
+    parser.add_argument('--cache_dir', type=str, default="data/listings_cache", help="Directory for cached sources.")
+    parser.add_argument('--raw_base', type=str, default=RAW_BASE, help="Base URL for GitHub READMEs, e.g. a fixture server.")
+    parser.add_argument('--show', type=int, default=0, help="Print the first N open postings of each source.")
+
+    args = parser.parse_args()
+
+    fetcher = ListingFetcher(read_sources(args.links), cache_dir=args.cache_dir, raw_base=args.raw_base)
+    for result in fetcher.fetch_all():
+        open_postings = [posting for posting in result["postings"] if not posting.closed]
+        print(f"{result['source']}: status={result['status']} changed={result['changed']} bytes={result['bytes']} "
+              f"postings={len(result['postings'])} open={len(open_postings)}"
+              + (f" error={result['error']}" if result["error"] else ""))
+        for posting in open_postings[:args.show]:
+            print(f"  {posting.company} | {posting.role} | {posting.location} | {posting.url}")
+
+# sample use:
+# python -m src.web.listings --show 5
+# python -m src.web.listings --raw_base http://127.0.0.1:8766 --cache_dir /tmp/listings_cache
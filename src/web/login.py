@@ -4,10 +4,61 @@ FILE: src/web/login.py
 DESCRIPTION: Utility functions for logging into websites using Selenium.
 """
 
-def login_to_site(username, password, url):
+# local imports
+from src.web.browser import get_default_pool, site_of
+
+
+def _password_field(driver):
+    from selenium.webdriver.common.by import By
+
+    fields = driver.find_elements(By.CSS_SELECTOR, "input[type=password]")
+    return fields[0] if fields else None
+
+
+def login_to_site(username, password, url, pool=None, timeout=15):
     """
-    Stub function to log into a website using Selenium.
+    Logs into a website through the shared browser pool. The session (cookies and
+    storage) is saved per site after a successful login, so if an earlier login is
+    still valid the login form never appears and nothing is typed.
+
+    :param username: The username or email for the login form.
+    :param password: The password.
+    :param url: The login page, or a page that shows the login form when logged out.
+    :param pool: (Optional) The BrowserPool to use; the process-wide pool by default.
+    :param timeout: (Optional) Seconds to wait for the login to complete.
+    :return: True if the browser ends up logged in.
     """
-    print(f"Stub: Logging into {url} with username={username}")
-    # Implement Selenium automation steps for login
-    return True
+    def login(driver):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+
+        password_field = _password_field(driver)
+        if password_field is None:
+            # The saved session is still valid
+            return True
+        form = password_field.find_element(By.XPATH, "./ancestor::form")
+        user_field = form.find_element(
+            By.CSS_SELECTOR, "input[type=email], input[name*=user], input[name*=email], input[type=text]")
+        user_field.clear()
+        user_field.send_keys(username)
+        password_field.clear()
+        password_field.send_keys(password)
+        password_field.submit()
+        try:
+            WebDriverWait(driver, timeout).until(lambda d: _password_field(d) is None)
+        except TimeoutException:
+            return False
+        return True
+
+    pool = pool or get_default_pool()
+    # Same as pool.run(url, login, save_state=True), except that a failed login's cookies
+    # must not replace the saved session
+    with pool.context() as context:
+        site = site_of(url)
+        pool.restore(context, site)
+        context.driver.get(url)
+        logged_in = login(context.driver)
+        if logged_in:
+            pool.save_state(context, site)
+        return logged_in
@@ -0,0 +1,278 @@
+"""
+FILE: src/web/seen.py
+
+DESCRIPTION: A persistent index of the job postings already seen, so each poll
+of the listing sources only reports postings that are new. Postings are keyed
+by a fingerprint of their normalized company, role and link; the index is an
+append-only SQLite table with a Bloom filter in front of it, so checking a
+poll costs time proportional to the poll, not to the history. Several
+processes can share the index (e.g. a cron `get-new-jobs` and the menu): a
+generation counter bumped by every write tells each one when its filter is stale.
+"""
+
+# global imports
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import argparse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    fingerprint BLOB PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    source TEXT,
+    company TEXT,
+    role TEXT,
+    url TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+# SQLite's default limit on host parameters is 999
+LOOKUP_BATCH = 500
+NON_WORD = re.compile(r"[\W_]+")
+
+
+def fingerprint(posting) -> bytes:
+    """
+    A 16-byte key for a posting: the same company, role and link give the same key,
+    regardless of case, punctuation, spacing or tracking parameters (see normalize_url).
+    """
+    company = NON_WORD.sub(" ", (posting.company or "").casefold()).strip()
+    role = NON_WORD.sub(" ", (posting.role or "").casefold()).strip()
+    link = hashlib.sha1((posting.url or "").encode("utf-8")).hexdigest()
+    return hashlib.blake2b(f"{company}\x1f{role}\x1f{link}".encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter over fingerprints. A miss means "definitely not seen",
+    so most new postings never touch the database; a hit is confirmed in SQLite.
+    The k bit positions come from the fingerprint itself (double hashing), so no
+    extra hashing is done.
+    """
+
+    def __init__(self, bits=1 << 23, hashes=7, data=None):
+        """
+        :param bits: Size in bits; the default (1 MiB) keeps false positives near 1% up to ~800k postings.
+        :param hashes: Bits set per fingerprint.
+        :param data: (Optional) Bytes from `to_bytes` to start from.
+        """
+        self.bits = bits
+        self.hashes = hashes
+        self.array = bytearray(data) if data is not None else bytearray(bits // 8)
+
+    def _positions(self, key):
+        h1 = int.from_bytes(key[:8], "little")
+        h2 = int.from_bytes(key[8:16], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.array)
+
+
+class SeenIndex:
+    """
+    Set of postings already reported, stored in SQLite (one row per posting, never
+    rewritten) with an optional Bloom filter saved next to the database.
+
+    sample usage:
+        index = SeenIndex()
+        new = index.filter_new(scrape_job_links())  # also records them as seen
+        index.close()
+    """
+
+    def __init__(self, path="data/seen_postings.sqlite3", bloom=True, bloom_bits=1 << 23, bloom_hashes=7):
+        """
+        :param path: Location of the SQLite file; the Bloom filter is kept at <path>.bloom.
+        :param bloom: (Optional) Put a Bloom filter in front of the database lookups.
+        :param bloom_bits: (Optional) Size of the Bloom filter in bits.
+        :param bloom_hashes: (Optional) Bits set per posting in the Bloom filter.
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        len(self)  # make sure the count is stored, so later reads of it never write
+        self.bloom = None
+        self.bloom_path = path + ".bloom"
+        self.generation = None  # generation of the index the Bloom filter reflects
+        if bloom:
+            self.bloom = self._load_bloom(bloom_bits, bloom_hashes)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        # Kept in `meta` so it never needs a scan of the history
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'count'").fetchone()
+        if row is None:
+            count = self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('count', ?)", (count,))
+            return count
+        return row[0]
+
+    def _generation(self):
+        """
+        Bumped by every write that adds postings, in the same transaction, so a Bloom
+        filter (in memory or on disk) can tell whether any process has written since.
+        """
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        # Before generations were kept, the Bloom file header held the row count
+        return row[0] if row is not None else len(self)
+
+    def _load_bloom(self, bits, hashes):
+        # The file starts with the generation it was saved for, so a stale filter is detected
+        generation = self._generation()
+        try:
+            with open(self.bloom_path, 'rb') as f:
+                stored = int.from_bytes(f.read(8), "little")
+                data = f.read()
+            if stored == generation and len(data) == bits // 8:
+                self.generation = generation
+                return BloomFilter(bits, hashes, data)
+        except OSError:
+            pass
+        bloom = BloomFilter(bits, hashes)
+        # Read the generation and the fingerprints from the same snapshot
+        self.conn.execute("BEGIN")
+        try:
+            generation = self._generation()
+            for (key,) in self.conn.execute("SELECT fingerprint FROM seen"):
+                bloom.add(key)
+        finally:
+            self.conn.commit()
+        self.generation = generation
+        self._save_bloom(bloom, generation)
+        return bloom
+
+    def _refresh_bloom(self):
+        """
+        Reloads the Bloom filter if another process (or SeenIndex) has added postings
+        since it was loaded; otherwise their postings would look unseen.
+        """
+        if self.bloom is not None and self._generation() != self.generation:
+            self.bloom = self._load_bloom(self.bloom.bits, self.bloom.hashes)
+
+    def _save_bloom(self, bloom, generation):
+        # A temporary file per process, so concurrent writers never interleave
+        tmp_path = f"{self.bloom_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(generation.to_bytes(8, "little"))
+            f.write(bloom.to_bytes())
+        os.replace(tmp_path, self.bloom_path)
+
+    def _stored(self, keys) -> set:
+        found = set()
+        for i in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[i:i + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found.update(key for (key,) in self.conn.execute(
+                f"SELECT fingerprint FROM seen WHERE fingerprint IN ({placeholders})", batch))
+        return found
+
+    def __contains__(self, posting):
+        key = fingerprint(posting)
+        self._refresh_bloom()
+        if self.bloom is not None and key not in self.bloom:
+            return False
+        return bool(self._stored([key]))
+
+    def filter_new(self, postings, mark=True) -> list:
+        """
+        Returns the postings that have not been seen before (each once, in their
+        original order) and, unless mark=False, records them as seen.
+        """
+        self._refresh_bloom()
+        order = []
+        new = {}
+        maybe_seen = {}
+        for posting in postings:
+            key = fingerprint(posting)
+            if key in new or key in maybe_seen:
+                continue
+            order.append(key)
+            if self.bloom is not None and key not in self.bloom:
+                new[key] = posting
+            else:
+                maybe_seen[key] = posting
+        if maybe_seen:
+            stored = self._stored(list(maybe_seen))
+            new.update((key, posting) for key, posting in maybe_seen.items() if key not in stored)
+        if mark and new:
+            self.add_keys(new)
+        return [new[key] for key in order if key in new]
+
+    def add(self, postings):
+        """
+        Records postings as seen; ones already recorded are left untouched.
+        """
+        self.add_keys({fingerprint(posting): posting for posting in postings})
+
+    def add_keys(self, postings_by_key):
+        """
+        Records {fingerprint: posting} pairs as seen.
+        """
+        now = time.time()
+        with self.conn:
+            # Take the write lock before reading the counters, so concurrent writers bump them in turn
+            self.conn.execute("BEGIN IMMEDIATE")
+            count = len(self)
+            generation = self._generation()
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen (fingerprint, first_seen, source, company, role, url) VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, now, posting.source, posting.company, posting.role, posting.url)
+                 for key, posting in postings_by_key.items()])
+            added = self.conn.total_changes - before
+            if added:
+                self.conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                      [("count", count + added), ("generation", generation + 1)])
+        if self.bloom is None or not added:
+            return
+        if generation != self.generation:
+            # Another process added postings since the filter was loaded: rebuild it with theirs and ours
+            self.bloom = self._load_bloom(self.bloom.bits, self.bloom.hashes)
+            return
+        for key in postings_by_key:
+            self.bloom.add(key)
+        self.generation = generation + 1
+        self._save_bloom(self.bloom, self.generation)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Inspect the seen-postings index.")
+    parser.add_argument('--path', type=str, default="data/seen_postings.sqlite3", help="Location of the index.")
+    parser.add_argument('--recent', type=int, default=10, help="Show the N most recently seen postings.")
+
+    args = parser.parse_args()
+
+    with SeenIndex(args.path) as index:
+        print(f"{len(index)} postings seen")
+        for first_seen, company, role, url in index.conn.execute(
+                "SELECT first_seen, company, role, url FROM seen ORDER BY first_seen DESC LIMIT ?", (args.recent,)):
+            print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(first_seen))}  {company} | {role} | {url}")
+
+# sample use:
+# python -m src.web.seen --recent 20
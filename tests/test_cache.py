@@ -0,0 +1,37 @@
+"""
+FILE: tests/test_cache.py
+
+DESCRIPTION: Checks the size limits of the model response cache.
+"""
+
+# local imports
+from src.ai.cache import ResponseCache, cache_key
+
+
+def key(prompt):
+    return cache_key("gpt-4o-mini", [{"role": "user", "content": prompt}], temperature=0.2)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    with ResponseCache(str(tmp_path / "cache.sqlite3"), max_bytes=100) as cache:
+        cache.put(key("a"), "gpt-4o-mini", "x" * 40)
+        cache.put(key("b"), "gpt-4o-mini", "y" * 40)
+        assert cache.get(key("a")) == "x" * 40
+        cache.flush()
+        cache.put(key("c"), "gpt-4o-mini", "z" * 40)
+        # "b" was used least recently
+        assert cache.get(key("b")) is None
+        assert (cache.get(key("a")), cache.get(key("c"))) == ("x" * 40, "z" * 40)
+        assert cache.stats()["evicted"] == 1
+
+
+def test_response_larger_than_the_budget_is_not_cached(tmp_path):
+    with ResponseCache(str(tmp_path / "cache.sqlite3"), max_bytes=100) as cache:
+        cache.put(key("a"), "gpt-4o-mini", "x" * 40)
+        cache.put(key("b"), "gpt-4o-mini", "short")
+        cache.put(key("b"), "gpt-4o-mini", "y" * 101)
+        # Neither the oversized reply nor the one it replaced is served, and nothing else was evicted
+        assert cache.get(key("b")) is None
+        assert cache.get(key("a")) == "x" * 40
+        stats = cache.stats()
+        assert (stats["entries"], stats["bytes"], stats["evicted"]) == (1, 40, 0)
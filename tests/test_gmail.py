@@ -0,0 +1,138 @@
+"""
+FILE: tests/test_gmail.py
+
+DESCRIPTION: Syncs a fixture mailbox (tests/fixtures/gmail) from the local
+stand-in for the Gmail API (src/email/fake_gmail.py) into a MailStore.
+"""
+
+# global imports
+import os
+import pytest
+
+# local imports
+from src.email import gmail
+from src.email.fake_gmail import FakeMailbox, start_server
+from src.email.gmail import GmailClient, check_gmail_inbox, sync_mailbox
+from src.email.store import MailStore
+
+MAILBOX_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "gmail", "mailbox.json")
+
+
+@pytest.fixture
+def server():
+    server, base_url = start_server(state=FakeMailbox.from_file(MAILBOX_PATH))
+    server.client = GmailClient("test", base_url=base_url)
+    yield server
+    server.client.close()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    with MailStore(str(tmp_path / "gmail.sqlite3")) as store:
+        yield store
+
+
+def inbox_ids(mailbox):
+    """
+    The INBOX message IDs, newest first (the order the sync reports them in).
+    """
+    inbox = [message for message in mailbox.messages.values() if "INBOX" in message["labelIds"]]
+    return [message["id"] for message in sorted(inbox, key=lambda m: int(m["internalDate"]), reverse=True)]
+
+
+def test_full_sync_then_incremental(server, store):
+    mailbox = server.state
+    ids = list(mailbox.messages)
+
+    first = sync_mailbox(server.client, store)
+    assert first["mode"] == "full"
+    # The promotions digest is not in the inbox
+    assert first["added"] == inbox_ids(mailbox)
+    assert ids[3] not in store
+    assert first["history_id"] == mailbox.history_id == store.history_id
+
+    stripe, jane_street, reply = store.get([ids[0], ids[1], ids[2]])
+    assert (stripe.sender, stripe.sender_email) == ("Stripe Recruiting", "recruiting@stripe.example.com")
+    assert reply.thread_id == stripe.thread_id
+    # An HTML-only body is stored as text
+    assert "schedule a phone interview" in jane_street.body
+    assert "<p>" not in jane_street.body
+
+    delivered = mailbox.deliver("Stripe Recruiting <recruiting@stripe.example.com>", "Stripe offer",
+                                "Congratulations!", date=1734021600000, thread_id=stripe.thread_id)
+    mailbox.delete(ids[4])
+    mailbox.modify(ids[0], remove=["INBOX"])
+    mailbox.modify(ids[5], remove=["UNREAD"], add=["STARRED"])
+    listed = mailbox.calls.get("messages.list", 0)
+
+    second = sync_mailbox(server.client, store)
+    assert second["mode"] == "incremental"
+    assert second["added"] == [delivered]
+    assert (second["removed"], second["relabeled"]) == (2, 1)
+    # One history call and one batch, without relisting the label
+    assert second["requests"] == 2
+    assert mailbox.calls.get("messages.list", 0) == listed
+    assert store.ids() == set(inbox_ids(mailbox))
+    assert store.labels([ids[5]]) == {ids[5]: {"INBOX", "STARRED"}}
+
+    third = sync_mailbox(server.client, store)
+    assert (third["mode"], third["added"], third["removed"], third["relabeled"]) == ("incremental", [], 0, 0)
+
+
+def test_expired_history_falls_back_to_full_sync(server, store):
+    mailbox = server.state
+    ids = list(mailbox.messages)
+    sync_mailbox(server.client, store)
+
+    delivered = mailbox.deliver("Ramp Recruiting <recruiting@ramp.example.com>", "Ramp offer", "Welcome aboard!",
+                                date=1734021600000)
+    mailbox.delete(ids[1])
+    mailbox.expire_history()
+
+    result = sync_mailbox(server.client, store)
+    assert result["mode"] == "full"
+    # Only the new message is downloaded again
+    assert result["added"] == [delivered]
+    assert result["removed"] == 1
+    assert store.ids() == set(inbox_ids(mailbox))
+    assert store.history_id == mailbox.history_id
+
+    assert sync_mailbox(server.client, store)["mode"] == "incremental"
+
+
+def test_throttled_batch_calls_are_retried(server, store, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(gmail.time, "sleep", sleeps.append)
+    mailbox = server.state
+    # Every third call inside a batch is answered with 429
+    mailbox.rate_limit_every = 3
+
+    result = sync_mailbox(server.client, store)
+    assert result["added"] == inbox_ids(mailbox)
+    assert len(store) == 5
+    # Calls 3 and 6 are throttled: 5 calls, then 2 retried, then 1
+    assert mailbox.counters()["batch_requests"] == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_throttled_batch_calls_give_up_after_retries(server, store, monkeypatch):
+    monkeypatch.setattr(gmail.time, "sleep", lambda seconds: None)
+    server.state.rate_limit_every = 1
+
+    with pytest.raises(gmail.GmailAPIError):
+        sync_mailbox(server.client, store)
+    # The checkpoint is not moved, so the next sync lists the label again
+    assert store.history_id is None
+
+
+def test_check_gmail_inbox_returns_new_messages_newest_first(server, tmp_path):
+    store_path = str(tmp_path / "gmail.sqlite3")
+    first = check_gmail_inbox(store_path, server.client)
+    assert [message.id for message in first] == inbox_ids(server.state)
+    assert check_gmail_inbox(store_path, server.client) == []
+
+    delivered = server.state.deliver("Datadog Talent <talent@datadog.example.com>", "Datadog: new role",
+                                     "A new role opened up.")
+    assert [message.id for message in check_gmail_inbox(store_path, server.client)] == [delivered]
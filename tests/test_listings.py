@@ -0,0 +1,100 @@
+"""
+FILE: tests/test_listings.py
+
+DESCRIPTION: Runs the listing fetcher offline against the fixture server,
+serving a recorded SimplifyJobs README (tests/fixtures/listings).
+"""
+
+# global imports
+import os
+import pytest
+
+# local imports
+from src.web import listings
+from src.web.fixture_server import FixtureSite, start_server
+from src.web.listings import ListingFetcher, Posting, parse_listings
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "listings")
+SOURCE = "https://github.com/SimplifyJobs/New-Grad-Positions"
+README_PATH = "/SimplifyJobs/New-Grad-Positions/HEAD/README.md"
+
+EXPECTED = [
+    Posting(SOURCE, "Stripe", "Software Engineer, New Grad", "Seattle, WA",
+            "https://stripe.com/jobs/listing/software-engineer-new-grad/6162235", "Dec 20"),
+    Posting(SOURCE, "Stripe", "Backend Engineer, New Grad", "San Francisco, CA, New York, NY",
+            "https://stripe.com/jobs/listing/backend-engineer-new-grad/6162240", "Dec 20"),
+    Posting(SOURCE, "Stripe", "Data Engineer, New Grad 🛂", "Remote in USA", None, "Dec 18", closed=True),
+    Posting(SOURCE, "Jane Street", "Quantitative Trader", "New York, NY",
+            "https://www.janestreet.com/join-jane-street/position/7500213002/", "Dec 17"),
+    Posting(SOURCE, "Lockheed Martin", "Software Engineer Associate 🇺🇸", "Fort Worth, TX", None, "Dec 12",
+            closed=True),
+    Posting(SOURCE, "Datadog", "Software Engineer - Early Career", "Boston, MA",
+            "https://careers.datadoghq.com/detail/6344018/?gh_jid=6344018", "Dec 10"),
+    Posting(SOURCE, "Datadog", "Software Engineer - Early Career", "New York, NY",
+            "https://careers.datadoghq.com/detail/6344022/?gh_jid=6344022", "Dec 10"),
+    Posting(SOURCE, "Ramp", "Software Engineer, Frontend", "New York, NY",
+            "https://simplify.jobs/p/e8a1f3b2-software-engineer-frontend", "Dec 05"),
+]
+
+
+def read_fixture():
+    with open(FIXTURES + README_PATH, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def server():
+    server, base_url = start_server(state=FixtureSite.from_directory(FIXTURES))
+    server.base_url = base_url
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_fetcher(server, tmp_path):
+    return ListingFetcher([SOURCE], cache_dir=str(tmp_path / "cache"), raw_base=server.base_url)
+
+
+def test_parses_recorded_readme(server, tmp_path):
+    result = make_fetcher(server, tmp_path).fetch(SOURCE)
+    assert result["error"] is None
+    assert result["status"] == 200
+    assert result["changed"]
+    # ↳ rows take the company above, 🔒 rows are closed, and redirect/tracking links are dropped
+    assert result["postings"] == EXPECTED
+
+
+def test_unchanged_source_is_revalidated(server, tmp_path):
+    fetcher = make_fetcher(server, tmp_path)
+    first = fetcher.fetch(SOURCE)
+    second = fetcher.fetch(SOURCE)
+    assert (first["status"], second["status"]) == (200, 304)
+    assert not second["changed"]
+    assert second["bytes"] == 0
+    assert server.state.not_modified == 1
+    # A 304 is parsed from the cached copy, or skipped
+    assert second["postings"] == EXPECTED
+    assert fetcher.fetch(SOURCE, parse_unchanged=False)["postings"] == []
+
+    # A new version of the README is downloaded again
+    server.state.put(README_PATH, read_fixture().replace("Dec 05", "Dec 06"))
+    third = fetcher.fetch(SOURCE)
+    assert third["status"] == 200
+    assert third["changed"]
+    assert third["postings"][-1].date_posted == "Dec 06"
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1000])
+def test_chunk_boundaries(size):
+    text = read_fixture()
+    chunks = [text[i:i + size] for i in range(0, len(text), size)]
+    assert list(parse_listings(chunks, SOURCE)) == EXPECTED
+
+
+@pytest.mark.parametrize("size", [1, 3, 5])
+def test_chunk_boundaries_split_characters(server, tmp_path, monkeypatch, size):
+    # Byte chunks this small split the multi-byte ↳ and 🔒, in the response and in the cached copy
+    monkeypatch.setattr(listings, "CHUNK_SIZE", size)
+    fetcher = make_fetcher(server, tmp_path)
+    assert fetcher.fetch(SOURCE)["postings"] == EXPECTED
+    assert fetcher.fetch(SOURCE)["postings"] == EXPECTED
@@ -0,0 +1,47 @@
+"""
+FILE: tests/test_metrics.py
+
+DESCRIPTION: Checks that dumping the Notion API metrics never writes a call twice.
+"""
+
+# global imports
+import json
+import pytest
+
+# local imports
+from src.notion.metrics import Metrics
+
+
+def read_lines(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def record(metrics, count):
+    for _ in range(count):
+        metrics.record("POST", "https://api.notion.com/v1/databases/abc/query", 200, 100, 10, 0.05, 0)
+
+
+def test_dump_appends_only_new_calls(tmp_path):
+    path = str(tmp_path / "metrics.jsonl")
+    metrics = Metrics()
+    record(metrics, 3)
+    assert metrics.dump_jsonl(path) == 3 + 1
+    assert metrics.dump_jsonl(path) == 0 + 1
+    record(metrics, 2)
+    metrics.dump_jsonl(path)
+
+    lines = read_lines(path)
+    assert sum(line["type"] == "call" for line in lines) == 5
+    summaries = [line for line in lines if line["type"] == "summary"]
+    # The summaries are cumulative: 3, 3, then 5 calls
+    assert [line["calls"] for line in summaries] == [3, 3, 5]
+    assert all(line["cumulative"] and line["since"] == metrics.started for line in summaries)
+
+
+def test_failed_dump_keeps_calls(tmp_path):
+    metrics = Metrics()
+    record(metrics, 2)
+    with pytest.raises(OSError):
+        metrics.dump_jsonl(str(tmp_path / "missing" / "metrics.jsonl"))
+    assert len(metrics.events) == 2
@@ -0,0 +1,49 @@
+"""
+FILE: tests/test_seen.py
+
+DESCRIPTION: Checks the seen-postings index, including two indexes sharing
+one data/ directory (as a cron `get-new-jobs` and the menu would).
+"""
+
+# local imports
+from src.web.listings import Posting
+from src.web.seen import SeenIndex
+
+SOURCE = "https://github.com/SimplifyJobs/New-Grad-Positions"
+
+
+def postings(company, count):
+    return [Posting(SOURCE, company, f"Software Engineer {i}", "New York, NY",
+                    f"https://example.com/{company.lower()}/{i}", "Dec 20") for i in range(count)]
+
+
+def test_filter_new_reports_each_posting_once(tmp_path):
+    path = str(tmp_path / "seen.sqlite3")
+    batch = postings("Stripe", 5)
+    with SeenIndex(path) as index:
+        assert index.filter_new(batch + batch[:2]) == batch
+        assert index.filter_new(batch) == []
+        assert len(index) == 5
+    # The saved Bloom filter is reused, and still agrees with SQLite
+    with SeenIndex(path) as index:
+        assert index.filter_new(batch + postings("Ramp", 1)) == postings("Ramp", 1)
+        assert len(index) == 6
+
+
+def test_indexes_sharing_a_path_see_each_others_postings(tmp_path):
+    path = str(tmp_path / "seen.sqlite3")
+    first, second = SeenIndex(path), SeenIndex(path)
+    stripe, ramp = postings("Stripe", 20), postings("Ramp", 20)
+    # Both load an empty filter, then each records its own postings (and saves a filter)
+    assert first.filter_new(stripe) == stripe
+    assert second.filter_new(ramp) == ramp
+
+    assert first.filter_new(ramp) == []
+    assert second.filter_new(stripe) == []
+    first.close()
+    second.close()
+
+    # Whichever filter was saved last, a fresh index knows both sets
+    with SeenIndex(path) as index:
+        assert len(index) == 40
+        assert index.filter_new(stripe + ramp) == []
@@ -0,0 +1,96 @@
+"""
+FILE: tests/test_writes.py
+
+DESCRIPTION: Runs the Notion write buffer against the local stand-in server
+(src/notion/fake_server.py).
+"""
+
+# global imports
+import os
+import pytest
+
+# local imports
+from src.notion.client import NotionClient
+from src.notion.errors import NotionAPIError
+from src.notion.fake_server import FakeNotion, start_server
+from src.notion.metrics import Metrics
+from src.notion.scheduler import RequestScheduler
+from src.notion.writes import WriteBuffer
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "notion_db_schema.json")
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # The schema cache writes to data/ relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    server, base_url = start_server(state=FakeNotion(schema_path=SCHEMA_PATH, rows=5))
+    server.client = NotionClient(api_key="fake", database_id=server.state.database_id, base_url=base_url,
+                                 scheduler=RequestScheduler(rate=None, max_retries=0, metrics=Metrics()))
+    yield server
+    server.client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def job_row(company, job_id):
+    return {"Company": {"title": [{"text": {"content": company}}]},
+            "Job ID": {"rich_text": [{"text": {"content": job_id}}]}}
+
+
+def stage(name):
+    return {"Stage": {"select": {"name": name}}}
+
+
+def queue_writes(buffer, page_ids):
+    buffer.create(job_row("Acme", "acme-1"))
+    buffer.update(page_ids[0], stage("Applied"))
+    buffer.archive(page_ids[1])
+
+
+def test_flush_sends_queued_writes(server):
+    page_ids = list(server.state.pages)
+    buffer = WriteBuffer(server.client)
+    queue_writes(buffer, page_ids)
+    buffer.create(job_row("Acme", "acme-1"))
+
+    result = buffer.flush()
+    assert result["failed"] == []
+    assert (len(result["created"]), result["updated"][0]["id"], result["archived"]) == (1, page_ids[0], [page_ids[1]])
+    assert result["skipped"] == 1
+    assert len(buffer) == 0
+    assert server.state.pages[page_ids[1]]["archived"]
+
+
+def test_failed_duplicate_check_keeps_writes_queued(server):
+    page_ids = list(server.state.pages)
+    buffer = WriteBuffer(server.client)
+    queue_writes(buffer, page_ids)
+
+    # Every request is throttled and the scheduler does not retry, so the duplicate check fails
+    server.state.rate_limit_every = 1
+    with pytest.raises(NotionAPIError):
+        buffer.flush()
+    assert (len(buffer.creates), buffer.updates, buffer.archives) == (1, {page_ids[0]: stage("Applied")}, {page_ids[1]})
+    assert not server.state.pages[page_ids[1]]["archived"]
+
+    # Writes queued after the failure are merged behind the requeued ones
+    buffer.update(page_ids[0], stage("Interview"))
+    server.state.rate_limit_every = 0
+    result = buffer.flush()
+    assert result["failed"] == []
+    assert len(result["created"]) == 1
+    assert result["updated"][0]["properties"]["Stage"]["select"]["name"] == "Interview"
+    assert result["archived"] == [page_ids[1]]
+    assert len(buffer) == 0
+
+
+def test_missing_job_id_property_keeps_writes_queued(server):
+    page_ids = list(server.state.pages)
+    buffer = WriteBuffer(server.client, job_id_property="Requisition")
+    buffer.create({**job_row("Acme", "acme-1"), "Requisition": {"rich_text": [{"text": {"content": "r-1"}}]}})
+    buffer.update(page_ids[0], stage("Applied"))
+
+    with pytest.raises(KeyError):
+        buffer.flush()
+    assert len(buffer) == 2